@@ -0,0 +1,235 @@
+"""
+对本地HTTPS模拟调度中心（hypercorn，ALPN协商h2/http1.1）分别用HTTP/1.1和HTTP/2拉取任务目录，
+对比顺序翻页（iter_jobs）、并行翻页和多集群fan-out三种场景的页吞吐和使用的连接数
+
+    pdm install -G bench
+    pdm run bench-http2
+    python benchmarks/http2_standin.py --latency 50 --clusters 8
+"""
+import io
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+from urllib.parse import parse_qs
+
+import trustme
+from httpx import Limits
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from rich.console import Console
+from rich.table import Table
+
+from xxl_admin.client import XxlAdminClient
+from xxl_admin.fanout import XxlFanout
+from xxl_admin.settings import XxlEnvSettings
+from xxl_admin.standin import STANDIN_PASSWORD, STANDIN_USERNAME, XxlStandin
+
+
+class StandinApp(object):
+    """
+    把XxlStandin的接口包装成ASGI应用，每个请求固定延迟latency_ms模拟网关转发耗时，
+    按客户端地址统计连接数、按协议统计请求数
+    """
+
+    def __init__(self, standin: XxlStandin, latency_ms: float) -> None:
+        self.standin = standin
+        self.latency_ms = latency_ms
+        self.connections: Set[Tuple[str, int]] = set()
+        self.versions: Counter = Counter()
+
+    def reset(self):
+        self.connections.clear()
+        self.versions.clear()
+
+    async def __call__(self, scope: Dict, receive: Callable[[], Awaitable[Dict]], send: Callable[[Dict], Awaitable]):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        self.connections.add(tuple(scope["client"]))
+        self.versions[scope["http_version"]] += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        form = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+        content = json.dumps(self.standin.handle(scope["path"], form), ensure_ascii=False).encode("utf-8")
+        headers = [(b"content-type", b"application/json;charset=UTF-8")]
+        if scope["path"].endswith("/login"):
+            headers.append((b"set-cookie", b"XXL_JOB_LOGIN_IDENTITY=standin; Path=/"))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+
+class Http2Standin(object):
+    """
+    在独立线程中运行hypercorn，监听clusters个端口（每个端口当作一个集群），证书由trustme临时签发
+    """
+
+    def __init__(self, app: StandinApp, clusters: int, workdir: str) -> None:
+        self.app = app
+        self.clusters = clusters
+        self.workdir = workdir
+        self.ca_file = os.path.join(workdir, "ca.pem")
+        self._loop = None
+        self._shutdown = None
+        self._thread = None
+
+    def _config(self) -> Tuple[Config, List[int]]:
+        ca = trustme.CA()
+        ca.cert_pem.write_to_path(self.ca_file)
+        cert = ca.issue_cert("127.0.0.1", "localhost")
+        cert_file = os.path.join(self.workdir, "server.pem")
+        cert.private_key_and_cert_chain_pem.write_to_path(cert_file)
+        config = Config()
+        config.certfile = config.keyfile = cert_file
+        config.alpn_protocols = ["h2", "http/1.1"]
+        config.loglevel = "WARNING"
+        # 用随机端口，事先绑定好再把文件描述符交给hypercorn，由它负责关闭
+        sockets = [socket.create_server(("127.0.0.1", 0)) for _ in range(self.clusters)]
+        ports = [sock.getsockname()[1] for sock in sockets]
+        config.bind = [f"fd://{sock.detach()}" for sock in sockets]
+        return config, ports
+
+    async def _serve(self, config: Config, started: threading.Event):
+        self._loop = asyncio.get_running_loop()
+        self._shutdown = asyncio.Event()
+        self._loop.call_soon(started.set)
+        await serve(self.app, config, shutdown_trigger=self._shutdown.wait)
+
+    def start_in_thread(self) -> List[str]:
+        config, ports = self._config()
+        started = threading.Event()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve(config, started)), name="xxl-h2-standin", daemon=True
+        )
+        self._thread.start()
+        if not started.wait(10):
+            raise RuntimeError("本地HTTP/2模拟调度中心启动失败")
+        return [f"https://localhost:{port}" for port in ports]
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._shutdown.set)
+            self._thread.join(5)
+
+
+def new_client(base_url: str, http2: bool, cookie_dir: str) -> XxlAdminClient:
+    # 连接池配置与XxlEnvSettings的默认值一致
+    settings = XxlEnvSettings()
+    limits = Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    return XxlAdminClient(
+        base_url,
+        username=STANDIN_USERNAME,
+        password=STANDIN_PASSWORD,
+        cookie_dir=cookie_dir,
+        http2=http2,
+        limits=limits,
+        timeout=settings.timeout,
+    )
+
+
+async def sequential_pages(clients: List[XxlAdminClient], jobs: int, page_size: int):
+    async for _ in clients[0].iter_jobs(page_size=page_size):
+        pass
+
+
+async def parallel_pages(clients: List[XxlAdminClient], jobs: int, page_size: int):
+    await asyncio.gather(*[clients[0].list_job(start=start, length=page_size) for start in range(0, jobs, page_size)])
+
+
+async def fan_out_catalogs(clients: List[XxlAdminClient], jobs: int, page_size: int):
+    fanout = XxlFanout(Console(file=io.StringIO()))
+    results = await fanout.run({str(i): c.cached_jobs(max_age=0) for i, c in enumerate(clients)})
+    failed = [r.error for r in results.values() if not r.ok]
+    if failed:
+        raise failed[0]
+
+
+# (名称, 场景, 使用的集群数)，None表示全部集群
+SCENARIOS = [
+    ("顺序翻页", sequential_pages, 1),
+    ("并行翻页", parallel_pages, 1),
+    ("多集群fan-out", fan_out_catalogs, None),
+]
+
+
+async def measure(app: StandinApp, base_urls: List[str], scenario, http2: bool, args, cookie_dir: str) -> Tuple:
+    _, run, cluster_count = scenario
+    clients = [new_client(url, http2, cookie_dir) for url in base_urls[:cluster_count]]
+    try:
+        # 登录和TLS握手不计入耗时
+        await asyncio.gather(*[c.login() for c in clients])
+        app.reset()
+        begin = time.perf_counter()
+        for _ in range(args.rounds):
+            await run(clients, args.jobs, args.page_size)
+        elapsed = time.perf_counter() - begin
+    finally:
+        for c in clients:
+            await c.close()
+    requests = sum(app.versions.values())
+    version = ",".join(f"HTTP/{v}" for v in sorted(app.versions))
+    return elapsed, requests, requests / elapsed, len(app.connections), version
+
+
+async def compare(app: StandinApp, base_urls: List[str], args, cookie_dir: str) -> Table:
+    table = Table(title=f"{args.jobs}个任务，每页{args.page_size}条，请求延迟{args.latency:g}ms，每个场景{args.rounds}轮")
+    for header in ("场景", "集群", "协议", "总耗时", "请求数", "吞吐", "连接数"):
+        table.add_column(header, style="cyan", justify="left" if header in ("场景", "协议") else "right")
+    for scenario in SCENARIOS:
+        clusters = len(base_urls[: scenario[2]])
+        for http2 in (False, True):
+            elapsed, requests, throughput, connections, version = await measure(
+                app, base_urls, scenario, http2, args, cookie_dir
+            )
+            table.add_row(
+                scenario[0],
+                str(clusters),
+                version,
+                f"{elapsed:.2f} s",
+                str(requests),
+                f"{throughput:.0f} req/s",
+                str(connections),
+            )
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比HTTP/1.1与HTTP/2访问调度中心的翻页和fan-out吞吐")
+    parser.add_argument("--jobs", type=int, default=2000, help="模拟调度中心的任务数")
+    parser.add_argument("--page-size", type=int, default=100, help="顺序/并行翻页的每页条数")
+    parser.add_argument("--latency", type=float, default=20, help="每个请求的服务端延迟（毫秒），模拟网关转发")
+    parser.add_argument("--clusters", type=int, default=4, help="fan-out场景的集群数")
+    parser.add_argument("--rounds", type=int, default=5, help="每个场景重复的轮数")
+    args = parser.parse_args()
+    app = StandinApp(XxlStandin(handlers=[f"benchJobHandler{i}" for i in range(args.jobs)]), args.latency)
+    with tempfile.TemporaryDirectory(prefix="xxl-h2-bench-") as workdir:
+        server = Http2Standin(app, args.clusters, workdir)
+        base_urls = server.start_in_thread()
+        # 让httpx信任临时CA签发的证书
+        os.environ["SSL_CERT_FILE"] = server.ca_file
+        try:
+            Console().print(asyncio.run(compare(app, base_urls, args, workdir)))
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+对本地模拟调度中心分别用不复用连接的HTTP/1.1客户端和keep-alive连接池发起同样的请求，对比吞吐和耗时
+
+    pdm run bench-http
+    python benchmarks/http_pool.py --requests 5000 --concurrency 1 --concurrency 50
+"""
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import List, Tuple
+
+from httpx import Limits
+from rich.console import Console
+from rich.table import Table
+
+from xxl_admin.bench import percentile
+from xxl_admin.client import XxlAdminClient
+from xxl_admin.standin import STANDIN_PASSWORD, STANDIN_USERNAME, XxlStandin
+
+
+def scenarios(concurrency: int) -> List[Tuple[str, Limits]]:
+    return [
+        # 不保留空闲连接，每个请求都重新建立TCP连接
+        ("HTTP/1.1 每次新建连接", Limits(max_connections=concurrency, max_keepalive_connections=0)),
+        ("HTTP/1.1 连接池", Limits(max_connections=concurrency, max_keepalive_connections=concurrency)),
+    ]
+
+
+async def measure(base_url: str, limits: Limits, requests: int, concurrency: int, cookie_dir: str) -> Tuple:
+    client = XxlAdminClient(
+        base_url, username=STANDIN_USERNAME, password=STANDIN_PASSWORD, cookie_dir=cookie_dir, limits=limits
+    )
+    # 登录不计入耗时
+    await client.login()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def request():
+        async with semaphore:
+            begin = time.perf_counter()
+            await client.list_job(length=50)
+            latencies.append(time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    try:
+        await asyncio.gather(*[request() for _ in range(requests)])
+    finally:
+        await client.close()
+    elapsed = time.perf_counter() - begin
+    latencies.sort()
+    return elapsed, requests / elapsed, percentile(latencies, 50), percentile(latencies, 99)
+
+
+async def compare(base_url: str, requests: int, concurrency_list: List[int]) -> Table:
+    table = Table(title=f"每种连接方式{requests}个请求")
+    for header in ("并发", "连接方式", "总耗时", "吞吐", "P50", "P99"):
+        table.add_column(header, style="cyan", justify="left" if header == "连接方式" else "right")
+    with tempfile.TemporaryDirectory() as cookie_dir:
+        for concurrency in concurrency_list:
+            for name, limits in scenarios(concurrency):
+                elapsed, throughput, p50, p99 = await measure(base_url, limits, requests, concurrency, cookie_dir)
+                table.add_row(
+                    str(concurrency),
+                    name,
+                    f"{elapsed:.2f} s",
+                    f"{throughput:.0f} req/s",
+                    f"{p50 * 1000:.1f} ms",
+                    f"{p99 * 1000:.1f} ms",
+                )
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比不复用连接与连接池访问调度中心的吞吐")
+    parser.add_argument("--requests", type=int, default=2000, help="每种连接方式的请求数")
+    parser.add_argument("--concurrency", type=int, action="append", help="并发请求数（支持多个），默认1、4、20")
+    parser.add_argument("--jobs", type=int, default=50, help="模拟调度中心的任务数，决定每个响应的大小")
+    args = parser.parse_args()
+    standin = XxlStandin(handlers=[f"benchJobHandler{i}" for i in range(args.jobs)])
+    base_url = standin.start_in_thread()
+    try:
+        Console().print(asyncio.run(compare(base_url, args.requests, args.concurrency or [1, 4, 20])))
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
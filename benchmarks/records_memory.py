@@ -0,0 +1,105 @@
+"""
+对比任务目录解析成dict列表与解析成JobInfo记录的内存占用（tracemalloc），数据为生成的jobinfo/pageList响应
+
+    pdm run bench-records
+    python benchmarks/records_memory.py --jobs 50000 --version 2.2
+"""
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from xxl_admin.models import JobInfo, decode_records
+from xxl_admin.utils import json_loads
+
+AUTHORS = ["admin", "tom", "jerry", "spike", "tyke"]
+ROUTES = ["FIRST", "ROUND", "RANDOM", "SHARDING_BROADCAST"]
+
+
+def job_payload(count: int, version: str) -> bytes:
+    """
+    生成与调度中心返回格式一致的任务列表响应，2.2只有jobCron
+    """
+    rows = []
+    for i in range(1, count + 1):
+        row = {
+            "id": i,
+            "jobGroup": i % 20 + 1,
+            "jobDesc": f"示例任务{i}",
+            "addTime": "2024-01-01T00:00:00.000+0000",
+            "updateTime": "2024-01-01T00:00:00.000+0000",
+            "author": AUTHORS[i % len(AUTHORS)],
+            "alarmEmail": "",
+            "executorRouteStrategy": ROUTES[i % len(ROUTES)],
+            "executorHandler": f"demoJobHandler{i}",
+            "executorParam": f"param-{i}" if i % 3 == 0 else "",
+            "executorBlockStrategy": "SERIAL_EXECUTION",
+            "executorTimeout": 0,
+            "executorFailRetryCount": i % 3,
+            "glueType": "BEAN",
+            "glueSource": "",
+            "glueRemark": "GLUE代码初始化",
+            "glueUpdatetime": "2024-01-01T00:00:00.000+0000",
+            "childJobId": "",
+            "triggerStatus": i % 2,
+            "triggerLastTime": 1704067200000,
+            "triggerNextTime": 1704153600000,
+        }
+        if version == "2.2":
+            row["jobCron"] = "0 0 2 * * ?"
+        else:
+            row.update(scheduleType="CRON", scheduleConf="0 0 2 * * ?", misfireStrategy="DO_NOTHING")
+        rows.append(row)
+    return json.dumps({"recordsTotal": count, "recordsFiltered": count, "data": rows}, ensure_ascii=False).encode()
+
+
+def measure(decode: Callable[[bytes], List], content: bytes) -> Tuple[int, int, float]:
+    """
+    返回(解析结果常驻内存, 解析过程峰值内存, 耗时)，不含响应本身
+    """
+    gc.collect()
+    tracemalloc.start()
+    begin = time.perf_counter()
+    records = decode(content)
+    elapsed = time.perf_counter() - begin
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) > 0
+    del records
+    return retained, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比dict与JobInfo记录解析任务目录的内存占用")
+    parser.add_argument("--jobs", type=int, default=50000, help="任务数")
+    parser.add_argument("--version", choices=["2.2", "2.4"], default="2.4", help="模拟的调度中心版本")
+    args = parser.parse_args()
+    content = job_payload(args.jobs, args.version)
+
+    cases = [
+        ("dict列表（json.loads）", lambda c: json.loads(c)["data"]),
+        (f"JobInfo记录（{json_loads.__module__}）", lambda c: decode_records(JobInfo, c)),
+    ]
+    table = Table(title=f"{args.jobs}个任务，响应{len(content) / 1024 / 1024:.1f} MB")
+    for header in ("解析方式", "常驻内存", "峰值内存", "每条记录", "耗时"):
+        table.add_column(header, style="cyan", justify="left" if header == "解析方式" else "right")
+    for name, decode in cases:
+        retained, peak, elapsed = measure(decode, content)
+        table.add_row(
+            name,
+            f"{retained / 1024 / 1024:.1f} MB",
+            f"{peak / 1024 / 1024:.1f} MB",
+            f"{retained / args.jobs:.0f} B",
+            f"{elapsed * 1000:.0f} ms",
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import math
+import time
+import uuid
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from .client import XxlAdminClient
+from .models import JobInfo, JobLog
+from .utils import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BenchReport", "XxlBench", "percentile"]
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """
+    最近秩法求百分位数，values需已排序
+    """
+    if not values:
+        return None
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return time.mktime(time.strptime(value[:19], TIME_FORMAT))
+    except (ValueError, TypeError):
+        return None
+
+
+class BenchReport(object):
+    def __init__(self, rate: float, duration: float) -> None:
+        self.rate = rate
+        self.duration = duration
+        self.sent = 0
+        self.accepted = 0
+        self.rejected = 0
+        # 异常类型 -> 次数
+        self.errors: Dict[str, int] = {}
+        self.send_elapsed = 0.0
+        # 触发请求往返耗时（秒）
+        self.trigger_latencies: List[float] = []
+        # 调度日志中执行时间 - 调度时间（秒，调度中心只记录到秒）
+        self.handle_latencies: List[float] = []
+        # 已接受但调度日志里找不到，视为丢失
+        self.missing = 0
+        self.trigger_failed = 0
+        self.handle_failed = 0
+        self.unfinished = 0
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def send_rate(self) -> float:
+        # 明显低于目标速率时说明压测端本身是瓶颈
+        return self.sent / self.send_elapsed if self.send_elapsed > 0 else 0.0
+
+    @property
+    def accepted_rate(self) -> float:
+        return self.accepted / self.send_elapsed if self.send_elapsed > 0 else 0.0
+
+
+class XxlBench(object):
+    """
+    开环压测：按令牌桶速率发起触发，不等待上一个请求返回；
+    每次触发带唯一的任务参数，结束后按参数关联调度日志统计调度和执行结果
+    """
+
+    def __init__(
+        self,
+        client: XxlAdminClient,
+        job: JobInfo,
+        rate: float,
+        duration: float,
+        settle: float = 30.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        self.client = client
+        self.job = job
+        self.rate = rate
+        self.duration = duration
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.tag = f"bench-{uuid.uuid4().hex[:8]}"
+        self.report = BenchReport(rate, duration)
+        self._accepted: Set[str] = set()
+
+    async def _trigger(self, seq: int):
+        param = f"{self.tag}-{seq}"
+        report = self.report
+        begin = time.perf_counter()
+        try:
+            ok = await self.client.trigger_job(job_id=self.job.id, param=param)
+        except Exception as e:
+            logger.error(f"bench trigger failed: {e!r}")
+            name = type(e).__name__
+            report.errors[name] = report.errors.get(name, 0) + 1
+            return
+        report.trigger_latencies.append(time.perf_counter() - begin)
+        if ok:
+            report.accepted += 1
+            self._accepted.add(param)
+        else:
+            report.rejected += 1
+
+    async def run(self) -> BenchReport:
+        # 登录不计入压测时间
+        await self.client.login()
+        bucket = TokenBucket(self.rate, capacity=1)
+        started_at = time.time()
+        begin = time.perf_counter()
+        in_flight: Set[asyncio.Task] = set()
+        try:
+            for seq in range(max(int(self.rate * self.duration), 1)):
+                await bucket.acquire()
+                task = asyncio.ensure_future(self._trigger(seq))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                self.report.sent += 1
+            self.report.send_elapsed = time.perf_counter() - begin
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+        self.report.trigger_latencies.sort()
+        self._correlate(await self._collect(started_at))
+        return self.report
+
+    def _finished(self, log: JobLog) -> bool:
+        return log.trigger_code not in (0, 200) or log.handle_code != 0
+
+    async def _collect(self, started_at: float) -> Dict[str, JobLog]:
+        """
+        轮询调度日志直到所有已接受的触发都执行完成，最多等待settle秒
+        """
+        deadline = time.monotonic() + self.settle
+        # 调度时间只精确到秒，起止各放宽1秒
+        start = time.strftime(TIME_FORMAT, time.localtime(started_at - 1))
+        found: Dict[str, JobLog] = {}
+        while True:
+            end = time.strftime(TIME_FORMAT, time.localtime(time.time() + 1))
+            async for page in self.client.iter_job_logs(
+                job_id=self.job.id, filter_time=f"{start} - {end}", page_size=200
+            ):
+                for log in page:
+                    if log.executor_param in self._accepted:
+                        found[log.executor_param] = log
+            pending = [p for p in self._accepted if p not in found or not self._finished(found[p])]
+            if not pending or time.monotonic() >= deadline:
+                return found
+            await asyncio.sleep(self.poll_interval)
+
+    def _correlate(self, found: Dict[str, JobLog]):
+        report = self.report
+        report.missing = len(self._accepted - found.keys())
+        for log in found.values():
+            if log.trigger_code not in (0, 200):
+                report.trigger_failed += 1
+            elif log.handle_code == 0:
+                report.unfinished += 1
+            elif log.handle_code != 200:
+                report.handle_failed += 1
+            trigger_time, handle_time = _parse_time(log.trigger_time), _parse_time(log.handle_time)
+            if trigger_time is not None and handle_time is not None:
+                report.handle_latencies.append(handle_time - trigger_time)
+        report.handle_latencies.sort()
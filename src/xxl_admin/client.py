@@ -1,19 +1,52 @@
+import time
+import asyncio
 import logging
 import inspect
-from httpx import AsyncClient
+import importlib.util
+from httpx import AsyncClient, Limits
 from pathlib import Path
+from typing import AsyncIterator, List, Optional
 from http.cookiejar import LWPCookieJar
 
-from .utils import md5, generate_default_value
+from .utils import md5, generate_default_value, json_loads
+from .store import XxlStateStore
+from .models import JobGroup, JobInfo, JobLog, decode_records
+from .protocol import XxlProtocol, detect_protocol, get_protocol
+from .nodes import NodeIndex
 
 logger = logging.getLogger(__name__)
 
+class XxlAdminError(Exception):
+    """
+    调度中心返回了非200或无法解析的分页响应
+    """
+
+
+# 需要额外解码包的压缩算法（任一可用即可）
+_ENCODING_MODULES = {"br": ("brotli", "brotlicffi"), "zstd": ("zstandard",)}
+
 
 class XxlAdminClient(object):
-    def __init__(self, base_url, username: str = "", password: str = "", cookie_dir: str = None) -> None:
+    # 目录缓存有效期（秒）
+    CATALOG_TTL = 300
+
+    def __init__(
+        self,
+        base_url,
+        username: str = "",
+        password: str = "",
+        cookie_dir: str = None,
+        store: XxlStateStore = None,
+        http2: bool = False,
+        compression: List[str] = None,
+        limits: Limits = None,
+        timeout: float = 10.0,
+        proxy: str = None,
+    ) -> None:
         self.base_url = base_url
         self.username = username
         self.password = password
+        self.store = store
         if cookie_dir and len(cookie_dir) > 0:
             self.cookie_dir = cookie_dir
         else:
@@ -21,9 +54,36 @@ class XxlAdminClient(object):
         self.cookie_path = Path(self.cookie_dir) / f"{str(md5(self.base_url))}.cookies"
 
         self.is_logged_in = False
-        self._client = AsyncClient(base_url=self.base_url)
+        self._version: Optional[str] = None
+        options = self._transport_options(http2, compression, limits, timeout, proxy)
+        self._client = AsyncClient(base_url=self.base_url, **options)
         self._client.cookies.jar = LWPCookieJar(filename=self.cookie_path)
 
+    @staticmethod
+    def _transport_options(http2: bool, compression: List[str], limits: Limits, timeout: float, proxy: str) -> dict:
+        options = {"timeout": timeout}
+        if http2:
+            if importlib.util.find_spec("h2") is None:
+                logger.warning("h2 not installed, fallback to HTTP/1.1. install with: pip install httpx[http2]")
+            else:
+                options["http2"] = True
+        if compression:
+            encodings = []
+            for encoding in compression:
+                # httpx需要额外的包才能解码br/zstd，缺少时不声明支持
+                module = _ENCODING_MODULES.get(encoding)
+                if module and not any(importlib.util.find_spec(m) for m in module):
+                    logger.warning(f"{encoding} decoder not installed, ignored")
+                    continue
+                encodings.append(encoding)
+            if encodings:
+                options["headers"] = {"Accept-Encoding": ", ".join(encodings)}
+        if limits:
+            options["limits"] = limits
+        if proxy:
+            options["proxy"] = proxy
+        return options
+
     def _required_login(func):
         async def wrapper(self: "XxlAdminClient", *args, **kwargs):
             login_ok = True
@@ -37,12 +97,46 @@ class XxlAdminClient(object):
 
         return wrapper
 
-    async def login(self) -> bool:
-        if self.is_logged_in:
-            return True
+    def _load_session(self):
+        if self.store:
+            for c in self.store.load_session(self.base_url, self.username):
+                self._client.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+            return
         if self.cookie_path.exists():
             self._client.cookies.jar.load(ignore_discard=True, ignore_expires=True)
         self._client.cookies.jar.clear_expired_cookies()
+
+    def _save_session(self):
+        if self.store:
+            cookies = [
+                {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires}
+                for c in self._client.cookies.jar
+            ]
+            self.store.save_session(self.base_url, self.username, cookies)
+            return
+        self._client.cookies.jar.save(ignore_discard=True, ignore_expires=False)
+
+    @staticmethod
+    def _decode_page(record_type, response, action: str) -> list:
+        # 5xx、302跳转登录页等不能当成空列表，否则会被当成完整目录写入共享缓存
+        if response.status_code != 200:
+            raise XxlAdminError(f"{action}失败: HTTP {response.status_code}")
+        try:
+            return decode_records(record_type, response.content)
+        except ValueError:
+            raise XxlAdminError(f"{action}失败: 响应不是分页数据") from None
+
+    def _put_catalog(self, kind: str, records: list, filtered: bool, start: int, length: int):
+        if not self.store:
+            return
+        # 无过滤条件且一页能装下时才是完整目录
+        snapshot = not filtered and start == 0 and len(records) < length
+        self.store.put_catalog(self.base_url, kind, [r.to_dict() for r in records], snapshot=snapshot)
+
+    async def login(self) -> bool:
+        if self.is_logged_in:
+            return True
+        self._load_session()
         if len(self._client.cookies) > 0:
             logger.info("从本地Cookies加载会话成功")
             self.is_logged_in = True
@@ -58,12 +152,14 @@ class XxlAdminClient(object):
             logger.error("登录失败：用户名或密码不正确")
             return False
         logger.info("用户%s登录成功", username)
-        self._client.cookies.jar.save(ignore_discard=True, ignore_expires=False)
+        self._save_session()
         self.is_logged_in = True
         return True
 
     @_required_login
-    async def list_group(self, name: str = "", title: str = "", start: int = 0, length: int = 30) -> list:
+    async def list_group(
+        self, name: str = "", title: str = "", start: int = 0, length: int = 30, cache: bool = True
+    ) -> List[JobGroup]:
         payload = {"start": start, "length": length}
         if len(name) > 0:
             payload["appname"] = name
@@ -72,9 +168,63 @@ class XxlAdminClient(object):
         response = await self._client.post("/xxl-job-admin/jobgroup/pageList", data=payload)
         logger.info(f"list group request: {response.request.url} {payload}")
         logger.info(f"list group response: {response.text}")
-        if response.status_code == 200:
-            return response.json()["data"]
-        return []
+        data = self._decode_page(JobGroup, response, "查询执行器")
+        if cache:
+            self._put_catalog("group", data, filtered=len(name) > 0 or len(title) > 0, start=start, length=length)
+        return data
+
+    async def _fetch_snapshot(self, kind: str, fetch, page_size: int) -> list:
+        """
+        拉取完整目录，全部页成功后才写入快照；任一页失败或登录失败时抛出XxlAdminError，保留原有快照
+        """
+        records = []
+        # 逐页不再重复写缓存，整个目录拉完后一次写入
+        async for page in self._paginate(fetch, page_size=page_size, cache=False):
+            records.extend(page)
+        if not self.is_logged_in:
+            # 登录失败时拿到的是空列表，不能当成完整目录
+            raise XxlAdminError("登录失败")
+        if self.store:
+            self.store.put_catalog(self.base_url, kind, [r.to_dict() for r in records], snapshot=True)
+        return records
+
+    def has_fresh_catalog(self, kind: str, max_age: float = CATALOG_TTL) -> bool:
+        """
+        本地是否有未过期的完整目录快照
+        """
+        if not self.store:
+            return False
+        refreshed_at = self.store.catalog_refreshed_at(self.base_url, kind)
+        return refreshed_at is not None and time.time() - refreshed_at <= max_age
+
+    async def cached_groups(self, max_age: float = CATALOG_TTL) -> List[JobGroup]:
+        """
+        优先使用本地共享缓存的执行器目录，缓存失效时拉取全部执行器
+        """
+        if self.store:
+            cached = self.store.get_catalog(self.base_url, "group", max_age=max_age)
+            if cached is not None:
+                return [JobGroup.from_dict(g) for g in cached]
+        return await self._fetch_snapshot("group", self.list_group, page_size=200)
+
+    async def cached_jobs(self, max_age: float = CATALOG_TTL) -> List[JobInfo]:
+        """
+        优先使用本地共享缓存的任务目录，缓存失效时拉取全部任务
+        """
+        if self.store:
+            cached = self.store.get_catalog(self.base_url, "job", max_age=max_age)
+            if cached is not None:
+                return [JobInfo.from_dict(j) for j in cached]
+        return await self._fetch_snapshot("job", self.list_job, page_size=500)
+
+    async def node_index(self, with_jobs: bool = True, max_age: float = CATALOG_TTL) -> NodeIndex:
+        """
+        基于目录缓存构建节点索引，with_jobs=False时不统计任务数
+        """
+        if not with_jobs:
+            return NodeIndex(await self.cached_groups(max_age))
+        groups, jobs = await asyncio.gather(self.cached_groups(max_age), self.cached_jobs(max_age))
+        return NodeIndex(groups, jobs)
 
     @_required_login
     async def list_job(
@@ -86,7 +236,8 @@ class XxlAdminClient(object):
         author: str = "",
         start: int = 0,
         length: int = 30,
-    ) -> list:
+        cache: bool = True,
+    ) -> List[JobInfo]:
         payload = {
             "executorHandler": executor,
             "jobDesc": job_desc,
@@ -99,9 +250,12 @@ class XxlAdminClient(object):
         response = await self._client.post("/xxl-job-admin/jobinfo/pageList", data=payload)
         logger.info(f"list job request: {response.request.url} {payload}")
         logger.info(f"list job response: {response.text}")
-        if response.status_code == 200:
-            return response.json()["data"]
-        return []
+        data = self._decode_page(JobInfo, response, "查询任务")
+        self._detect_version(response.content)
+        filtered = any([executor, job_desc, author]) or job_group > 0 or status >= 0
+        if cache:
+            self._put_catalog("job", data, filtered=filtered, start=start, length=length)
+        return data
 
     @_required_login
     async def job_logs(
@@ -112,7 +266,7 @@ class XxlAdminClient(object):
         filter_time: str = "",
         start: int = 0,
         length: int = 30,
-    ) -> list:
+    ) -> List[JobLog]:
         payload = {
             "jobId": job_id,
             "jobGroup": job_group,
@@ -124,12 +278,58 @@ class XxlAdminClient(object):
         response = await self._client.post("/xxl-job-admin/joblog/pageList", data=payload)
         logger.info(f"job logs request: {response.request.url} {payload}")
         logger.info(f"job logs response: {response.text}")
-        if response.status_code == 200:
-            return response.json()["data"]
-        return []
+        return self._decode_page(JobLog, response, "查询调度日志")
+
+    @staticmethod
+    async def _paginate(fetch, start: int = 0, page_size: int = 100, **kwargs) -> AsyncIterator[list]:
+        while True:
+            page = await fetch(start=start, length=page_size, **kwargs)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            start += page_size
+
+    def iter_groups(self, name: str = "", page_size: int = 100) -> AsyncIterator[List[JobGroup]]:
+        """
+        逐页拉取执行器列表
+        """
+        return self._paginate(self.list_group, page_size=page_size, name=name)
+
+    def iter_jobs(
+        self, executor: str = "", job_group: int = -1, status: int = -1, page_size: int = 100
+    ) -> AsyncIterator[List[JobInfo]]:
+        """
+        逐页拉取任务列表
+        """
+        return self._paginate(
+            self.list_job, page_size=page_size, executor=executor, job_group=job_group, status=status
+        )
+
+    def iter_job_logs(
+        self,
+        job_id: int = 0,
+        job_group: int = 0,
+        log_status: int = -1,
+        filter_time: str = "",
+        start: int = 0,
+        page_size: int = 100,
+    ) -> AsyncIterator[List[JobLog]]:
+        """
+        逐页拉取调度日志，job_id和job_group都为0表示所有任务
+        """
+        return self._paginate(
+            self.job_logs,
+            start=start,
+            page_size=page_size,
+            job_id=job_id,
+            job_group=job_group,
+            log_status=log_status,
+            filter_time=filter_time,
+        )
 
     @_required_login
-    async def search_job(self, executor: str) -> list:
+    async def search_job(self, executor: str) -> List[JobInfo]:
         data = await self.list_job(executor=executor)
         return data
 
@@ -143,88 +343,108 @@ class XxlAdminClient(object):
         logger.info(f"trigger job response: {response.text}")
         if response.status_code != 200:
             return False
-        return response.json()["code"] == 200
+        return json_loads(response.content)["code"] == 200
+
+    async def _save_job(self, path: str, payload: dict, action: str) -> bool:
+        response = await self._client.post(path, data=payload)
+        logger.info(f"{action} job request: {response.request.url} {payload}")
+        logger.info(f"{action} job response: {response.text}")
+        # 任务目录缓存里的状态、配置已经过期，下次查询重新拉取
+        if self.store:
+            self.store.invalidate_catalog(self.base_url, "job")
+        if response.status_code != 200:
+            return False
+        return json_loads(response.content)["code"] == 200
 
     @_required_login
     async def start_job(self, job_id: int) -> bool:
         if job_id <= 0:
             return False
-        payload = {"id": job_id}
-        response = await self._client.post("/xxl-job-admin/jobinfo/start", data=payload)
-        logger.info(f"start job request: {response.request.url} {payload}")
-        logger.info(f"start job response: {response.text}")
-        if response.status_code != 200:
-            return False
-        return response.json()["code"] == 200
+        return await self._save_job("/xxl-job-admin/jobinfo/start", {"id": job_id}, "start")
 
     @_required_login
     async def stop_job(self, job_id: int) -> bool:
         if job_id <= 0:
             return False
-        payload = {"id": job_id}
-        response = await self._client.post("/xxl-job-admin/jobinfo/stop", data=payload)
-        logger.info(f"stop job request: {response.request.url} {payload}")
-        logger.info(f"stop job response: {response.text}")
-        if response.status_code != 200:
+        return await self._save_job("/xxl-job-admin/jobinfo/stop", {"id": job_id}, "stop")
+
+    @property
+    def version(self) -> Optional[str]:
+        """
+        调度中心版本（2.2/2.4），从任务列表响应中识别并缓存，未知时为None
+        """
+        if self._version is None and self.store:
+            self._version = self.store.get_meta(f"version:{self.base_url}")
+        return self._version
+
+    def _detect_version(self, content: bytes):
+        version = detect_protocol(content)
+        if version is None or version == self._version:
+            return
+        self._version = version
+        if self.store:
+            self.store.set_meta(f"version:{self.base_url}", version)
+
+    async def protocol(self) -> XxlProtocol:
+        if self.version is None:
+            # 缓存里没有版本信息时拉一条任务识别
+            await self.list_job(length=1)
+        return get_protocol(self.version)
+
+    @_required_login
+    async def add_job(self, job: JobInfo) -> bool:
+        if job.job_group <= 0:
             return False
-        return response.json()["code"] == 200
+        payload = (await self.protocol()).job_payload(job.replace(id=0))
+        return await self._save_job("/xxl-job-admin/jobinfo/add", payload, "add new")
 
     @_required_login
-    async def add_job(self, job_group: int, job_desc: str, executor: str, cron: str, author: str) -> bool:
-        if job_group <= 0:
+    async def update_job(self, job: JobInfo) -> bool:
+        """
+        job需基于查询到的完整任务修改，未修改的配置（路由、重试、超时等）原样提交
+        """
+        if job.id <= 0 or job.job_group <= 0:
             return False
-        payload = {
-            "jobGroup": job_group,
-            "jobDesc": job_desc,
-            "cronGen_display": cron,
-            "jobCron": cron,
-            "scheduleType": "CRON",  # 2.4.*
-            "scheduleConf": cron,  # 2.4.*
-            "glueType": "BEAN",
-            "executorHandler": executor,
-            "executorRouteStrategy": "FIRST",
-            "executorBlockStrategy": "SERIAL_EXECUTION",
-            "misfireStrategy": "DO_NOTHING",
-            "author": author,
-            "executorTimout": 0,
-            "executorFailRetryCount": 0,
-        }
-        response = await self._client.post("/xxl-job-admin/jobinfo/add", data=payload)
-        logger.info(f"add new job request: {response.request.url} {payload}")
-        logger.info(f"add new job response: {response.text}")
+        payload = (await self.protocol()).job_payload(job)
+        return await self._save_job("/xxl-job-admin/jobinfo/update", payload, "update")
+
+    async def _save_group(self, path: str, group: JobGroup) -> bool:
+        # 执行器表单各版本一致，不需要识别版本
+        payload = get_protocol(self.version).group_payload(group)
+        response = await self._client.post(path, data=payload)
+        logger.info(f"save group request: {response.request.url} {payload}")
+        logger.info(f"save group response: {response.text}")
+        if self.store:
+            self.store.invalidate_catalog(self.base_url, "group")
         if response.status_code != 200:
             return False
-        return response.json()["code"] == 200
+        return json_loads(response.content)["code"] == 200
 
     @_required_login
-    async def update_job(
-        self, job_id: int, job_group: int, job_desc: str, executor: str, cron: str, author: str
-    ) -> bool:
-        if job_id <= 0 or job_group <= 0:
+    async def add_group(self, group: JobGroup) -> bool:
+        if not group.appname:
             return False
-        payload = {
-            "id": job_id,
-            "jobGroup": job_group,
-            "jobDesc": job_desc,
-            "cronGen_display": cron,
-            "jobCron": cron,  # 2.2.*
-            "scheduleType": "CRON",  # 2.4.*
-            "scheduleConf": cron,  # 2.4.*
-            "glueType": "BEAN",
-            "executorHandler": executor,
-            "executorRouteStrategy": "FIRST",
-            "executorBlockStrategy": "SERIAL_EXECUTION",
-            "author": author,
-            "misfireStrategy": "DO_NOTHING",
-            "executorTimout": 0,
-            "executorFailRetryCount": 0,
-        }
-        response = await self._client.post("/xxl-job-admin/jobinfo/update", data=payload)
-        logger.info(f"update job request: {response.request.url} {payload}")
-        logger.info(f"update job response: {response.text}")
+        return await self._save_group("/xxl-job-admin/jobgroup/save", group.replace(id=0))
+
+    @_required_login
+    async def update_group(self, group: JobGroup) -> bool:
+        if group.id <= 0:
+            return False
+        return await self._save_group("/xxl-job-admin/jobgroup/update", group)
+
+    @_required_login
+    async def remove_group(self, group_id: int) -> bool:
+        if group_id <= 0:
+            return False
+        payload = {"id": group_id}
+        response = await self._client.post("/xxl-job-admin/jobgroup/remove", data=payload)
+        logger.info(f"remove group request: {response.request.url} {payload}")
+        logger.info(f"remove group response: {response.text}")
+        if self.store:
+            self.store.invalidate_catalog(self.base_url, "group")
         if response.status_code != 200:
             return False
-        return response.json()["code"] == 200
+        return json_loads(response.content)["code"] == 200
 
     async def close(self):
         await self._client.aclose()
@@ -1,30 +1,83 @@
 import asyncio
 import arrow
 import inspect
-import socket
+import logging
+import tempfile
+import time
 import typer
 from asyncio import create_task, gather
 from functools import wraps
 from rich import print, print_json
-from rich.table import Table
-from rich.console import Console
-from rich.prompt import Prompt
-from typing import Annotated, Dict, Optional, List
+from rich.markup import escape
+from rich.prompt import Prompt, Confirm
+from typing import Annotated, Any, AsyncIterator, Awaitable, Callable, Dict, Optional, List, Tuple
 
 from .settings import XxlEnvSettings
 from .context import XxlContext
-from .utils import highlight
+from .utils import highlight, TokenBucket
 from .client import XxlAdminClient
+from .models import JobGroup, JobInfo, JobLog, LOG_STATUS_FAILED, LOG_STATUS_RUNNING, LOG_STATUS_SUCCESS
+from .profiler import XxlProfiler
+from .executor import XxlExecutorClient
+from .export import XxlLogExporter
+from .dashboard import XxlDashboard
+from .merge import prefetch_records, sorted_records, merge_streams, dedupe_merged, peek_records, resume_stream
+from .render import ColumnSpec, TableSchema
+from .fanout import STATUS_FAILED, STATUS_TIMEOUT, FanoutInterrupted, XxlFanout
+from .bench import BenchReport, XxlBench, percentile
+from .standin import STANDIN_PASSWORD, STANDIN_USERNAME, XxlStandin
+from .watch import (
+    CHANGE_CREATED,
+    CHANGE_DELETED,
+    CHANGE_CRON,
+    CHANGE_TOGGLED,
+    CHANGE_AUTHOR,
+    ChangeEvent,
+    JsonLinesWriter,
+    XxlChangeWatcher,
+)
+from .query import (
+    QueryPlan,
+    job_pages,
+    job_predicates,
+    log_predicates,
+    plan_job_query,
+    plan_log_query,
+    query_job_logs,
+    query_jobs,
+)
+from .groups import (
+    ACTION_CREATE,
+    ACTION_REMOVE,
+    ACTION_UPDATE,
+    GroupChange,
+    apply_changes,
+    diff_groups,
+    load_group_specs,
+)
 
+logger = logging.getLogger(__name__)
 
 __all__ = ["app"]
 
 
+async def _run_coroutine(coro):
+    profiler = XxlProfiler.active
+    if profiler:
+        profiler.install(asyncio.get_running_loop())
+    return await coro
+
+
 def coroutine_cmd(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
         if inspect.iscoroutinefunction(f):
-            return asyncio.run(f(*args, **kwargs))
+            try:
+                return asyncio.run(_run_coroutine(f(*args, **kwargs)))
+            except (KeyboardInterrupt, FanoutInterrupted):
+                # 不能让Ctrl-C退出整个shell
+                print("[gold1]已中断[/gold1]")
+                return None
         return f(*args, **kwargs)
 
     return wrapper
@@ -43,6 +96,125 @@ app = typer.Typer(
 config_app = typer.Typer(help="配置管理")
 group_app = typer.Typer(help="执行器管理")
 job_app = typer.Typer(help="任务管理")
+watch_app = typer.Typer(help="变更监控")
+
+CLUSTER_SCHEMA = TableSchema([ColumnSpec("集群ID"), ColumnSpec("集群地址", "green", "right")])
+GROUP_SCHEMA = TableSchema(
+    [
+        ColumnSpec("ID"),
+        ColumnSpec("AppName"),
+        ColumnSpec("名称", "magenta"),
+        ColumnSpec("注册方式", "green", "right"),
+        ColumnSpec("机器地址", "green", "right"),
+    ],
+)
+JOB_SCHEMA = TableSchema(
+    [
+        ColumnSpec("ID"),
+        ColumnSpec("执行器"),
+        ColumnSpec("描述"),
+        ColumnSpec("运行模式", "green", "center", no_wrap=True),
+        ColumnSpec("调度类型", "magenta"),
+        ColumnSpec("负责人", "green", "right"),
+        ColumnSpec("状态", "green", "right"),
+    ],
+)
+JOB_LOG_SCHEMA = TableSchema(
+    [
+        ColumnSpec("ID"),
+        ColumnSpec("调度时间"),
+        ColumnSpec("调度结果"),
+        ColumnSpec("执行时间", "green", "center", no_wrap=True),
+        ColumnSpec("执行参数", "magenta"),
+        ColumnSpec("执行结果", "magenta"),
+    ],
+)
+NODE_SCHEMA = TableSchema(
+    [
+        ColumnSpec("节点"),
+        ColumnSpec("执行器ID"),
+        ColumnSpec("AppName", "magenta"),
+        ColumnSpec("名称", "magenta"),
+        ColumnSpec("任务数", "green", "right"),
+    ],
+)
+GROUP_CHANGE_SCHEMA = TableSchema(
+    [ColumnSpec("集群"), ColumnSpec("操作", "green"), ColumnSpec("AppName", "magenta"), ColumnSpec("变更", "magenta")],
+)
+GROUP_ACTION_NAMES = {ACTION_CREATE: "新增", ACTION_UPDATE: "更新", ACTION_REMOVE: "删除"}
+RERUN_SCHEMA = TableSchema(
+    [
+        ColumnSpec("集群"),
+        ColumnSpec("任务ID"),
+        ColumnSpec("JobHandler", "magenta"),
+        ColumnSpec("执行参数", "magenta"),
+        ColumnSpec("失败次数", "red", "right"),
+        ColumnSpec("最近调度时间", "green", "right"),
+    ],
+)
+BENCH_LATENCY_SCHEMA = TableSchema(
+    [
+        ColumnSpec("集群"),
+        ColumnSpec("耗时", "magenta"),
+        ColumnSpec("样本数", justify="right"),
+        ColumnSpec("P50", "green", "right"),
+        ColumnSpec("P90", "green", "right"),
+        ColumnSpec("P99", "gold1", "right"),
+        ColumnSpec("最大", "red", "right"),
+    ],
+)
+# 单集群查询默认返回的行数
+DEFAULT_LIMIT = 30
+JOB_STATUS_OPTIONS = {"on": 1, "off": 0}
+LOG_STATUS_OPTIONS = {"success": LOG_STATUS_SUCCESS, "failed": LOG_STATUS_FAILED, "running": LOG_STATUS_RUNNING}
+
+
+async def fan_out(
+    cmd_ctx: XxlContext, calls: Dict[str, Awaitable], deadline: Optional[float] = None, partial: bool = True
+) -> Dict[str, Any]:
+    """
+    在各集群并发执行请求并显示进度，返回成功集群的结果，失败、超时和中断的集群直接打印
+    partial=False表示不接受部分结果，Ctrl-C时整个命令中断
+    """
+    fanout = XxlFanout(cmd_ctx.renderer.console, deadline=deadline)
+    results = await fanout.run(calls, partial=partial)
+    for result in results.values():
+        if not result.ok:
+            print_cluster_failure(result.cluster, result.status, result.error)
+    if fanout.interrupted:
+        print("[gold1]已中断，只显示已完成集群的结果[/gold1]")
+    return {cluster: r.value for cluster, r in results.items() if r.ok}
+
+
+def print_cluster_failure(cluster: str, status: str, error: Optional[BaseException], suffix: str = ""):
+    error = f" {escape(str(error))}" if error and str(error) else ""
+    print(f"{cluster.upper()}集群 [red]{status}[/red]{error}{suffix}")
+
+
+async def fan_out_streams(
+    cmd_ctx: XxlContext,
+    streams: Dict[str, AsyncIterator],
+    deadline: Optional[float],
+    failures: Dict[str, BaseException],
+) -> Dict[str, AsyncIterator]:
+    """
+    通过fan_out等待各集群的第一条记录（显示进度，支持--deadline，Ctrl-C时只合并已返回的集群），
+    失败、超时的集群不参与合并；之后某个集群出错或等待下一页超过deadline时只结束该集群的流，
+    错误记到failures里，合并输出结束后再打印
+    """
+    iters = {tn: stream.__aiter__() for tn, stream in streams.items()}
+    heads = await fan_out(cmd_ctx, {tn: peek_records(it) for tn, it in iters.items()}, deadline)
+
+    def on_error(cluster: str) -> Callable[[BaseException], None]:
+        return lambda e: failures.setdefault(cluster, e)
+
+    return {tn: resume_stream(head, iters[tn], on_error(tn), timeout=deadline) for tn, head in heads.items()}
+
+
+def print_stream_failures(failures: Dict[str, BaseException]):
+    for cluster, error in failures.items():
+        status = STATUS_TIMEOUT if isinstance(error, asyncio.TimeoutError) else STATUS_FAILED
+        print_cluster_failure(cluster, status, error, suffix="，该集群之后的数据未合并")
 
 
 @app.command(name="goto")
@@ -71,6 +243,57 @@ def goto(
         return
 
 
+@app.command(
+    name="profile",
+    context_settings={"allow_extra_args": True, "ignore_unknown_options": True, "allow_interspersed_args": False},
+)
+def profile(
+    ctx: typer.Context,
+    top: Annotated[int, typer.Option("-n", "--top", help="显示累计耗时前N的函数")] = 20,
+    out: Annotated[str, typer.Option("-o", "--out", help="导出pstats文件，可用snakeviz等工具离线分析")] = None,
+):
+    """
+    分析任意命令的耗时和内存，如 profile job list -a
+    """
+    if not ctx.args:
+        print("请指定要分析的命令，如 [green]profile job list -a[/green]")
+        return
+    profiler = XxlProfiler()
+    try:
+        profiler.run(app, args=ctx.args, prog_name="", standalone_mode=False, obj=ctx.obj)
+    except Exception as e:
+        print(f"命令异常：{e}")
+    cmd_ctx: XxlContext = ctx.obj
+    for table in profiler.report(limit=top):
+        cmd_ctx.renderer.print(table)
+    if out:
+        profiler.dump(out)
+        print(f"pstats已导出到：{out}")
+
+
+@app.command(name="dashboard")
+def dashboard(
+    ctx: typer.Context,
+    interval: Annotated[float, typer.Option("-i", "--interval", help="刷新间隔秒数")] = 5,
+    since: Annotated[str, typer.Option("--since", help="失败任务的调度时间范围")] = "1 hours ago",
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    全屏看板：执行器节点、最近失败和运行中的任务，Ctrl-C退出
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    board = XxlDashboard(
+        clients, since_filter_time=lambda: humanized_filter_time(since), console=cmd_ctx.renderer.console
+    )
+    try:
+        asyncio.run(_run_coroutine(board.run(interval)))
+    except KeyboardInterrupt:
+        # 看板只能通过Ctrl-C退出，不能让它中断整个shell
+        pass
+
+
 @config_app.command("show")
 def show_config(ctx: typer.Context):
     """
@@ -94,13 +317,8 @@ def list_clusters(ctx: typer.Context, show_all: Annotated[bool, typer.Option("-a
         env = None
     for _env, credential in settings.credentials.items():
         if not env or _env == env:
-            table = Table(title=f"{_env.upper()}集群列表")
-            table.add_column("集群ID", justify="left", style="cyan")
-            table.add_column("集群地址", justify="right", style="green")
-            for cluster, host in credential.clusters.items():
-                table.add_row(cluster, host)
-            console = Console()
-            console.print(table)
+            rows = list(credential.clusters.items())
+            cmd_ctx.renderer.print_table(CLUSTER_SCHEMA, rows, title=f"{_env.upper()}集群列表")
 
 
 @config_app.command("add-cluster")
@@ -141,9 +359,13 @@ def env_set(
     env: Annotated[str, typer.Argument(help="环境标识, 不传表示当前环境")] = "",
     username: Annotated[str, typer.Option("-u", "--user", help="用户名")] = "",
     password: Annotated[str, typer.Option("-p", "--pass", help="密码")] = "",
+    http2: Annotated[Optional[bool], typer.Option("--http2/--no-http2", help="是否启用HTTP/2")] = None,
+    proxy: Annotated[Optional[str], typer.Option("--proxy", help="代理地址，传空字符串表示不使用代理")] = None,
+    max_connections: Annotated[Optional[int], typer.Option("--max-connections", help="最大连接数")] = None,
+    timeout: Annotated[Optional[float], typer.Option("--timeout", help="请求超时（秒）")] = None,
 ):
     """
-    新建或更新环境，如果已存在则只更新用户密码（如果有）
+    新建或更新环境，如果已存在则只更新传入的配置
     """
     cmd_ctx: XxlContext = ctx.obj
     settings = cmd_ctx.settings
@@ -157,9 +379,121 @@ def env_set(
         settings.credentials[env].username = username
     if len(password) > 0:
         settings.credentials[env].password = password
+    if http2 is not None:
+        settings.credentials[env].http2 = http2
+    if proxy is not None:
+        settings.credentials[env].proxy = proxy or None
+    if max_connections is not None:
+        settings.credentials[env].max_connections = max_connections
+    if timeout is not None:
+        settings.credentials[env].timeout = timeout
     print(f"环境 [green]{env.upper()}[/green] 设置成功")
 
 
+async def print_merged_rows(
+    cmd_ctx: XxlContext,
+    title: str,
+    columns: List[str],
+    rows: AsyncIterator[Tuple[List[str], Tuple]],
+    limit: Optional[int],
+    offset: int,
+):
+    """
+    边归并边输出，每批行打印一次，只有第一批带表头
+    """
+    schema = TableSchema([ColumnSpec("集群")] + [ColumnSpec(c, "magenta") for c in columns])
+
+    async def with_clusters():
+        async for clusters, row in rows:
+            yield (",".join(c.upper() for c in clusters),) + row
+
+    await cmd_ctx.renderer.print_stream(schema, with_clusters(), title=title, limit=limit, offset=offset)
+
+
+async def print_merged_groups(
+    cmd_ctx: XxlContext,
+    clients: Dict[str, XxlAdminClient],
+    name: str,
+    sort: str,
+    limit: Optional[int],
+    offset: int,
+    deadline: Optional[float],
+):
+    # 执行器数量不多，各集群拉完后本地排序再归并
+    key = (lambda g: g.id) if sort == "id" else (lambda g: (g.appname, g.title))
+    failures: Dict[str, BaseException] = {}
+    streams = await fan_out_streams(
+        cmd_ctx,
+        {tn: sorted_records(c.iter_groups(name=name), key=key) for tn, c in clients.items()},
+        deadline,
+        failures,
+    )
+
+    def row(cluster: str, g: JobGroup) -> Tuple:
+        return (
+            highlight(g.appname, name, "red"),
+            g.title,
+            "自动" if g.address_type == 0 else "手动",
+            g.address_list or "",
+        )
+
+    merged = dedupe_merged(merge_streams(streams, key=key), key=key, row=row)
+    columns = ["AppName", "名称", "注册方式", "机器地址"]
+    await print_merged_rows(cmd_ctx, "执行器列表（合并）", columns, merged, limit=limit, offset=offset)
+    print_stream_failures(failures)
+
+
+async def print_merged_jobs(
+    cmd_ctx: XxlContext,
+    clients: Dict[str, XxlAdminClient],
+    name: str,
+    plans: Dict[str, QueryPlan],
+    sort: str,
+    limit: Optional[int],
+    offset: int,
+    deadline: Optional[float],
+):
+    if sort == "id":
+        # 接口按ID倒序返回，可以边拉边归并
+        key = lambda j: -j.id  # noqa: E731
+        records = lambda tn, c: prefetch_records(job_pages(c, plans[tn]))  # noqa: E731
+    else:
+        if sort == "time":
+            key = lambda j: j.update_time or ""  # noqa: E731
+        else:
+            key = lambda j: (j.executor_handler, j.job_desc)  # noqa: E731
+        records = lambda tn, c: sorted_records(job_pages(c, plans[tn]), key=key)  # noqa: E731
+    group_names: Dict[str, Dict[int, str]] = {}
+
+    async def cluster_jobs(cluster: str, client: XxlAdminClient) -> AsyncIterator[JobInfo]:
+        # 执行器目录也在该集群的流里拉取，出错时只影响这一个集群
+        groups = await client.cached_groups()
+        group_names[cluster] = {g.id: g.appname for g in groups}
+        async for job in records(cluster, client):
+            yield job
+
+    failures: Dict[str, BaseException] = {}
+    streams = await fan_out_streams(
+        cmd_ctx, {tn: cluster_jobs(tn, c) for tn, c in clients.items()}, deadline, failures
+    )
+
+    def row(cluster: str, job: JobInfo) -> Tuple:
+        # 同一任务在各集群的执行器ID不同，用执行器名称比较
+        return (
+            group_names[cluster].get(job.job_group, ""),
+            job.job_desc,
+            highlight(f"{job.glue_type}: {job.executor_handler}", name, "red"),
+            job.schedule_conf,
+            job.author,
+            "关闭" if job.trigger_status == 0 else "启动",
+        )
+
+    merged = dedupe_merged(merge_streams(streams, key=key), key=key, row=row)
+    columns = ["执行器", "描述", "运行模式", "调度类型", "负责人", "状态"]
+    await print_merged_rows(cmd_ctx, "任务列表（合并）", columns, merged, limit=limit, offset=offset)
+    print_stream_failures(failures)
+
+
 @group_app.command("list")
 @coroutine_cmd
 async def list_group(
@@ -167,33 +501,265 @@ async def list_group(
     name: Annotated[str, typer.Argument(help="执行器名称，支持模糊匹配")] = "",
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+    merge: Annotated[bool, typer.Option("--merge", help="多集群结果合并成一张表，相同的行只显示一次")] = False,
+    sort: Annotated[str, typer.Option("--sort", help="合并时的排序方式：name、id")] = "name",
+    limit: Annotated[Optional[int], typer.Option("--limit", help="最多显示的行数，默认每个集群30行，合并时不限")] = None,
+    offset: Annotated[int, typer.Option("--offset", help="跳过前N行")] = 0,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
     查询执行器列表
     """
     cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
+    if merge:
+        await print_merged_groups(
+            cmd_ctx, clients, name=name, sort=sort, limit=limit, offset=offset, deadline=deadline
+        )
+        return
+
+    # 分页参数直接下推到调度中心
+    length = DEFAULT_LIMIT if limit is None else limit
+    calls = {tn: c.list_group(name=name, start=offset, length=length) for tn, c in clients.items()}
+    results = await fan_out(cmd_ctx, calls, deadline)
+    renderer = cmd_ctx.renderer
+    with renderer.paging(renderer.page_lines(len(groups) for groups in results.values())):
+        for cluster, groups in results.items():
+            rows = [
+                (
+                    str(group.id),
+                    highlight(group.appname, name, "red"),
+                    group.title,
+                    "自动" if group.address_type == 0 else "手动",
+                    group.address_list,
+                )
+                for group in groups
+            ]
+            renderer.print_table(GROUP_SCHEMA, rows, title=f"{cluster.upper()}执行器列表")
+
+
+@group_app.command("nodes")
+@coroutine_cmd
+async def list_group_nodes(
+    ctx: typer.Context,
+    address: Annotated[str, typer.Argument(help="节点地址，host或host:port，不传表示所有节点")] = "",
+    refresh: Annotated[bool, typer.Option("--refresh", help="忽略目录缓存重新拉取")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
+):
+    """
+    按节点查询部署的执行器和任务数
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
+    max_age = 0 if refresh else XxlAdminClient.CATALOG_TTL
+    indexes = await fan_out(cmd_ctx, {tn: c.node_index(max_age=max_age) for tn, c in clients.items()}, deadline)
+    cluster_rows = {}
+    for cluster, index in indexes.items():
+        rows = []
+        for node in index.lookup(address):
+            for g in sorted(index.nodes[node], key=lambda x: x.appname):
+                rows.append((str(node), str(g.id), g.appname, g.title, str(index.job_count(g))))
+        if rows:
+            cluster_rows[cluster] = rows
+    if not cluster_rows:
+        print(f"没有找到节点 [red]{address}[/red]" if address else "没有已注册的节点")
+        return
+    renderer = cmd_ctx.renderer
+    with renderer.paging(renderer.page_lines(len(rows) for rows in cluster_rows.values())):
+        for cluster, rows in cluster_rows.items():
+            renderer.print_table(NODE_SCHEMA, rows, title=f"{cluster.upper()}节点列表")
+
+
+async def fetch_groups(
+    cmd_ctx: XxlContext, clients: Dict[str, XxlAdminClient], max_age: float = 0
+) -> Dict[str, List[JobGroup]]:
+    # 变更计划基于查询结果，中断时不继续执行
+    calls = {tn: c.cached_groups(max_age=max_age) for tn, c in clients.items()}
+    return await fan_out(cmd_ctx, calls, partial=False)
+
+
+async def plan_group_changes(
+    cmd_ctx: XxlContext,
+    clients: Dict[str, XxlAdminClient],
+    desired: List[JobGroup],
+    prune: bool = False,
+    max_age: float = 0,
+) -> List[GroupChange]:
+    group_lists = await fetch_groups(cmd_ctx, clients, max_age=max_age)
+    return [
+        change
+        for cluster, groups in group_lists.items()
+        for change in diff_groups(cluster, desired, groups, prune=prune)
+    ]
+
+
+def print_group_changes(cmd_ctx: XxlContext, changes: List[GroupChange]):
+    rows = [
+        (c.cluster.upper(), GROUP_ACTION_NAMES[c.action], c.group.appname, escape(c.describe())) for c in changes
+    ]
+    cmd_ctx.renderer.print_table(GROUP_CHANGE_SCHEMA, rows, title="执行器变更计划")
+
+
+async def apply_group_changes(
+    cmd_ctx: XxlContext,
+    clients: Dict[str, XxlAdminClient],
+    changes: List[GroupChange],
+    yes: bool = False,
+    concurrency: int = 4,
+):
+    """
+    打印变更计划，确认后并发执行并按集群汇总结果
+    """
+    print_group_changes(cmd_ctx, changes)
+    if not yes and not Confirm.ask(f"确认执行以上{len(changes)}项变更?"):
+        return
+    results = await apply_changes(clients, changes, concurrency=concurrency)
+    summary = {cluster: {"ok": 0, "failed": []} for cluster in dict.fromkeys(c.cluster for c in changes)}
+    for change, ok in results:
+        if ok:
+            summary[change.cluster]["ok"] += 1
+        else:
+            summary[change.cluster]["failed"].append(change)
+    for cluster, result in summary.items():
+        failed = result["failed"]
+        res = f"[green]成功 {result['ok']}[/green]" + (f" [red]失败 {len(failed)}[/red]" if failed else "")
+        print(f"{cluster.upper()}集群 执行器变更结果: {res}")
+        for change in failed:
+            print(f"  [red]FAILED[/red] {GROUP_ACTION_NAMES[change.action]} [magenta]{change.group.appname}[/magenta]")
+
+
+@group_app.command("add")
+@coroutine_cmd
+async def add_group(
+    ctx: typer.Context,
+    appname: Annotated[str, typer.Argument(help="AppName")],
+    title: Annotated[str, typer.Argument(help="执行器名称")],
+    addresses: Annotated[Optional[List[str]], typer.Option("--address", help="手动录入的机器地址（支持多个），不传表示自动注册")] = None,
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认直接执行")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    创建执行器，已存在的集群跳过
+    """
+    cmd_ctx: XxlContext = ctx.obj
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    group = JobGroup(
+        appname=appname,
+        title=title,
+        address_type=1 if addresses else 0,
+        address_list=",".join(addresses) if addresses else None,
+    )
+    changes = [c for c in await plan_group_changes(cmd_ctx, clients, [group]) if c.action == ACTION_CREATE]
+    if not changes:
+        print(f"执行器 [magenta]{appname}[/magenta] 已存在")
+        return
+    await apply_group_changes(cmd_ctx, clients, changes, yes=yes)
 
-    tasks = [create_task(c.list_group(name=name), name=tn) for tn, c in clients.items()]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        table = Table(title=f"{cluster.upper()}执行器列表")
-        table.add_column("ID", justify="left", style="cyan")
-        table.add_column("AppName", justify="left", style="cyan")
-        table.add_column("名称", style="magenta")
-        table.add_column("注册方式", justify="right", style="green")
-        table.add_column("机器地址", justify="right", style="green")
-        for group in t.result():
-            table.add_row(
-                str(group["id"]),
-                highlight(group["appname"], name, "red"),
-                group["title"],
-                "自动" if group["addressType"] == 0 else "手动",
-                group["addressList"],
-            )
-        console = Console()
-        console.print(table)
+
+@group_app.command("update")
+@coroutine_cmd
+async def update_group(
+    ctx: typer.Context,
+    appname: Annotated[str, typer.Argument(help="AppName")],
+    title: Annotated[str, typer.Option("--title", help="执行器名称")] = None,
+    addresses: Annotated[Optional[List[str]], typer.Option("--address", help="改为手动录入的机器地址（支持多个）")] = None,
+    auto: Annotated[bool, typer.Option("--auto", help="改为自动注册")] = False,
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认直接执行")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    修改执行器名称或注册方式，只提交有变化的集群
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    if auto and addresses:
+        print("[red]--auto和--address不能同时使用[/red]")
+        return
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    group_lists = await fetch_groups(cmd_ctx, clients)
+    changes = []
+    for cluster, groups in group_lists.items():
+        current = next((g for g in groups if g.appname == appname), None)
+        if current is None:
+            print(f"{cluster.upper()}集群 执行器不存在 [red]{appname}[/red]")
+            continue
+        desired = current.replace(title=title if title is not None else current.title)
+        if auto:
+            desired = desired.replace(address_type=0)
+        elif addresses:
+            desired = desired.replace(address_type=1, address_list=",".join(addresses))
+        changes.extend(diff_groups(cluster, [desired], [current]))
+    if not changes:
+        print("没有需要修改的执行器")
+        return
+    await apply_group_changes(cmd_ctx, clients, changes, yes=yes)
+
+
+@group_app.command("remove")
+@coroutine_cmd
+async def remove_group(
+    ctx: typer.Context,
+    appname: Annotated[str, typer.Argument(help="AppName")],
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认直接执行")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    删除执行器（执行器下还有任务时调度中心会拒绝）
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    group_lists = await fetch_groups(cmd_ctx, clients)
+    changes = [
+        GroupChange(cluster, ACTION_REMOVE, g, g)
+        for cluster, groups in group_lists.items()
+        for g in groups
+        if g.appname == appname
+    ]
+    if not changes:
+        print(f"执行器不存在 [red]{appname}[/red]")
+        return
+    await apply_group_changes(cmd_ctx, clients, changes, yes=yes)
+
+
+@group_app.command("apply")
+@coroutine_cmd
+async def apply_groups(
+    ctx: typer.Context,
+    file: Annotated[str, typer.Option("-f", "--file", help="期望的执行器列表，支持.yaml（需安装PyYAML）和.json")],
+    prune: Annotated[bool, typer.Option("--prune", help="删除文件中没有的执行器")] = False,
+    dry_run: Annotated[bool, typer.Option("--dry-run", help="只显示变更计划，不执行")] = False,
+    refresh: Annotated[bool, typer.Option("--refresh", help="忽略目录缓存重新拉取")] = False,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="最大并发请求数")] = 4,
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认直接执行")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+):
+    """
+    按文件同步执行器：对比各集群现有执行器，只提交必要的新增、修改（和删除）
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    try:
+        desired = load_group_specs(file)
+    except (OSError, ValueError) as e:
+        print(f"[red]读取执行器列表失败：{escape(str(e))}[/red]")
+        return
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
+    max_age = 0 if refresh else XxlAdminClient.CATALOG_TTL
+    changes = await plan_group_changes(cmd_ctx, clients, desired, prune=prune, max_age=max_age)
+    if not changes:
+        print("执行器已是最新，无需变更")
+        return
+    if dry_run:
+        print_group_changes(cmd_ctx, changes)
+        return
+    await apply_group_changes(cmd_ctx, clients, changes, yes=yes, concurrency=concurrency)
 
 
 @job_app.command("list")
@@ -204,69 +770,102 @@ async def list_job(
     group: Annotated[int, typer.Option("-g", "--group", help="执行器ID")] = -1,
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+    status: Annotated[Optional[str], typer.Option("--status", help="调度状态：on、off")] = None,
+    authors: Annotated[Optional[List[str]], typer.Option("--author", help="负责人，支持模糊匹配（支持多个）")] = None,
+    desc: Annotated[str, typer.Option("--desc", help="任务描述，支持模糊匹配")] = "",
+    cron: Annotated[str, typer.Option("--cron", help="调度配置，支持模糊匹配")] = "",
+    glue: Annotated[str, typer.Option("--glue", help="运行模式，如BEAN、GLUE_SHELL")] = "",
+    explain: Annotated[bool, typer.Option("--explain", help="显示各集群的过滤条件由调度中心还是本地执行")] = False,
+    merge: Annotated[bool, typer.Option("--merge", help="多集群结果合并成一张表，相同的行只显示一次")] = False,
+    sort: Annotated[str, typer.Option("--sort", help="合并时的排序方式：handler、id、time")] = "handler",
+    limit: Annotated[Optional[int], typer.Option("--limit", help="最多显示的行数，默认每个集群30行，合并时不限")] = None,
+    offset: Annotated[int, typer.Option("--offset", help="跳过前N行")] = 0,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
-    查询任务列表
+    查询任务列表，调度中心支持的过滤条件下推到接口，其余条件在本地过滤
     """
     cmd_ctx: XxlContext = ctx.obj
-    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    trigger_status = JOB_STATUS_OPTIONS.get(status) if status is not None else None
+    if status is not None and trigger_status is None:
+        print(f"[red]不支持的调度状态：{status}，可选值：on、off[/red]")
+        return
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
+    predicates = job_predicates(
+        executor=name,
+        job_group=group,
+        status=trigger_status,
+        authors=authors or (),
+        job_desc=desc,
+        cron=cron,
+        glue_type=glue,
+    )
+    plans = {tn: plan_job_query(c, predicates) for tn, c in clients.items()}
+    if explain:
+        for cluster, plan in plans.items():
+            print(f"{cluster.upper()}: {plan.describe()}")
+    if merge:
+        await print_merged_jobs(
+            cmd_ctx, clients, name=name, plans=plans, sort=sort, limit=limit, offset=offset, deadline=deadline
+        )
+        return
+
+    length = DEFAULT_LIMIT if limit is None else limit
+
+    async def fetch(cluster: str, client: XxlAdminClient) -> Tuple[Dict[int, str], List[JobInfo]]:
+        groups, jobs = await gather(client.cached_groups(), query_jobs(client, plans[cluster], length, offset))
+        return {g.id: g.appname for g in groups}, jobs
+
+    results = await fan_out(cmd_ctx, {tn: fetch(tn, c) for tn, c in clients.items()}, deadline)
+    renderer = cmd_ctx.renderer
+    with renderer.paging(renderer.page_lines(len(jobs) for _, jobs in results.values())):
+        for cluster, (group_names, jobs) in results.items():
+            rows = [
+                (
+                    str(job.id),
+                    f"{group_names.get(job.job_group, '')}({job.job_group})",
+                    job.job_desc,
+                    highlight(f"{job.glue_type}: {job.executor_handler}", name, "red"),
+                    job.schedule_conf,
+                    job.author,
+                    "关闭" if job.trigger_status == 0 else "启动",
+                )
+                for job in jobs
+            ]
+            renderer.print_table(JOB_SCHEMA, rows, title=f"{cluster.upper()}任务列表")
 
-    g_prefix = "_group"
-    group_tasks = [create_task(c.list_group(name=""), name=f"{g_prefix}{tn}") for tn, c in clients.items()]
-    job_tasks = [create_task(c.list_job(executor=name, job_group=group), name=tn) for tn, c in clients.items()]
-    tasks = group_tasks + job_tasks
-    await gather(*tasks)
-    group_names = {}
-    for gt in group_tasks:
-        for g in gt.result():
-            group_names[g["id"]] = g["appname"]
-    for t in job_tasks:
-        cluster = t.get_name()
-        table = Table(title=f"{cluster.upper()}任务列表")
-        table.add_column("ID", justify="left", style="cyan")
-        table.add_column("执行器", justify="left", style="cyan")
-        table.add_column("描述", justify="left", style="cyan")
-        table.add_column("运行模式", justify="center", style="green", no_wrap=True)
-        table.add_column("调度类型", style="magenta")
-        table.add_column("负责人", justify="right", style="green")
-        table.add_column("状态", justify="right", style="green")
-        for job in t.result():
-            group = group_names.get(job["jobGroup"], "")
-            group = f'{group}({job["jobGroup"]})'
-            table.add_row(
-                str(job["id"]),
-                group,
-                job["jobDesc"],
-                highlight(f'{job["glueType"]}: {job["executorHandler"]}', name, "red"),
-                job["scheduleConf"] if "scheduleConf" in job else job["jobCron"],
-                job["author"],
-                "关闭" if job["triggerStatus"] == 0 else "启动",
-            )
-        console = Console()
-        console.print(table)
 
+def humanized_filter_time(time_range: str, until: Optional[str] = None) -> str:
+    """
+    把"2 days ago"这类描述转换成调度日志的filterTime（起始时间 - 结束时间），结束时间默认为当前时间
+    """
+    arw = arrow.utcnow().to("local")
+    start_time = arw.dehumanize(time_range)
+    end_time = arw.dehumanize(until) if until else arw
+    return f'{start_time.format("YYYY-MM-DD HH:mm:ss")} - {end_time.format("YYYY-MM-DD HH:mm:ss")}'
 
-async def search_and_match_job(clients: Dict[str, XxlAdminClient], executor: str) -> Dict[str, Dict]:
+
+async def search_and_match_job(
+    cmd_ctx: XxlContext, clients: Dict[str, XxlAdminClient], executor: str
+) -> Dict[str, JobInfo]:
     """
-    按名称匹配任务
+    按名称匹配任务，查询失败的集群视为任务不存在
     """
-    tasks = [create_task(c.search_job(executor=executor), name=tn) for tn, c in clients.items()]
-    await gather(*tasks)
-    search_res_map = {}
-    res_map = {}
-    for t in tasks:
-        cluster = t.get_name()
-        search_res_map[cluster] = t.result()
+    # 匹配结果用于后续操作，中断时不能只对部分集群继续执行
+    calls = {tn: c.search_job(executor=executor) for tn, c in clients.items()}
+    search_res_map = await fan_out(cmd_ctx, calls, partial=False)
+    res_map = {cluster: JobInfo(id=-1, executor_handler=f"{executor}??") for cluster in clients}
 
     for cluster, jobs in search_res_map.items():
         if len(jobs) == 1:
             res_map[cluster] = jobs[0]
         elif len(jobs) == 0:
-            res_map[cluster] = {"id": -1, "executorHandler": f"{executor}??"}
+            res_map[cluster] = JobInfo(id=-1, executor_handler=f"{executor}??")
         else:
             for i, j in enumerate(jobs):
-                status = "关闭" if j["triggerStatus"] == 0 else "启动"
-                print(f"{i}: {j['jobDesc']}(执行器ID[{j['jobGroup']}]) 当前状态：{status}")
+                status = "关闭" if j.trigger_status == 0 else "启动"
+                print(f"{i}: {j.job_desc}(执行器ID[{j.job_group}]) 当前状态：{status}")
             choice_idx = Prompt.ask("[bold gold1]!!!存在相似名称任务，请确认你想要执行的任务序号[/bold gold1]")
             print("\n")
             if choice_idx.isnumeric():
@@ -276,7 +875,7 @@ async def search_and_match_job(clients: Dict[str, XxlAdminClient], executor: str
             if idx >= 0 and idx < len(jobs):
                 res_map[cluster] = jobs[idx]
             else:
-                res_map[cluster] = {"id": -1, "executorHandler": f"{executor}??"}
+                res_map[cluster] = JobInfo(id=-1, executor_handler=f"{executor}??")
 
     return res_map
 
@@ -290,6 +889,7 @@ async def run_job(
     address: Annotated[str, typer.Option("-t", "--target", help="机器地址")] = None,
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
     执行指定任务
@@ -297,59 +897,146 @@ async def run_job(
     cmd_ctx: XxlContext = ctx.obj
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
 
-    cluster_job_map = await search_and_match_job(clients, executor)
-    tasks = [
-        create_task(c.trigger_job(job_id=cluster_job_map[tn]["id"], param=param, address_list=address), name=tn)
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+    calls = {
+        tn: c.trigger_job(job_id=cluster_job_map[tn].id, param=param, address_list=address)
         for tn, c in clients.items()
-    ]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        match_id = cluster_job_map[cluster]["id"]
-        handler = cluster_job_map[cluster]["executorHandler"]
-        if t.result():
+    }
+    results = await fan_out(cmd_ctx, calls, deadline)
+    for cluster, ok in results.items():
+        match_id = cluster_job_map[cluster].id
+        handler = cluster_job_map[cluster].executor_handler
+        if ok:
             res = "[green]OK[/green]"
         else:
             res = "[red]FAILED[/red]" if match_id > 0 else "[red]SKIPPED[/red]"
         print(f"{cluster.upper()}集群 [magenta]{handler}[/magenta] 触发结果: {res}")
 
 
+async def resolve_local_registry(
+    cmd_ctx: XxlContext, env: str, cluster: str, client: XxlAdminClient, job_group: int
+) -> Optional[str]:
+    """
+    查找本机注册到任务所属执行器的地址，结果按环境+集群+执行器缓存（不同环境可能有同名集群）
+    """
+    registry_key = (env, cluster, job_group)
+    address = cmd_ctx.local_registry.get(registry_key)
+    if address:
+        return address
+    # 本地执行器可能刚启动，不使用目录缓存
+    index = await client.node_index(with_jobs=False, max_age=0)
+    # 按host精确匹配本机所有网卡地址，本机同时运行多个执行器时只取任务所属执行器的节点
+    nodes = index.local_nodes(group_id=job_group)
+    if not nodes:
+        return None
+    address = index.raw_addresses[nodes[0]]
+    cmd_ctx.local_registry[registry_key] = address
+    return address
+
+
+async def stream_executor_log(
+    executor_client: XxlExecutorClient, job: JobInfo, log_id: int, log_date_time: int, timeout: float
+) -> bool:
+    """
+    轮询执行器/log接口输出执行日志，直到出现结束标记、任务线程空闲或超时
+    """
+    from_line = 1
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.5)
+        content = await executor_client.log(log_id=log_id, log_date_time=log_date_time, from_line=from_line)
+        log_text = content.get("logContent") or ""
+        if log_text:
+            print(escape(log_text.replace("<br>", "\n")), end="")
+            from_line = content.get("toLineNum", from_line) + 1
+        if XxlExecutorClient.END_MARKER in log_text:
+            return True
+        if not log_text and await executor_client.idle_beat(job.id):
+            return True
+    return False
+
+
 @job_app.command("debug")
 @coroutine_cmd
 async def debug_job(
     ctx: typer.Context,
     executor: Annotated[str, typer.Argument(help="任务名称，支持模糊匹配")],
     param: Annotated[str, typer.Option("-p", "--param", help="任务参数")] = "",
+    direct: Annotated[bool, typer.Option("-d", "--direct", help="直连本地执行器执行并输出日志，不经过调度中心")] = False,
+    token: Annotated[str, typer.Option("--token", help="执行器accessToken，默认取环境配置")] = None,
+    timeout: Annotated[int, typer.Option("--timeout", help="直连模式等待日志的最长秒数")] = 60,
 ):
     """
     本地触发指定任务
     """
     cmd_ctx: XxlContext = ctx.obj
+    default_env = cmd_ctx.settings.default_env
     default_cluster = cmd_ctx.settings.default_cluster
     clients = cmd_ctx.get_clients(all_mode=False, clusters=None)
-    address = cmd_ctx.local_registry
-    if address is None:
-        groups = await clients[default_cluster].list_group()
-        ip = socket.gethostbyname(socket.gethostname())
-        registry_list = set(r for group in groups if group["registryList"] is not None for r in group["registryList"])
-        address = next((x for x in registry_list if ip in x), None)
-        # 缓存起来
-        cmd_ctx.local_registry = address
+    client = clients[default_cluster]
+
+    # 直连模式复用上次查到的任务信息，经调度中心触发时每次重新查询
+    job_key = (default_env, default_cluster, executor)
+    job = cmd_ctx.debug_jobs.get(job_key) if direct else None
+    if job is None:
+        cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+        job = cluster_job_map[default_cluster]
+        if job.id <= 0:
+            print(f"本地任务不存在 [red]{executor}[/red]")
+            return
+        if direct:
+            cmd_ctx.debug_jobs[job_key] = job
+
+    registry_key = (default_env, default_cluster, job.job_group)
+    address = await resolve_local_registry(cmd_ctx, default_env, default_cluster, client, job.job_group)
     if not address:
         print("本地执行器未找到，请确认是否注册成功")
         return
-    cluster_job_map = await search_and_match_job(clients, executor)
-    if default_cluster not in cluster_job_map:
-        print(f"本地任务不存在 [red]{executor}[/red]")
+
+    if not direct:
+        trigger_ok = await client.trigger_job(job_id=job.id, param=param, address_list=address)
+        if trigger_ok:
+            res = "[green]OK[/green]"
+        else:
+            # 可能是本地执行器地址变了，下次重新查找
+            cmd_ctx.local_registry.pop(registry_key, None)
+            res = "[red]FAILED[/red]"
+        print(f"本地触发 [magenta]{executor}[/magenta] 结果: {res}")
         return
-    job_id = cluster_job_map[default_cluster]["id"]
 
-    trigger_ok = await clients[default_cluster].trigger_job(job_id=job_id, param=param, address_list=address)
-    if trigger_ok:
-        res = "[green]OK[/green]"
-    else:
-        res = "[red]FAILED[/red]"
-    print(f"本地触发 [magenta]{executor}[/magenta] 结果: {res}")
+    if token is None:
+        token = cmd_ctx.settings.credentials[default_env].executor_token
+    executor_client = XxlExecutorClient(address, access_token=token)
+    try:
+        if not await executor_client.beat():
+            # 缓存的地址已失效，重新查找一次
+            await executor_client.close()
+            cmd_ctx.local_registry.pop(registry_key, None)
+            address = await resolve_local_registry(cmd_ctx, default_env, default_cluster, client, job.job_group)
+            if not address:
+                print("本地执行器未找到，请确认是否注册成功")
+                return
+            executor_client = XxlExecutorClient(address, access_token=token)
+            if not await executor_client.beat():
+                print(f"本地执行器 [red]{address}[/red] 无响应")
+                return
+
+        log_id = XxlExecutorClient.new_log_id()
+        log_date_time = log_id
+        res = await executor_client.run(job, param=param, log_id=log_id, log_date_time=log_date_time)
+        if res.get("code") != 200:
+            # 缓存的任务信息可能已过期（被删除或修改），下次重新查询
+            cmd_ctx.debug_jobs.pop(job_key, None)
+            print(f"本地直连触发 [magenta]{executor}[/magenta] 结果: [red]FAILED[/red] {res.get('msg') or ''}")
+            return
+        print(f"本地直连触发 [magenta]{executor}[/magenta] 结果: [green]OK[/green]，执行日志：")
+        finished = await stream_executor_log(
+            executor_client, job, log_id=log_id, log_date_time=log_date_time, timeout=timeout
+        )
+        if not finished:
+            print(f"\n[gold1]等待执行日志超过{timeout}秒，任务可能仍在执行[/gold1]")
+    finally:
+        await executor_client.close()
 
 
 @job_app.command("add")
@@ -373,14 +1060,10 @@ async def add_job(
         author = settings.get_default_user()
 
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
-    tasks = [
-        create_task(c.add_job(job_group=group, executor=executor, job_desc=title, cron=cron, author=author), name=tn)
-        for tn, c in clients.items()
-    ]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        if t.result():
+    job = JobInfo(job_group=group, executor_handler=executor, job_desc=title, schedule_conf=cron, author=author)
+    results = await fan_out(cmd_ctx, {tn: c.add_job(job) for tn, c in clients.items()})
+    for cluster, ok in results.items():
+        if ok:
             res = "[green]OK[/green]"
         else:
             res = "[red]FAILED[/red]"
@@ -405,37 +1088,36 @@ async def update_job(
     cmd_ctx: XxlContext = ctx.obj
 
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
-    cluster_job_map = await search_and_match_job(clients, executor)
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
 
-    tasks = []
+    calls = {}
+    skipped = []
     for cluster, client in clients.items():
         cur_job = cluster_job_map[cluster]
-        if cur_job["id"] <= 0:
+        if cur_job.id <= 0:
             continue
-        job_id = cur_job["id"]
-        job_group = cur_job["jobGroup"]
-        executor = cur_job["executorHandler"]
-        cron = cron or cur_job.get("jobCron", None) or cur_job.get("scheduleConf", None)
-        new_title = title or cur_job["jobDesc"]
+        new_title = title or cur_job.job_desc
         new_title = f"{title_prefix}{new_title}" if title_prefix and title_prefix not in new_title else new_title
-        author = author or cur_job["author"]
-
-        task = create_task(
-            client.update_job(
-                job_id=job_id, job_group=job_group, job_desc=new_title, executor=executor, cron=cron, author=author
-            ),
-            name=cluster,
+        # 基于查询到的完整任务只修改指定字段，路由、阻塞、超时、重试等配置保持不变
+        new_job = cur_job.replace(
+            schedule_conf=cron or cur_job.schedule_conf,
+            job_desc=new_title,
+            author=author or cur_job.author,
         )
-        tasks.append(task)
+        if new_job == cur_job:
+            skipped.append(cluster)
+            continue
+        calls[cluster] = client.update_job(new_job)
 
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        if t.result():
+    for cluster in skipped:
+        print(f"{cluster.upper()}集群 任务 [magenta]{cluster_job_map[cluster].executor_handler}[/magenta] 无变化，跳过")
+    results = await fan_out(cmd_ctx, calls)
+    for cluster, ok in results.items():
+        if ok:
             res = "[green]OK[/green]"
         else:
             res = "[red]FAILED[/red]"
-        print(f"{cluster.upper()}集群 更新任务 [magenta]{executor}[/magenta] 结果: {res}")
+        print(f"{cluster.upper()}集群 更新任务 [magenta]{cluster_job_map[cluster].executor_handler}[/magenta] 结果: {res}")
 
 
 @job_app.command("off")
@@ -445,6 +1127,7 @@ async def disable_job(
     executor: Annotated[str, typer.Argument(help="任务名称，支持模糊匹配")],
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
     停止任务
@@ -452,14 +1135,13 @@ async def disable_job(
     cmd_ctx: XxlContext = ctx.obj
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
 
-    cluster_job_map = await search_and_match_job(clients, executor)
-    tasks = [create_task(c.stop_job(job_id=cluster_job_map[tn]["id"]), name=tn) for tn, c in clients.items()]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        match_id = cluster_job_map[cluster]["id"]
-        handler = cluster_job_map[cluster]["executorHandler"]
-        if t.result():
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+    calls = {tn: c.stop_job(job_id=cluster_job_map[tn].id) for tn, c in clients.items()}
+    results = await fan_out(cmd_ctx, calls, deadline)
+    for cluster, ok in results.items():
+        match_id = cluster_job_map[cluster].id
+        handler = cluster_job_map[cluster].executor_handler
+        if ok:
             res = "[green]OK[/green]"
         else:
             res = "[red]FAILED[/red]" if match_id > 0 else "[red]SKIPPED[/red]"
@@ -473,6 +1155,7 @@ async def enable_job(
     executor: Annotated[str, typer.Argument()],
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
     启动任务
@@ -480,14 +1163,13 @@ async def enable_job(
     cmd_ctx: XxlContext = ctx.obj
     clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
 
-    cluster_job_map = await search_and_match_job(clients, executor)
-    tasks = [create_task(c.start_job(job_id=cluster_job_map[tn]["id"]), name=tn) for tn, c in clients.items()]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        match_id = cluster_job_map[cluster]["id"]
-        handler = cluster_job_map[cluster]["executorHandler"]
-        if t.result():
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+    calls = {tn: c.start_job(job_id=cluster_job_map[tn].id) for tn, c in clients.items()}
+    results = await fan_out(cmd_ctx, calls, deadline)
+    for cluster, ok in results.items():
+        match_id = cluster_job_map[cluster].id
+        handler = cluster_job_map[cluster].executor_handler
+        if ok:
             res = "[green]OK[/green]"
         else:
             res = "[red]FAILED[/red]" if match_id > 0 else "[red]SKIPPED[/red]"
@@ -500,49 +1182,334 @@ async def show_job_log(
     ctx: typer.Context,
     executor: Annotated[str, typer.Argument(help="任务名称，支持模糊匹配")],
     time_range: Annotated[str, typer.Argument(help="调度时间范围，如2 days ago等描述性语言，默认近1天")] = "1 days ago",
+    until: Annotated[Optional[str], typer.Option("--until", help="调度时间的截止时间，如1 hours ago，默认当前时间")] = None,
+    status: Annotated[Optional[str], typer.Option("--status", help="执行结果：success、failed、running")] = None,
+    param: Annotated[str, typer.Option("--param", help="任务参数，支持模糊匹配（本地过滤）")] = "",
+    explain: Annotated[bool, typer.Option("--explain", help="显示各集群的过滤条件由调度中心还是本地执行")] = False,
     all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
     clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+    limit: Annotated[int, typer.Option("--limit", help="每个集群最多显示的行数")] = DEFAULT_LIMIT,
+    offset: Annotated[int, typer.Option("--offset", help="跳过前N行")] = 0,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="最长等待秒数，超时的集群显示TIMEOUT")] = None,
 ):
     """
     查询任务日志
     """
     cmd_ctx: XxlContext = ctx.obj
-    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    log_status = LOG_STATUS_OPTIONS.get(status) if status is not None else None
+    if status is not None and log_status is None:
+        print(f"[red]不支持的执行结果：{status}，可选值：success、failed、running[/red]")
+        return
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
 
-    arw = arrow.utcnow().to("local")
-    start_time = arw.dehumanize(time_range)
-    arw_str = arw.format("YYYY-MM-DD HH:mm:ss")
-    start_time_str = start_time.format("YYYY-MM-DD HH:mm:ss")
+    filter_time = humanized_filter_time(time_range, until=until)
 
-    cluster_job_map = await search_and_match_job(clients, executor)
-    tasks = [
-        create_task(c.job_logs(job_id=cluster_job_map[tn]["id"], filter_time=f"{start_time_str} - {arw_str}"), name=tn)
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+    plans = {
+        tn: plan_log_query(
+            c,
+            log_predicates(
+                job_id=cluster_job_map[tn].id,
+                log_status=-1 if log_status is None else log_status,
+                filter_time=filter_time,
+                param=param,
+            ),
+        )
         for tn, c in clients.items()
+    }
+    if explain:
+        for cluster, plan in plans.items():
+            print(f"{cluster.upper()}: {plan.describe()}")
+    calls = {tn: query_job_logs(c, plans[tn], limit, offset) for tn, c in clients.items()}
+    results = await fan_out(cmd_ctx, calls, deadline)
+    renderer = cmd_ctx.renderer
+    with renderer.paging(renderer.page_lines(len(logs) for logs in results.values())):
+        for cluster, logs in results.items():
+            handler = cluster_job_map[cluster].executor_handler
+            rows = [
+                (
+                    str(job.job_id),
+                    job.trigger_time,
+                    "成功" if job.trigger_code == 200 else "失败",
+                    job.handle_time,
+                    job.executor_param,
+                    "成功" if job.handle_code == 200 else "失败",
+                )
+                for job in logs
+            ]
+            renderer.print_table(JOB_LOG_SCHEMA, rows, title=f"{cluster.upper()} - {handler}调度日志")
+
+
+@job_app.command("rerun-failed")
+@coroutine_cmd
+async def rerun_failed_jobs(
+    ctx: typer.Context,
+    since: Annotated[str, typer.Option("--since", help="调度时间范围，如3 hours ago等描述性语言")] = "3 hours ago",
+    group: Annotated[int, typer.Option("-g", "--group", help="执行器ID")] = 0,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="最大并发触发数")] = 4,
+    rate: Annotated[float, typer.Option("--rate", help="每秒最多触发次数")] = 5,
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认直接执行")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    重新触发时间范围内执行失败的任务（按任务和参数去重）
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    filter_time = humanized_filter_time(since)
+
+    async def collect(client: XxlAdminClient) -> Dict[Tuple[int, str], List[JobLog]]:
+        failed = {}
+        async for page in client.iter_job_logs(job_group=group, log_status=LOG_STATUS_FAILED, filter_time=filter_time):
+            for log in page:
+                failed.setdefault((log.job_id, log.executor_param or ""), []).append(log)
+        return failed
+
+    failed_map = await fan_out(cmd_ctx, {tn: collect(c) for tn, c in clients.items()}, partial=False)
+    plan = [
+        (cluster, job_id, param, logs)
+        for cluster, failed in failed_map.items()
+        for (job_id, param), logs in failed.items()
     ]
-    await gather(*tasks)
-    for t in tasks:
-        cluster = t.get_name()
-        handler = cluster_job_map[cluster]["executorHandler"]
-        table = Table(title=f"{cluster.upper()} - {handler}调度日志")
-        table.add_column("ID", justify="left", style="cyan")
-        table.add_column("调度时间", justify="left", style="cyan")
-        table.add_column("调度结果", justify="left", style="cyan")
-        table.add_column("执行时间", justify="center", style="green", no_wrap=True)
-        table.add_column("执行参数", style="magenta")
-        table.add_column("执行结果", style="magenta")
-        for job in t.result():
-            table.add_row(
-                str(job["jobId"]),
-                job["triggerTime"],
-                "成功" if job["triggerCode"] == 200 else "失败",
-                job["handleTime"],
-                job["executorParam"],
-                "成功" if job["handleCode"] == 200 else "失败",
+    if not plan:
+        print(f"{since}以来没有执行失败的任务")
+        return
+
+    rows = [
+        (
+            cluster.upper(),
+            str(job_id),
+            logs[0].executor_handler,
+            escape(param),
+            str(len(logs)),
+            max(log.trigger_time for log in logs),
+        )
+        for cluster, job_id, param, logs in plan
+    ]
+    # 确认前不能进入分页器，计划直接输出
+    cmd_ctx.renderer.print_table(RERUN_SCHEMA, rows, title="待重新触发任务")
+    if not yes and not Confirm.ask(f"确认重新触发以上{len(plan)}个任务?"):
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+    bucket = TokenBucket(rate)
+
+    async def rerun(cluster: str, job_id: int, param: str) -> bool:
+        async with semaphore:
+            await bucket.acquire()
+            # 单个触发异常只记为失败，不影响其他任务
+            try:
+                return await clients[cluster].trigger_job(job_id=job_id, param=param)
+            except Exception as e:
+                logger.exception(e)
+                return False
+
+    rerun_tasks = [create_task(rerun(cluster, job_id, param), name=cluster) for cluster, job_id, param, _ in plan]
+    await gather(*rerun_tasks)
+    for (cluster, job_id, param, logs), t in zip(plan, rerun_tasks):
+        res = "[green]OK[/green]" if t.result() else "[red]FAILED[/red]"
+        handler = logs[0].executor_handler
+        print(f"{cluster.upper()}集群 [magenta]{handler}[/magenta]({job_id}) 参数: {escape(param)} 重新触发结果: {res}")
+
+
+@job_app.command("export-logs")
+@coroutine_cmd
+async def export_job_logs(
+    ctx: typer.Context,
+    to: Annotated[str, typer.Option("--to", help="导出文件，支持.parquet（需安装pyarrow）、.csv、.csv.gz")],
+    since: Annotated[str, typer.Option("--since", help="调度时间范围，如30 days ago等描述性语言")] = "30 days ago",
+    group: Annotated[int, typer.Option("-g", "--group", help="执行器ID")] = -1,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="最大并发请求数")] = 8,
+    restart: Annotated[bool, typer.Option("--restart", help="忽略断点从头导出")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    导出调度日志到本地文件，中断后再次执行同一命令可从断点续传
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+    if restart:
+        XxlLogExporter.reset(to)
+    exporter = XxlLogExporter(
+        clients, to, filter_time=humanized_filter_time(since), job_group=group, concurrency=concurrency
+    )
+    if exporter.resumed:
+        print(f"从断点继续导出，调度时间范围：{exporter.filter_time}")
+    rows_written = await exporter.run()
+    for cluster, rows in rows_written.items():
+        print(f"{cluster.upper()}集群 导出调度日志 [green]{rows}[/green] 行")
+    print(f"导出完成：{exporter.target}")
+
+
+def print_bench_reports(cmd_ctx: XxlContext, reports: Dict[str, BenchReport]):
+    # 指标较多，每个集群一列
+    metrics = [
+        ("发送次数", lambda r: str(r.sent)),
+        ("发送速率/s", lambda r: f"{r.send_rate:.1f}"),
+        ("接受次数", lambda r: str(r.accepted)),
+        ("接受速率/s", lambda r: f"{r.accepted_rate:.1f}"),
+        ("被拒绝", lambda r: str(r.rejected)),
+        ("请求异常", lambda r: " ".join([str(r.error_count)] + [f"{k}×{v}" for k, v in r.errors.items()])),
+        ("无调度日志", lambda r: str(r.missing)),
+        ("调度失败", lambda r: str(r.trigger_failed)),
+        ("执行失败", lambda r: str(r.handle_failed)),
+        ("未完成", lambda r: str(r.unfinished)),
+    ]
+    schema = TableSchema([ColumnSpec("指标")] + [ColumnSpec(cluster.upper(), "green", "right") for cluster in reports])
+    rows = [(name,) + tuple(value(r) for r in reports.values()) for name, value in metrics]
+    latency_rows = []
+    for cluster, r in reports.items():
+        # 触发请求按毫秒显示，执行耗时来自调度日志，只精确到秒
+        for name, values, scale, unit in (
+            ("触发请求", r.trigger_latencies, 1000, "ms"),
+            ("调度到执行完成", r.handle_latencies, 1, "s"),
+        ):
+            stats = [percentile(values, p) for p in (50, 90, 99, 100)]
+            latency_rows.append(
+                (cluster.upper(), name, str(len(values)))
+                + tuple("-" if v is None else f"{v * scale:.0f}{unit}" for v in stats)
+            )
+    cmd_ctx.renderer.print_table(schema, rows, title="压测结果")
+    cmd_ctx.renderer.print_table(BENCH_LATENCY_SCHEMA, latency_rows, title="耗时分布")
+
+
+async def run_bench(
+    cmd_ctx: XxlContext,
+    clients: Dict[str, XxlAdminClient],
+    executor: str,
+    rate: float,
+    duration: float,
+    settle: float,
+    yes: bool,
+):
+    cluster_job_map = await search_and_match_job(cmd_ctx, clients, executor)
+    for cluster, job in cluster_job_map.items():
+        if job.id <= 0:
+            print(f"{cluster.upper()}集群 [magenta]{job.executor_handler}[/magenta] 压测结果: [red]SKIPPED[/red]")
+    targets = {tn: job for tn, job in cluster_job_map.items() if job.id > 0}
+    if not targets:
+        return
+    total = int(rate * duration)
+    if not yes:
+        names = ", ".join(f"{tn.upper()}:{job.executor_handler}" for tn, job in targets.items())
+        if not Confirm.ask(f"将以每秒{rate:g}次触发{names}，每个集群共{total}次，确认?"):
+            return
+
+    benches = {tn: XxlBench(clients[tn], job, rate, duration, settle=settle) for tn, job in targets.items()}
+    reports = await fan_out(cmd_ctx, {tn: bench.run() for tn, bench in benches.items()})
+    if reports:
+        print_bench_reports(cmd_ctx, reports)
+
+
+@job_app.command("bench")
+@coroutine_cmd
+async def bench_job(
+    ctx: typer.Context,
+    executor: Annotated[str, typer.Argument(help="任务名称，支持模糊匹配")],
+    rate: Annotated[float, typer.Option("--rate", help="每个集群每秒触发次数")] = 10,
+    duration: Annotated[float, typer.Option("--duration", help="持续触发的秒数")] = 10,
+    settle: Annotated[float, typer.Option("--settle", help="触发结束后等待执行完成的最长秒数")] = 30,
+    standin: Annotated[bool, typer.Option("--standin", help="对本地模拟的调度中心+执行器压测，结果可复现")] = False,
+    yes: Annotated[bool, typer.Option("-y", "--yes", help="跳过确认")] = False,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+):
+    """
+    按固定速率持续触发任务（开环，不等待上一次返回），统计接受速率、触发和执行耗时分布及错误数
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    if rate <= 0 or duration <= 0:
+        print("[red]--rate和--duration必须大于0[/red]")
+        return
+    if not standin:
+        clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters)
+        await run_bench(cmd_ctx, clients, executor, rate, duration, settle, yes)
+        return
+    server = XxlStandin(handlers=[executor])
+    base_url = server.start_in_thread()
+    # 模拟调度中心的端口每次不同，会话写入临时目录，目录不写入共享存储，压测结束后一并清理
+    cookie_dir = tempfile.TemporaryDirectory(prefix="xxl-standin-")
+    client = XxlAdminClient(base_url, username=STANDIN_USERNAME, password=STANDIN_PASSWORD, cookie_dir=cookie_dir.name)
+    try:
+        await run_bench(cmd_ctx, {"standin": client}, executor, rate, duration, settle, yes=True)
+    finally:
+        await client.close()
+        server.stop()
+        cookie_dir.cleanup()
+
+
+CHANGE_ACTION_NAMES = {
+    CHANGE_CREATED: "[green]新增[/green]",
+    CHANGE_DELETED: "[red]删除[/red]",
+    CHANGE_CRON: "[gold1]调度配置[/gold1]",
+    CHANGE_TOGGLED: "[gold1]启停[/gold1]",
+    CHANGE_AUTHOR: "[gold1]负责人[/gold1]",
+}
+
+
+def format_change(event: ChangeEvent) -> str:
+    kind = "执行器" if event.kind == "group" else "任务"
+    action = CHANGE_ACTION_NAMES.get(event.action, f"[gold1]修改 {event.field}[/gold1]")
+    line = f"{event.at} {event.cluster.upper()} {kind} [magenta]{escape(event.name)}[/magenta](#{event.record_id}) {action}"
+    if event.field is None:
+        return line
+    before, after = event.before, event.after
+    if event.action == CHANGE_TOGGLED:
+        before, after = ("关闭" if v == 0 else "启动" for v in (before, after))
+    return f"{line}: {escape(str(before))} -> {escape(str(after))}"
+
+
+@watch_app.command("changes")
+@coroutine_cmd
+async def watch_changes(
+    ctx: typer.Context,
+    interval: Annotated[float, typer.Option("-i", "--interval", help="拉取间隔秒数")] = 60,
+    output: Annotated[Optional[str], typer.Option("-o", "--output", help="变更事件同时追加写入JSON Lines文件")] = None,
+    count: Annotated[int, typer.Option("-n", "--count", help="拉取次数（第一次为基线），0表示一直运行直到Ctrl-C")] = 0,
+    all_mode: Annotated[bool, typer.Option("-a", "--all", help="是否在所有集群执行")] = False,
+    clusters: Annotated[Optional[List[str]], typer.Option("-c", "--cluster", help="仅在特定集群上执行（支持多个）")] = None,
+    envs: Annotated[Optional[List[str]], typer.Option("-E", "--env", help="在指定环境上执行（支持多个，all表示所有环境）")] = None,
+    deadline: Annotated[Optional[float], typer.Option("--deadline", help="每次拉取的最长等待秒数，超时的集群本轮跳过")] = None,
+):
+    """
+    定期拉取执行器和任务目录，与上一次快照对比，输出新增、删除、调度配置、启停、负责人等变更，Ctrl-C退出
+    """
+    cmd_ctx: XxlContext = ctx.obj
+    clients = cmd_ctx.get_clients(all_mode=all_mode, clusters=clusters, envs=envs)
+    watcher = XxlChangeWatcher()
+    file = open(output, "a", encoding="utf-8") if output else None
+    writer = JsonLinesWriter(file) if file else None
+    try:
+        polls = 0
+        while True:
+            # 中断时直接退出，不能把只拉到一半的集群当成新快照
+            results = await fan_out(
+                cmd_ctx, {tn: watcher.fetch(c) for tn, c in clients.items()}, deadline, partial=False
             )
-        console = Console()
-        console.print(table)
+            for cluster, catalogs in results.items():
+                baseline = not watcher.has_baseline(cluster)
+                events = watcher.update(cluster, catalogs)
+                if baseline:
+                    groups, jobs = catalogs
+                    print(f"{cluster.upper()}集群 基线：{len(groups)}个执行器、{len(jobs)}个任务")
+                    continue
+                for event in events:
+                    cmd_ctx.renderer.print(format_change(event))
+                if writer and events:
+                    writer.write(events)
+            polls += 1
+            if 0 < count <= polls:
+                break
+            await asyncio.sleep(interval)
+    finally:
+        if file:
+            file.close()
 
 
 app.add_typer(config_app, name="config")
 app.add_typer(group_app, name="group")
 app.add_typer(job_app, name="job")
+app.add_typer(watch_app, name="watch")
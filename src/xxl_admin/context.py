@@ -1,11 +1,16 @@
+import os
 import logging
 from pathlib import Path
+from httpx import Limits
 from typer import get_app_dir
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from rich.prompt import Prompt
 
 from .settings import XxlSettings
 from .client import XxlAdminClient
+from .store import XxlStateStore
+from .models import JobInfo
+from .render import XxlRenderer
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +27,17 @@ class XxlContext(object):
                 Path(settings_file) if settings_file.endswith(".json") else Path(settings_file) / self.SETTINGS_FILENAME
             )
 
-        self.local_registry = None
+        # (环境, 集群, 执行器ID) -> 本机注册的执行器地址
+        self.local_registry: Dict[Tuple[str, str, int], str] = {}
+        # (环境, 集群, 任务名称) -> 直连调试用的任务信息
+        self.debug_jobs: Dict[Tuple[str, str, str], JobInfo] = {}
         self.settings: XxlSettings = None
         self.location: Path = settings_file
-        self._settings_file_created = settings_file.exists()
-        self._last_updated_at = self.location.stat().st_mtime if self._settings_file_created else 0
+        self.store = XxlStateStore(settings_file.parent / XxlStateStore.FILENAME)
+        # 所有命令共用的输出层
+        self.renderer = XxlRenderer()
+        # 加载时的配置项快照，保存时只写入变化的配置项
+        self._baseline: Dict[str, object] = {}
         self.setup_log()
 
     def setup_log(self):
@@ -38,46 +49,133 @@ class XxlContext(object):
             level="DEBUG",
         )
 
+    @staticmethod
+    def _split_sections(settings: XxlSettings) -> Dict[str, object]:
+        data = settings.model_dump(mode="json", exclude_none=True)
+        sections = {
+            "env_list": sorted(data["env_list"]),
+            "default_env": data["default_env"],
+            "default_cluster": data["default_cluster"],
+        }
+        for env, credential in data["credentials"].items():
+            sections[f"credentials.{env}"] = credential
+        return sections
+
+    @staticmethod
+    def _merge_sections(sections: Dict[str, object]) -> XxlSettings:
+        data = {"credentials": {}}
+        for section, value in sections.items():
+            if section.startswith("credentials."):
+                data["credentials"][section[len("credentials."):]] = value
+            else:
+                data[section] = value
+        return XxlSettings.model_validate(data)
+
+    def _file_mtime(self) -> str:
+        return str(self.location.stat().st_mtime_ns) if self.location.exists() else ""
+
     def load(self):
         if self.settings:
             return
-        if not self._settings_file_created:
-            logger.debug("settings file not found, using default settings")
-            self.settings = XxlSettings()
-        else:
+        sections = self.store.load_settings()
+        file_mtime = self._file_mtime()
+        if file_mtime and file_mtime != self.store.get_meta("settings_file_mtime"):
+            # 配置文件被手工修改过（或首次从配置文件迁移），以文件为准
             logger.debug(f"loading settings from file: {self.location}")
             self.settings = XxlSettings.model_validate_json(self.location.read_text())
+            file_sections = self._split_sections(self.settings)
+            # 文件里删掉的配置项（如整个环境）也要从共享配置中删除
+            removed = [k for k in sections if k not in file_sections]
+            sections = self.store.save_settings(file_sections, removed)
+            self.store.set_meta("settings_file_mtime", file_mtime)
+        elif sections:
+            logger.debug(f"loading settings from state store: {self.store.path}")
+            self.settings = self._merge_sections(sections)
+        else:
+            logger.debug("settings file not found, using default settings")
+            self.settings = XxlSettings()
+            self.store.save_settings(self._split_sections(self.settings))
+        self._baseline = self._split_sections(self.settings)
 
     def save(self):
-        # been changed since last loaded
-        mtime = self.location.stat().st_mtime if self._settings_file_created else 0
-        if mtime and mtime > self._last_updated_at:
-            logger.debug("settings had been modified from local file. current settings won't be saved.")
-            return
-        self.location.write_text(self.settings.model_dump_json(exclude_none=True, indent=4))
-        self._settings_file_created = True
-        logger.debug("settings saved to local file.")
+        sections = self._split_sections(self.settings)
+        changed = {k: v for k, v in sections.items() if self._baseline.get(k) != v}
+        removed = [k for k in self._baseline if k not in sections]
+        # 其他shell的修改按配置项合并，不再整体覆盖或丢弃
+        merged = self.store.save_settings(changed, removed)
+        self._baseline = merged
+        self.settings = self._merge_sections(merged)
+
+        tmp_file = self.location.with_suffix(".json.tmp")
+        tmp_file.write_text(self.settings.model_dump_json(exclude_none=True, indent=4))
+        os.replace(tmp_file, self.location)
+        self.store.set_meta("settings_file_mtime", self._file_mtime())
+        logger.debug(f"settings saved, {len(changed)} changed, {len(removed)} removed.")
+
+    def close(self):
+        self.store.close()
 
-    def get_clients(self, all_mode: bool = False, clusters: List[str] = None) -> Dict[str, XxlAdminClient]:
+    def resolve_envs(self, envs: List[str] = None) -> List[str]:
+        """
+        解析-E/--env参数，all表示所有环境
+        """
+        if not envs:
+            return [self.settings.default_env]
+        if "all" in envs:
+            return sorted(self.settings.credentials.keys())
+        resolved = []
+        for env in envs:
+            env = env.lower()
+            if env not in self.settings.credentials:
+                raise ValueError(f"环境不存在: {env}")
+            if env not in resolved:
+                resolved.append(env)
+        return resolved
+
+    def get_clients(
+        self, all_mode: bool = False, clusters: List[str] = None, envs: List[str] = None
+    ) -> Dict[str, XxlAdminClient]:
+        """
+        按环境、集群创建客户端，指定envs时key为"环境/集群"
+        """
         if not self.settings:
             self.load()
         settings = self.settings
-        default_env = settings.default_env
-        credential = settings.credentials[default_env]
+        multi_env = bool(envs)
+        clients = {}
+        for env in self.resolve_envs(envs):
+            credential = settings.credentials[env]
+            if all_mode:
+                runtime_clusters = list(credential.clusters.keys())
+            elif clusters:
+                runtime_clusters = set(clusters)
+            else:
+                runtime_clusters = [settings.default_cluster]
 
-        if all_mode:
-            runtime_clusters = list(credential.clusters.keys())
-        elif clusters:
-            runtime_clusters = set(clusters)
-        else:
-            runtime_clusters = [settings.default_cluster]
-
-        if len(credential.username) == 0:
-            credential.username = Prompt.ask('用户名')
-        if len(credential.password) == 0:
-            credential.password = Prompt.ask('密码', password=True)
-        return {
-            cluster: XxlAdminClient(base_url, username=credential.username, password=credential.password)
-            for cluster, base_url in credential.clusters.items()
-            if cluster in runtime_clusters
-        }
+            # 同一环境的集群共用连接配置
+            limits = Limits(
+                max_connections=credential.max_connections,
+                max_keepalive_connections=credential.max_keepalive_connections,
+                keepalive_expiry=credential.keepalive_expiry,
+            )
+            prompt_prefix = f"[{env}]" if multi_env else ""
+            if len(credential.username) == 0:
+                credential.username = Prompt.ask(f"{prompt_prefix}用户名")
+            if len(credential.password) == 0:
+                credential.password = Prompt.ask(f"{prompt_prefix}密码", password=True)
+            for cluster, base_url in credential.clusters.items():
+                if cluster not in runtime_clusters:
+                    continue
+                key = f"{env}/{cluster}" if multi_env else cluster
+                clients[key] = XxlAdminClient(
+                    base_url,
+                    username=credential.username,
+                    password=credential.password,
+                    store=self.store,
+                    http2=credential.http2,
+                    compression=credential.compression,
+                    limits=limits,
+                    timeout=credential.timeout,
+                    proxy=credential.proxy,
+                )
+        return clients
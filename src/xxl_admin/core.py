@@ -110,3 +110,4 @@ class XxlShell(object):
 
         # save context after loop exit
         self.ctx.save()
+        self.ctx.close()
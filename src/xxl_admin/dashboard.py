@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.columns import Columns
+from rich.console import Console, Group, RenderableType
+
+from .client import XxlAdminClient
+from .models import JobGroup, JobLog, LOG_STATUS_FAILED, LOG_STATUS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterState(object):
+    """
+    单个集群的看板状态，只在有变化时重新生成面板
+    """
+
+    def __init__(self, cluster: str, max_failed: int) -> None:
+        self.cluster = cluster
+        self.groups: Dict[int, JobGroup] = {}
+        self.group_fingerprints: Dict[int, Tuple] = {}
+        self.failed: Deque[JobLog] = deque(maxlen=max_failed)
+        self.last_failed_id = 0
+        self.running: List[JobLog] = []
+        self.error: str = None
+        self.dirty = True
+        self._panel: RenderableType = None
+
+    def update_groups(self, groups: List[JobGroup]):
+        fingerprints = {g.id: (g.appname, g.title, tuple(g.registry_list or ())) for g in groups}
+        changed = {gid for gid, fp in fingerprints.items() if self.group_fingerprints.get(gid) != fp}
+        removed = self.group_fingerprints.keys() - fingerprints.keys()
+        if not changed and not removed:
+            return
+        for gid in removed:
+            del self.groups[gid]
+        for g in groups:
+            if g.id in changed:
+                self.groups[g.id] = g
+        self.group_fingerprints = fingerprints
+        self.dirty = True
+
+    def add_failed(self, logs: List[JobLog]):
+        new_logs = [log for log in logs if log.id > self.last_failed_id]
+        if not new_logs:
+            return
+        self.last_failed_id = max(log.id for log in new_logs)
+        # deque左侧为最新
+        for log in sorted(new_logs, key=lambda x: x.id):
+            self.failed.appendleft(log)
+        self.dirty = True
+
+    def update_running(self, logs: List[JobLog]):
+        if [log.id for log in logs] == [log.id for log in self.running]:
+            return
+        self.running = logs
+        self.dirty = True
+
+    def set_error(self, error: str):
+        if error != self.error:
+            self.error = error
+            self.dirty = True
+
+    def panel(self) -> RenderableType:
+        if not self.dirty and self._panel is not None:
+            return self._panel
+
+        groups = Table(title="执行器", expand=True)
+        groups.add_column("AppName", style="cyan")
+        groups.add_column("名称", style="magenta")
+        groups.add_column("节点数", justify="right", style="green")
+        for g in sorted(self.groups.values(), key=lambda x: x.appname):
+            nodes = len(g.registry_list or ())
+            groups.add_row(g.appname, g.title, str(nodes) if nodes else "[red]0[/red]")
+
+        failed = Table(title="最近失败", expand=True)
+        failed.add_column("调度时间", style="cyan", no_wrap=True)
+        failed.add_column("JobHandler", style="magenta")
+        failed.add_column("执行参数", style="magenta")
+        for log in self.failed:
+            failed.add_row(log.trigger_time, log.executor_handler, log.executor_param)
+
+        running = Table(title="运行中", expand=True)
+        running.add_column("调度时间", style="cyan", no_wrap=True)
+        running.add_column("JobHandler", style="magenta")
+        running.add_column("执行器地址", style="green")
+        for log in self.running:
+            running.add_row(log.trigger_time, log.executor_handler, log.executor_address)
+
+        body = [groups, failed, running]
+        if self.error:
+            body.insert(0, f"[red]{self.error}[/red]")
+        self._panel = Panel(Group(*body), title=self.cluster.upper())
+        self.dirty = False
+        return self._panel
+
+
+class XxlDashboard(object):
+    """
+    多集群看板：执行器节点、最近失败、运行中任务，增量轮询刷新
+    """
+
+    PAGE_SIZE = 50
+
+    def __init__(
+        self,
+        clients: Dict[str, XxlAdminClient],
+        since_filter_time: Callable[[], str],
+        max_failed: int = 10,
+        console: Console = None,
+    ) -> None:
+        self.clients = clients
+        self.console = console
+        # 每次刷新重新计算时间范围，否则结束时间停留在启动时刻，之后的失败永远查不到
+        self.filter_time = since_filter_time
+        self.states = {cluster: ClusterState(cluster, max_failed) for cluster in clients}
+        self.last_refresh_cost = 0.0
+
+    async def _fetch_new_failed(self, client: XxlAdminClient, state: ClusterState) -> List[JobLog]:
+        """
+        日志按调度时间倒序返回，遇到已经见过的日志ID就停止翻页
+        """
+        logs = []
+        async for page in client.iter_job_logs(
+            log_status=LOG_STATUS_FAILED, filter_time=self.filter_time(), page_size=self.PAGE_SIZE
+        ):
+            logs.extend(log for log in page if log.id > state.last_failed_id)
+            if not state.last_failed_id and len(logs) >= state.failed.maxlen:
+                break
+            if any(log.id <= state.last_failed_id for log in page):
+                break
+        return logs
+
+    async def _refresh_cluster(self, cluster: str):
+        client = self.clients[cluster]
+        state = self.states[cluster]
+        try:
+            groups, failed, running = await asyncio.gather(
+                client.list_group(length=1000),
+                self._fetch_new_failed(client, state),
+                client.job_logs(job_id=0, job_group=0, log_status=LOG_STATUS_RUNNING, length=self.PAGE_SIZE),
+            )
+        except Exception as e:
+            logger.exception(e)
+            state.set_error(f"刷新失败：{e}")
+            return
+        state.set_error(None)
+        state.update_groups(groups)
+        state.add_failed(failed)
+        state.update_running(running)
+
+    async def refresh(self):
+        begin = time.perf_counter()
+        await asyncio.gather(*[self._refresh_cluster(cluster) for cluster in self.clients])
+        self.last_refresh_cost = time.perf_counter() - begin
+
+    def render(self) -> RenderableType:
+        header = f"刷新时间 {time.strftime('%H:%M:%S')}  耗时 {self.last_refresh_cost * 1000:.0f} ms  Ctrl-C退出"
+        return Group(header, Columns([s.panel() for s in self.states.values()], expand=True))
+
+    async def run(self, interval: float):
+        with Live(self.render(), console=self.console, screen=True, auto_refresh=False) as live:
+            while True:
+                await self.refresh()
+                live.update(self.render(), refresh=True)
+                await asyncio.sleep(interval)
@@ -0,0 +1,82 @@
+import time
+import logging
+from httpx import AsyncClient, HTTPError
+from typing import Dict
+
+from .models import JobInfo
+from .utils import json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class XxlExecutorClient(object):
+    """
+    直连执行器内嵌的HTTP服务（/beat、/idleBeat、/run、/log），绕过调度中心
+    """
+
+    TOKEN_HEADER = "XXL-JOB-ACCESS-TOKEN"
+    # JobThread执行结束时写入日志的标记
+    END_MARKER = "xxl-job job execute end"
+
+    def __init__(self, address: str, access_token: str = "", timeout: float = 10) -> None:
+        self.address = address.rstrip("/")
+        headers = {self.TOKEN_HEADER: access_token} if access_token else {}
+        self._client = AsyncClient(base_url=self.address, headers=headers, timeout=timeout)
+
+    async def _post(self, path: str, payload: Dict = None) -> Dict:
+        try:
+            response = await self._client.post(path, json=payload)
+        except HTTPError as e:
+            logger.error(f"executor request failed: {self.address}{path} {e}")
+            return {"code": 500, "msg": str(e)}
+        logger.info(f"executor request: {response.request.url} {payload}")
+        logger.info(f"executor response: {response.text}")
+        if response.status_code != 200:
+            return {"code": response.status_code, "msg": response.text}
+        return json_loads(response.content)
+
+    async def beat(self) -> bool:
+        res = await self._post("/beat")
+        return res.get("code") == 200
+
+    async def idle_beat(self, job_id: int) -> bool:
+        """
+        任务线程空闲（没有运行中或排队的触发）时返回True
+        """
+        res = await self._post("/idleBeat", {"jobId": job_id})
+        return res.get("code") == 200
+
+    async def run(self, job: JobInfo, param: str, log_id: int, log_date_time: int) -> Dict:
+        payload = {
+            "jobId": job.id,
+            "executorHandler": job.executor_handler,
+            "executorParams": param,
+            "executorBlockStrategy": job.executor_block_strategy,
+            "executorTimeout": job.executor_timeout,
+            "logId": log_id,
+            "logDateTime": log_date_time,
+            "glueType": job.glue_type,
+            "glueSource": "",
+            "glueUpdatetime": 0,
+            "broadcastIndex": 0,
+            "broadcastTotal": 1,
+        }
+        return await self._post("/run", payload)
+
+    async def log(self, log_id: int, log_date_time: int, from_line: int) -> Dict:
+        """
+        返回{fromLineNum, toLineNum, logContent, end}，读取失败返回空字典
+        """
+        payload = {"logDateTim": log_date_time, "logId": log_id, "fromLineNum": from_line}
+        res = await self._post("/log", payload)
+        if res.get("code") != 200:
+            return {}
+        return res.get("content") or {}
+
+    @staticmethod
+    def new_log_id() -> int:
+        # 直连执行不经过调度中心，没有真实的日志ID，用毫秒时间戳代替
+        return int(time.time() * 1000)
+
+    async def close(self):
+        await self._client.aclose()
@@ -0,0 +1,256 @@
+import io
+import os
+import csv
+import gzip
+import json
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, List
+
+from .client import XxlAdminClient
+from .models import JobLog
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# 导出的列：集群 + 调度日志全部字段
+COLUMNS = ["cluster"] + [attr for attr, _, _ in JobLog._fields]
+INT_COLUMNS = {"id", "job_group", "job_id", "executor_fail_retry_count", "trigger_code", "handle_code"}
+
+
+class CsvLogWriter(object):
+    """
+    追加写CSV（.gz结尾时gzip压缩），每批写完记录文件偏移，续传时截断到该偏移
+    """
+
+    def __init__(self, path: Path, offset: int = 0) -> None:
+        self.path = path
+        self.compressed = path.suffix == ".gz"
+        if offset > 0 and (not path.exists() or path.stat().st_size < offset):
+            # 文件被删除或比断点短，断点之前的数据已经不在了，截断只会补出NUL字节，只能从头导出
+            logger.warning(f"{path} is missing or shorter than checkpoint offset {offset}, restart export")
+            offset = 0
+        with open(path, "r+b" if offset > 0 else "wb") as f:
+            # 截掉上次中断时写了一半的批次
+            f.truncate(offset)
+        self.offset = offset
+        if offset == 0:
+            self.write([COLUMNS])
+
+    def write(self, rows: List[List]):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        data = buffer.getvalue().encode("utf-8")
+        if self.compressed:
+            # 每批一个独立的gzip member，拼接后仍是合法的gzip文件
+            data = gzip.compress(data)
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = f.tell()
+
+    def state(self) -> Dict:
+        return {"offset": self.offset}
+
+
+class ParquetLogWriter(object):
+    """
+    Parquet数据集目录，每批写一个完整的part文件，pyarrow/pandas可直接按目录读取
+    """
+
+    def __init__(self, path: Path, parts: int = 0) -> None:
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        if any(not (self.path / f"part-{i:05d}.parquet").exists() for i in range(parts)):
+            logger.warning(f"{path} is missing parts before checkpoint part {parts}, restart export")
+            parts = 0
+        self.parts = parts
+        # 断点之后写了一半的part文件或者上一次导出的残留
+        for part_file in self.path.glob("part-*.parquet"):
+            if int(part_file.stem.split("-")[1]) >= parts:
+                part_file.unlink()
+        fields = [(c, pyarrow.int64() if c in INT_COLUMNS else pyarrow.string()) for c in COLUMNS]
+        self.schema = pyarrow.schema(fields)
+
+    def write(self, rows: List[List]):
+        columns = list(zip(*rows))
+        table = pyarrow.Table.from_arrays(
+            [pyarrow.array(col, type=field.type) for col, field in zip(columns, self.schema)], schema=self.schema
+        )
+        pyarrow.parquet.write_table(table, self.path / f"part-{self.parts:05d}.parquet")
+        self.parts += 1
+
+    def state(self) -> Dict:
+        return {"parts": self.parts}
+
+
+def log_row(cluster: str, log: JobLog) -> List:
+    return [cluster] + [getattr(log, attr) for attr in COLUMNS[1:]]
+
+
+class XxlLogExporter(object):
+    """
+    并发分页导出调度日志，按(集群, 任务, 页)记录断点，中断后可续传
+    """
+
+    PAGE_SIZE = 200
+
+    def __init__(
+        self,
+        clients: Dict[str, XxlAdminClient],
+        target: str,
+        filter_time: str,
+        job_group: int = -1,
+        concurrency: int = 8,
+        batch_size: int = 5000,
+    ) -> None:
+        self.clients = clients
+        self.target = self.resolve_target(target)
+        self.checkpoint_file = self.checkpoint_path(self.target)
+        self.job_group = job_group
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.checkpoint = self._load_checkpoint(filter_time)
+        self.filter_time = self.checkpoint["filter_time"]
+        self.rows_written: Dict[str, int] = {cluster: 0 for cluster in clients}
+        writer_state = self.checkpoint["writer"]
+        if self.target.suffix == ".parquet":
+            self.writer = ParquetLogWriter(self.target, parts=writer_state.get("parts", 0))
+        else:
+            self.writer = CsvLogWriter(self.target, offset=writer_state.get("offset", 0))
+        if writer_state and self.writer.state() != writer_state:
+            # 输出文件已不完整，写入器从头开始，各任务的进度也要作废
+            self.checkpoint["jobs"] = {}
+
+    @staticmethod
+    def resolve_target(target: str) -> Path:
+        target = Path(target)
+        if target.suffix == ".parquet" and pyarrow is None:
+            # 没有安装pyarrow时退化为压缩CSV
+            target = target.with_suffix(".csv.gz")
+            logger.warning(f"pyarrow not installed, fallback to {target}")
+        return target
+
+    @staticmethod
+    def checkpoint_path(target: Path) -> Path:
+        return target.with_name(target.name + ".ckpt")
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.checkpoint["jobs"])
+
+    def _load_checkpoint(self, filter_time: str) -> Dict:
+        if self.checkpoint_file.exists():
+            logger.info(f"resume export from checkpoint: {self.checkpoint_file}")
+            return json.loads(self.checkpoint_file.read_text())
+        # jobs: "集群/任务ID" -> {"next_start": 下一页起始行, "done": 是否导完}
+        # 续传沿用第一次的filter_time，保证分页结果稳定
+        return {"filter_time": filter_time, "jobs": {}, "writer": {}}
+
+    def _save_checkpoint(self):
+        self.checkpoint["writer"] = self.writer.state()
+        tmp_file = self.checkpoint_file.with_name(self.checkpoint_file.name + ".tmp")
+        tmp_file.write_text(json.dumps(self.checkpoint))
+        os.replace(tmp_file, self.checkpoint_file)
+
+    async def _export_job(self, cluster: str, job_id: int, queue: asyncio.Queue, semaphore: asyncio.Semaphore):
+        key = f"{cluster}/{job_id}"
+        progress = self.checkpoint["jobs"].get(key, {"next_start": 0, "done": False})
+        if progress["done"]:
+            return
+        start = progress["next_start"]
+        async with semaphore:
+            client = self.clients[cluster]
+            async for page in client.iter_job_logs(
+                job_id=job_id, filter_time=self.filter_time, start=start, page_size=self.PAGE_SIZE
+            ):
+                start += self.PAGE_SIZE
+                await queue.put((cluster, key, start, [log_row(cluster, log) for log in page]))
+        await queue.put((cluster, key, start, None))
+
+    async def _write_loop(self, queue: asyncio.Queue):
+        buffer: List[List] = []
+        # 本批次里各任务的进度，写入文件成功后才更新断点
+        pending: Dict[str, Dict] = {}
+
+        def flush():
+            if buffer:
+                self.writer.write(buffer)
+            self.checkpoint["jobs"].update(pending)
+            self._save_checkpoint()
+            buffer.clear()
+            pending.clear()
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                flush()
+                return
+            cluster, key, next_start, rows = item
+            if rows is not None:
+                buffer.extend(rows)
+                self.rows_written[cluster] += len(rows)
+            pending[key] = {"next_start": next_start, "done": rows is None}
+            if len(buffer) >= self.batch_size:
+                flush()
+
+    async def _list_job_ids(self, cluster: str) -> List[int]:
+        job_ids = []
+        async for page in self.clients[cluster].iter_jobs(job_group=self.job_group):
+            job_ids.extend(job.id for job in page)
+        return job_ids
+
+    async def run(self) -> Dict[str, int]:
+        # 队列有界，拉取速度超过写入速度时自动背压，内存占用与日志总量无关
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        writer_task = asyncio.create_task(self._write_loop(queue))
+        tasks = []
+        try:
+            job_lists = await asyncio.gather(*[self._list_job_ids(cluster) for cluster in self.clients])
+            tasks = [
+                asyncio.create_task(self._export_job(cluster, job_id, queue, semaphore))
+                for cluster, job_ids in zip(self.clients, job_lists)
+                for job_id in job_ids
+            ]
+            producers = asyncio.gather(*tasks)
+            # 写入失败时拉取任务会一直阻塞在有界队列上，不能只等拉取任务
+            await asyncio.wait({producers, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            if writer_task.done():
+                producers.cancel()
+                # 取消后的结果不再关心，避免未读取异常的警告
+                await asyncio.wait({producers})
+                if not producers.cancelled():
+                    producers.exception()
+            else:
+                await producers
+        finally:
+            for t in tasks:
+                t.cancel()
+            # 写入任务还在运行时才发送结束标记，让它写完队列里的数据并记录断点
+            if not writer_task.done():
+                sentinel = asyncio.ensure_future(queue.put(None))
+                await asyncio.wait({sentinel, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+                sentinel.cancel()
+            # 写入失败时抛出原始异常，断点停留在最后一次成功写入的批次
+            await writer_task
+        self.checkpoint_file.unlink()
+        return self.rows_written
+
+    @classmethod
+    def reset(cls, target: str) -> bool:
+        """
+        删除断点从头导出
+        """
+        checkpoint_file = cls.checkpoint_path(cls.resolve_target(target))
+        if checkpoint_file.exists():
+            checkpoint_file.unlink()
+            return True
+        return False
@@ -0,0 +1,166 @@
+import time
+import signal
+import asyncio
+import logging
+from typing import Any, Coroutine, Dict, Optional
+
+from rich.live import Live
+from rich.text import Text
+from rich.console import Console
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "STATUS_OK",
+    "STATUS_FAILED",
+    "STATUS_TIMEOUT",
+    "STATUS_CANCELLED",
+    "FanoutInterrupted",
+    "FanoutResult",
+    "XxlFanout",
+]
+
+STATUS_PENDING = "PENDING"
+STATUS_OK = "OK"
+STATUS_FAILED = "FAILED"
+STATUS_TIMEOUT = "TIMEOUT"
+STATUS_CANCELLED = "CANCELLED"
+
+_STATUS_MARKS = {
+    STATUS_PENDING: ("…", "yellow"),
+    STATUS_OK: ("✓", "green"),
+    STATUS_FAILED: ("✗", "red"),
+    STATUS_TIMEOUT: ("⏱", "red"),
+    STATUS_CANCELLED: ("-", "grey50"),
+}
+
+
+class FanoutInterrupted(Exception):
+    """
+    不接受部分结果的调用被Ctrl-C中断
+    """
+
+
+class FanoutResult(object):
+    __slots__ = ("cluster", "status", "value", "error", "elapsed")
+
+    def __init__(self, cluster: str) -> None:
+        self.cluster = cluster
+        self.status = STATUS_PENDING
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+class _ProgressLine(object):
+    def __init__(self, fanout: "XxlFanout") -> None:
+        self.fanout = fanout
+
+    def __rich__(self) -> Text:
+        # 在Live的刷新线程中调用，不能依赖事件循环的时间
+        now = time.monotonic()
+        line = Text(f"{self.fanout.title} " if self.fanout.title else "")
+        for i, result in enumerate(self.fanout.results.values()):
+            if i:
+                line.append(" | ", style="grey50")
+            elapsed = result.elapsed if result.status != STATUS_PENDING else now - self.fanout.begin
+            mark, style = _STATUS_MARKS[result.status]
+            line.append(f"{result.cluster.upper()} {mark} {elapsed:.1f}s", style=style)
+        line.append("  Ctrl-C中断", style="grey50")
+        return line
+
+
+class XxlFanout(object):
+    """
+    并发在多个集群上执行请求：实时显示各集群进度，Ctrl-C只取消未完成的请求，
+    超过deadline的集群标记为TIMEOUT，已完成集群的结果照常返回
+    """
+
+    def __init__(self, console: Console, deadline: Optional[float] = None, title: str = "") -> None:
+        self.console = console
+        self.deadline = deadline
+        self.title = title
+        self.results: Dict[str, FanoutResult] = {}
+        self.interrupted = False
+        self.begin = 0.0
+        self._previous_sigint = None
+
+    def _finish(self, cluster: str, task: asyncio.Task):
+        result = self.results[cluster]
+        result.elapsed = time.monotonic() - self.begin
+        if task.cancelled():
+            # 超时取消的状态已提前设置
+            if result.status == STATUS_PENDING:
+                result.status = STATUS_CANCELLED
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"{cluster} fan-out failed: {error!r}")
+            result.status = STATUS_FAILED
+            result.error = error
+        else:
+            result.status = STATUS_OK
+            result.value = task.result()
+
+    def _install_sigint(self, loop: asyncio.AbstractEventLoop, tasks: Dict[str, asyncio.Task]) -> bool:
+        def on_sigint():
+            self.interrupted = True
+            for task in tasks.values():
+                task.cancel()
+
+        self._previous_sigint = signal.getsignal(signal.SIGINT)
+        try:
+            loop.add_signal_handler(signal.SIGINT, on_sigint)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Windows或非主线程不支持，Ctrl-C沿用原来的处理
+            return False
+        return True
+
+    def _restore_sigint(self, loop: asyncio.AbstractEventLoop):
+        loop.remove_signal_handler(signal.SIGINT)
+        # remove_signal_handler只会恢复默认处理，asyncio.run自己的处理需要手动还原
+        if self._previous_sigint is not None:
+            signal.signal(signal.SIGINT, self._previous_sigint)
+
+    async def run(self, calls: Dict[str, Coroutine], partial: bool = True) -> Dict[str, FanoutResult]:
+        """
+        partial=False时被中断抛出FanoutInterrupted，用于不能只处理部分集群的场景
+        """
+        loop = asyncio.get_running_loop()
+        self.begin = time.monotonic()
+        self.results = {cluster: FanoutResult(cluster) for cluster in calls}
+        if not calls:
+            return self.results
+        # 任务按集群命名，profile按名称统计各集群耗时
+        tasks = {cluster: asyncio.create_task(call, name=cluster) for cluster, call in calls.items()}
+        for cluster, task in tasks.items():
+            task.add_done_callback(lambda t, c=cluster: self._finish(c, t))
+        sigint_installed = self._install_sigint(loop, tasks)
+        # 只有一个集群时进度意义不大，非终端输出时不显示
+        show_progress = self.console.is_terminal and len(tasks) > 1
+        live = Live(_ProgressLine(self), console=self.console, transient=True, refresh_per_second=10)
+        try:
+            if show_progress:
+                live.start()
+            _, pending = await asyncio.wait(tasks.values(), timeout=self.deadline)
+            for cluster, task in tasks.items():
+                if task in pending:
+                    self.results[cluster].status = STATUS_TIMEOUT
+                    task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        finally:
+            # 外层被取消时不留下孤儿请求
+            for task in tasks.values():
+                task.cancel()
+            if show_progress:
+                live.stop()
+            if sigint_installed:
+                self._restore_sigint(loop)
+        if self.interrupted and not partial:
+            raise FanoutInterrupted()
+        return self.results
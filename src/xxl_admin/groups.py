@@ -0,0 +1,153 @@
+import json
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .client import XxlAdminClient
+from .models import JobGroup
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_REMOVE = "remove"
+
+# 注册方式：0自动注册，1手动录入
+ADDRESS_TYPES = {"auto": 0, "manual": 1, 0: 0, 1: 1}
+
+
+def address_set(address_list: Optional[str]) -> Set[str]:
+    return {a.strip() for a in (address_list or "").split(",") if a.strip()}
+
+
+def address_type_name(address_type: int) -> str:
+    return "自动" if address_type == 0 else "手动"
+
+
+class GroupChange(NamedTuple):
+    cluster: str
+    action: str
+    # 要提交的执行器，删除时为现有执行器
+    group: JobGroup
+    current: Optional[JobGroup] = None
+
+    def describe(self) -> str:
+        if self.action == ACTION_CREATE:
+            addresses = f" {self.group.address_list}" if self.group.address_type == 1 else ""
+            return f"{self.group.title} {address_type_name(self.group.address_type)}{addresses}"
+        if self.action == ACTION_REMOVE:
+            return self.group.title
+        old, new = self.current, self.group
+        diffs = []
+        if old.title != new.title:
+            diffs.append(f"名称: {old.title} -> {new.title}")
+        if old.address_type != new.address_type:
+            diffs.append(f"注册方式: {address_type_name(old.address_type)} -> {address_type_name(new.address_type)}")
+        if new.address_type == 1 and address_set(old.address_list) != address_set(new.address_list):
+            diffs.append(f"机器地址: {old.address_list or ''} -> {new.address_list}")
+        return "; ".join(diffs)
+
+
+def load_group_specs(path: str) -> List[JobGroup]:
+    """
+    读取期望的执行器列表，.yaml/.yml需要PyYAML，其余按JSON解析
+    """
+    file = Path(path)
+    text = file.read_text(encoding="utf-8")
+    if file.suffix in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError("解析YAML需要安装PyYAML（pip install xxl-admin-sh[yaml]），或改用JSON文件")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("groups")
+    groups = []
+    seen = set()
+    for i, item in enumerate(data or []):
+        appname = str(item.get("appname") or "").strip()
+        if not appname:
+            raise ValueError(f"第{i + 1}个执行器缺少appname")
+        if appname in seen:
+            raise ValueError(f"执行器重复：{appname}")
+        seen.add(appname)
+        address_type = ADDRESS_TYPES.get(item.get("address_type", item.get("addressType", "auto")))
+        if address_type is None:
+            raise ValueError(f"执行器{appname}的address_type只能是auto或manual")
+        addresses = item.get("address_list", item.get("addressList")) or []
+        if isinstance(addresses, str):
+            addresses = addresses.split(",")
+        addresses = [a.strip() for a in addresses if a and a.strip()]
+        if address_type == 1 and not addresses:
+            raise ValueError(f"执行器{appname}手动录入时address_list不能为空")
+        groups.append(
+            JobGroup(
+                appname=appname,
+                title=str(item.get("title") or appname),
+                address_type=address_type,
+                address_list=",".join(addresses) if address_type == 1 else None,
+            )
+        )
+    return groups
+
+
+def _differs(current: JobGroup, target: JobGroup) -> bool:
+    if current.title != target.title or current.address_type != target.address_type:
+        return True
+    # 自动注册的地址由调度中心维护，不参与比较
+    return target.address_type == 1 and address_set(current.address_list) != address_set(target.address_list)
+
+
+def diff_groups(cluster: str, desired: List[JobGroup], current: List[JobGroup], prune: bool = False) -> List[GroupChange]:
+    """
+    对比期望与现有执行器，只生成必要的变更，prune=True时删除不在期望列表中的执行器
+    """
+    existing: Dict[str, JobGroup] = {g.appname: g for g in current}
+    changes = []
+    for want in desired:
+        have = existing.get(want.appname)
+        if have is None:
+            changes.append(GroupChange(cluster, ACTION_CREATE, want))
+            continue
+        target = have.replace(
+            title=want.title,
+            address_type=want.address_type,
+            address_list=want.address_list if want.address_type == 1 else have.address_list,
+        )
+        if _differs(have, target):
+            changes.append(GroupChange(cluster, ACTION_UPDATE, target, have))
+    if prune:
+        names = {g.appname for g in desired}
+        changes.extend(GroupChange(cluster, ACTION_REMOVE, g, g) for g in current if g.appname not in names)
+    return changes
+
+
+async def apply_changes(
+    clients: Dict[str, XxlAdminClient], changes: List[GroupChange], concurrency: int = 4
+) -> List[Tuple[GroupChange, bool]]:
+    """
+    并发提交变更，单个变更失败不影响其他变更
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def apply(change: GroupChange) -> bool:
+        client = clients[change.cluster]
+        async with semaphore:
+            try:
+                if change.action == ACTION_CREATE:
+                    return await client.add_group(change.group)
+                if change.action == ACTION_UPDATE:
+                    return await client.update_group(change.group)
+                return await client.remove_group(change.group.id)
+            except Exception as e:
+                logger.exception(e)
+                return False
+
+    results = await asyncio.gather(*[apply(change) for change in changes])
+    return list(zip(changes, results))
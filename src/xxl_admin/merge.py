@@ -0,0 +1,119 @@
+import heapq
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+async def prefetch_records(pages: AsyncIterator[List[T]]) -> AsyncIterator[T]:
+    """
+    逐条返回分页数据，消费当前页时后台预取下一页
+    """
+    it = pages.__aiter__()
+    next_page = asyncio.ensure_future(it.__anext__())
+    try:
+        while True:
+            try:
+                page = await next_page
+            except StopAsyncIteration:
+                return
+            next_page = asyncio.ensure_future(it.__anext__())
+            for record in page:
+                yield record
+    finally:
+        if not next_page.done():
+            next_page.cancel()
+
+
+async def sorted_records(pages: AsyncIterator[List[T]], key: Callable[[T], Hashable]) -> AsyncIterator[T]:
+    """
+    接口返回顺序与排序键不一致时，只能先拉完该集群的数据再排序
+    """
+    records = []
+    async for page in pages:
+        records.extend(page)
+    records.sort(key=key)
+    for record in records:
+        yield record
+
+
+async def _next_or_none(it: AsyncIterator[T]):
+    try:
+        return await it.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def peek_records(it: AsyncIterator[T]) -> List[T]:
+    """
+    取出第一条记录，流为空时返回空列表
+    """
+    head = await _next_or_none(it)
+    return [] if head is None else [head]
+
+
+async def resume_stream(
+    heads: List[T],
+    it: AsyncIterator[T],
+    on_error: Callable[[BaseException], None],
+    timeout: Optional[float] = None,
+) -> AsyncIterator[T]:
+    """
+    先返回已取出的记录再继续消费it；出错或等待下一条超过timeout时交给on_error并结束，
+    只影响这一个集群的流，不中断整个归并
+    """
+    for record in heads:
+        yield record
+    while True:
+        try:
+            record = await asyncio.wait_for(it.__anext__(), timeout)
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            on_error(e)
+            return
+        yield record
+
+
+async def merge_streams(
+    streams: Dict[str, AsyncIterator[T]], key: Callable[[T], Hashable]
+) -> AsyncIterator[Tuple[str, T]]:
+    """
+    基于堆的k路归并，每个集群的流需已按key有序，返回(集群, 记录)
+    所有集群的第一条数据到达后即开始输出，不必等最慢的集群拉完
+    """
+    iters = {cluster: stream.__aiter__() for cluster, stream in streams.items()}
+    heads = await asyncio.gather(*[_next_or_none(it) for it in iters.values()])
+    heap = []
+    # 集群序号参与比较，key相同时保持集群顺序且不会比较记录本身
+    order = {cluster: i for i, cluster in enumerate(iters)}
+    for cluster, head in zip(iters, heads):
+        if head is not None:
+            heap.append((key(head), order[cluster], cluster, head))
+    heapq.heapify(heap)
+    while heap:
+        _, idx, cluster, record = heapq.heappop(heap)
+        yield cluster, record
+        nxt = await _next_or_none(iters[cluster])
+        if nxt is not None:
+            heapq.heappush(heap, (key(nxt), idx, cluster, nxt))
+
+
+async def dedupe_merged(
+    merged: AsyncIterator[Tuple[str, T]], key: Callable[[T], Hashable], row: Callable[[str, T], Tuple]
+) -> AsyncIterator[Tuple[List[str], Tuple]]:
+    """
+    归并结果中排序键相同且展示内容完全一致的行合并为一行，返回(集群列表, 行)
+    """
+    run_key = object()
+    run: Dict[Tuple, List[str]] = {}
+    async for cluster, record in merged:
+        k = key(record)
+        if k != run_key:
+            for r, clusters in run.items():
+                yield clusters, r
+            run = {}
+            run_key = k
+        run.setdefault(row(cluster, record), []).append(cluster)
+    for r, clusters in run.items():
+        yield clusters, r
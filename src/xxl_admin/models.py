@@ -0,0 +1,156 @@
+import sys
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+from .utils import json_loads
+
+__all__ = ["XxlRecord", "JobGroup", "JobInfo", "JobLog", "decode_records"]
+
+R = TypeVar("R", bound="XxlRecord")
+
+# joblog/pageList的logStatus取值
+LOG_STATUS_ALL = -1
+LOG_STATUS_SUCCESS = 1
+LOG_STATUS_FAILED = 2
+LOG_STATUS_RUNNING = 3
+
+
+class XxlRecord(object):
+    """
+    紧凑的记录基类，字段定义为(属性名, 接口字段名, 默认值)
+    """
+
+    __slots__ = ()
+    _fields: Tuple[Tuple[str, str, Any], ...] = ()
+    # 取值有限的字符串字段，解析时intern以便大量记录共享同一对象
+    _interned: Tuple[str, ...] = ()
+
+    def __init__(self, **kwargs) -> None:
+        for attr, _, default in self._fields:
+            setattr(self, attr, kwargs.pop(attr, default))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} got unexpected fields: {', '.join(kwargs)}")
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict) -> R:
+        obj = cls.__new__(cls)
+        get = data.get
+        for attr, key, default in cls._fields:
+            setattr(obj, attr, get(key, default))
+        for attr in cls._interned:
+            value = getattr(obj, attr)
+            if type(value) is str:
+                setattr(obj, attr, sys.intern(value))
+        return obj
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, attr) for attr, key, _ in self._fields}
+
+    def replace(self: R, **changes) -> R:
+        values = {attr: getattr(self, attr) for attr, _, _ in self._fields}
+        values.update(changes)
+        return type(self)(**values)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr, _, _ in self._fields)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r})"
+
+
+def _slots(fields: Tuple[Tuple[str, str, Any], ...]) -> Tuple[str, ...]:
+    return tuple(attr for attr, _, _ in fields)
+
+
+class JobGroup(XxlRecord):
+    _fields = (
+        ("id", "id", 0),
+        ("appname", "appname", ""),
+        ("title", "title", ""),
+        ("address_type", "addressType", 0),
+        ("address_list", "addressList", None),
+        ("registry_list", "registryList", None),
+        ("update_time", "updateTime", None),
+    )
+    __slots__ = _slots(_fields)
+
+
+class JobInfo(XxlRecord):
+    _fields = (
+        ("id", "id", 0),
+        ("job_group", "jobGroup", 0),
+        ("job_desc", "jobDesc", ""),
+        ("author", "author", ""),
+        ("alarm_email", "alarmEmail", ""),
+        ("schedule_type", "scheduleType", "CRON"),
+        ("schedule_conf", "scheduleConf", ""),
+        ("misfire_strategy", "misfireStrategy", "DO_NOTHING"),
+        ("executor_route_strategy", "executorRouteStrategy", "FIRST"),
+        ("executor_handler", "executorHandler", ""),
+        ("executor_param", "executorParam", ""),
+        ("executor_block_strategy", "executorBlockStrategy", "SERIAL_EXECUTION"),
+        ("executor_timeout", "executorTimeout", 0),
+        ("executor_fail_retry_count", "executorFailRetryCount", 0),
+        ("glue_type", "glueType", "BEAN"),
+        ("glue_remark", "glueRemark", ""),
+        ("child_job_id", "childJobId", ""),
+        ("trigger_status", "triggerStatus", 0),
+        ("trigger_last_time", "triggerLastTime", 0),
+        ("trigger_next_time", "triggerNextTime", 0),
+        ("update_time", "updateTime", None),
+    )
+    _interned = (
+        "author",
+        "schedule_type",
+        "misfire_strategy",
+        "executor_route_strategy",
+        "executor_block_strategy",
+        "glue_type",
+    )
+    __slots__ = _slots(_fields)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "JobInfo":
+        obj = super().from_dict(data)
+        # 2.2.*只有jobCron，统一成2.4.*的scheduleType/scheduleConf
+        if "scheduleConf" not in data and "jobCron" in data:
+            obj.schedule_type = "CRON"
+            obj.schedule_conf = data["jobCron"]
+        return obj
+
+    @property
+    def enabled(self) -> bool:
+        return self.trigger_status == 1
+
+
+class JobLog(XxlRecord):
+    _fields = (
+        ("id", "id", 0),
+        ("job_group", "jobGroup", 0),
+        ("job_id", "jobId", 0),
+        ("executor_address", "executorAddress", None),
+        ("executor_handler", "executorHandler", ""),
+        ("executor_param", "executorParam", ""),
+        ("executor_fail_retry_count", "executorFailRetryCount", 0),
+        ("trigger_time", "triggerTime", None),
+        ("trigger_code", "triggerCode", 0),
+        ("trigger_msg", "triggerMsg", None),
+        ("handle_time", "handleTime", None),
+        ("handle_code", "handleCode", 0),
+        ("handle_msg", "handleMsg", None),
+    )
+    _interned = ("executor_address", "executor_handler")
+    __slots__ = _slots(_fields)
+
+
+def decode_records(record_type: Type[R], content: bytes, key: str = "data") -> List[R]:
+    """
+    解析接口返回的分页数据，响应不是分页数据（如未登录、出错时的错误信息）时抛出ValueError
+    """
+    body = json_loads(content)
+    if not isinstance(body, dict) or key not in body:
+        raise ValueError(f"unexpected page response: {content[:200]!r}")
+    data = body[key] or []
+    from_dict = record_type.from_dict
+    return [from_dict(item) for item in data]
@@ -0,0 +1,195 @@
+import sys
+import socket
+import struct
+import ipaddress
+from urllib.parse import urlsplit
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .models import JobGroup, JobInfo
+
+try:
+    import fcntl
+except ImportError:
+    # Windows没有fcntl，只能依赖主机名解析和出口地址
+    fcntl = None
+
+# 读取网卡IPv4地址的ioctl
+SIOCGIFADDR = 0xC0206921 if sys.platform == "darwin" else 0x8915
+
+
+class NodeAddress(NamedTuple):
+    host: str
+    port: int
+
+    def __str__(self) -> str:
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        return f"{host}:{self.port}"
+
+
+def parse_address(address: str) -> Optional[NodeAddress]:
+    """
+    解析执行器注册地址，如 http://10.0.0.1:9999/ 或 10.0.0.1:9999
+    """
+    address = address.strip()
+    if not address:
+        return None
+    if "://" not in address:
+        address = f"http://{address}"
+    try:
+        parts = urlsplit(address)
+        port = parts.port
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    if port is None:
+        port = 443 if parts.scheme == "https" else 80
+    return NodeAddress(parts.hostname.lower(), port)
+
+
+def _has_port(query: str) -> bool:
+    try:
+        # 不带端口的IPv6地址本身包含冒号
+        ipaddress.ip_address(query.strip("[]"))
+        return False
+    except ValueError:
+        pass
+    _, sep, port = query.rpartition(":")
+    return bool(sep) and port.isdigit()
+
+
+def resolve_host(host: str) -> Set[str]:
+    """
+    主机名解析成IP，本身是IP时原样返回
+    """
+    try:
+        return {str(ipaddress.ip_address(host))}
+    except ValueError:
+        pass
+    try:
+        return {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except OSError:
+        return set()
+
+
+def interface_addresses() -> Set[str]:
+    """
+    逐个网卡读取地址（包括docker网桥、VPN等非默认路由的网卡）：
+    IPv4用SIOCGIFADDR（每个网卡的主地址），IPv6读Linux的/proc/net/if_inet6，不支持的平台返回空集合
+    """
+    addresses = set()
+    if fcntl is not None and hasattr(socket, "if_nameindex"):
+        try:
+            names = [name for _, name in socket.if_nameindex()]
+        except OSError:
+            names = []
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            for name in names:
+                try:
+                    ifreq = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack("256s", name.encode()[:15]))
+                except OSError:
+                    # 网卡没有IPv4地址或未启用
+                    continue
+                addresses.add(socket.inet_ntoa(ifreq[20:24]))
+    try:
+        with open("/proc/net/if_inet6") as f:
+            for line in f:
+                addresses.add(str(ipaddress.IPv6Address(int(line.split()[0], 16))))
+    except (OSError, ValueError, IndexError):
+        pass
+    return addresses
+
+
+def local_addresses() -> Set[str]:
+    """
+    本机的地址：各网卡地址、主机名及其解析结果、默认路由出口地址和回环地址
+    """
+    addresses = {"127.0.0.1", "::1"}
+    hostname = socket.gethostname()
+    addresses.add(hostname.lower())
+    addresses.update(resolve_host(hostname))
+    try:
+        addresses.update(socket.gethostbyname_ex(hostname)[2])
+    except OSError:
+        pass
+    # 多网卡时主机名不一定能解析到实际出口地址，UDP connect不会真的发包
+    for family, target in ((socket.AF_INET, "8.8.8.8"), (socket.AF_INET6, "2001:4860:4860::8888")):
+        try:
+            with socket.socket(family, socket.SOCK_DGRAM) as s:
+                s.connect((target, 80))
+                addresses.add(s.getsockname()[0])
+        except OSError:
+            pass
+    addresses.update(interface_addresses())
+    return addresses
+
+
+def group_nodes(group: JobGroup) -> List[Tuple[str, NodeAddress]]:
+    """
+    执行器的节点：自动注册取registryList，手动录入取addressList，返回(原始地址, 解析后的地址)
+    """
+    raw = group.registry_list
+    if not raw and group.address_list:
+        raw = group.address_list.split(",")
+    nodes = []
+    for address in raw or ():
+        node = parse_address(address)
+        if node:
+            nodes.append((address, node))
+    return nodes
+
+
+class NodeIndex(object):
+    """
+    单个集群的节点索引：节点 -> 执行器 -> 任务数
+    """
+
+    def __init__(self, groups: List[JobGroup], jobs: Iterable[JobInfo] = ()) -> None:
+        self.groups = {g.id: g for g in groups}
+        self.job_counts: Dict[int, int] = {}
+        for job in jobs:
+            self.job_counts[job.job_group] = self.job_counts.get(job.job_group, 0) + 1
+        self.nodes: Dict[NodeAddress, List[JobGroup]] = {}
+        # 节点 -> 注册时的原始地址，触发任务时原样使用
+        self.raw_addresses: Dict[NodeAddress, str] = {}
+        self._hosts: Dict[str, List[NodeAddress]] = {}
+        for group in groups:
+            for raw, node in group_nodes(group):
+                if node not in self.nodes:
+                    self.nodes[node] = []
+                    self.raw_addresses[node] = raw
+                    self._hosts.setdefault(node.host, []).append(node)
+                self.nodes[node].append(group)
+
+    def lookup(self, query: str = "") -> List[NodeAddress]:
+        """
+        按host或host:port精确查找节点，主机名会先解析成IP，不传时返回所有节点
+        """
+        if not query:
+            return sorted(self.nodes)
+        query = query.strip().lower()
+        if "://" in query or _has_port(query):
+            node = parse_address(query)
+            return [node] if node in self.nodes else []
+        host = query.strip("[]")
+        found = []
+        for h in {host} | resolve_host(host):
+            found.extend(self._hosts.get(h, ()))
+        return sorted(set(found))
+
+    def local_nodes(self, addresses: Set[str] = None, group_id: int = None) -> List[NodeAddress]:
+        """
+        注册在本机任意网卡上的节点，指定group_id时只返回注册在该执行器下的节点
+        """
+        if addresses is None:
+            addresses = local_addresses()
+        return sorted(
+            node
+            for host, nodes in self._hosts.items()
+            if host in addresses
+            for node in nodes
+            if group_id is None or any(g.id == group_id for g in self.nodes[node])
+        )
+
+    def job_count(self, group: JobGroup) -> int:
+        return self.job_counts.get(group.id, 0)
@@ -0,0 +1,110 @@
+import time
+import pstats
+import asyncio
+import cProfile
+import logging
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rich.table import Table
+
+logger = logging.getLogger(__name__)
+
+
+class XxlProfiler(object):
+    """
+    命令级性能分析：cProfile + tracemalloc + 每个异步任务（集群）的耗时
+    """
+
+    # 正在分析的实例，coroutine_cmd据此给事件循环装上任务计时
+    active: Optional["XxlProfiler"] = None
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.task_times: Dict[str, List[float]] = {}
+        self.wall_time = 0.0
+        self.peak_memory = 0
+        self.stats: pstats.Stats = None
+
+    def run(self, func: Callable, *args, **kwargs):
+        XxlProfiler.active = self
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        begin = time.perf_counter()
+        try:
+            return self.profile.runcall(func, *args, **kwargs)
+        finally:
+            self.wall_time = time.perf_counter() - begin
+            _, self.peak_memory = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            XxlProfiler.active = None
+            self.stats = pstats.Stats(self.profile)
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        """
+        给事件循环装上记录任务起止时间的task factory
+        """
+
+        def task_factory(loop, coro, **kwargs):
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+            begin = time.perf_counter()
+            task.add_done_callback(lambda t: self._task_done(t, begin))
+            return task
+
+        loop.set_task_factory(task_factory)
+
+    def _task_done(self, task: asyncio.Task, begin: float):
+        name = task.get_name()
+        # 只统计命令里按集群命名的任务，忽略默认名称和库内部任务
+        if name.startswith("Task-") or "<locals>" in name:
+            return
+        self.task_times.setdefault(name, []).append(time.perf_counter() - begin)
+
+    def top_functions(self, limit: int = 20) -> List[Tuple[str, int, float, float]]:
+        rows = []
+        for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in self.stats.stats.items():
+            rows.append((f"{Path(filename).name}:{lineno}({func})", ncalls, tottime, cumtime))
+        rows.sort(key=lambda r: r[3], reverse=True)
+        return rows[:limit]
+
+    def rich_render_time(self) -> float:
+        """
+        rich的Console.print累计耗时（rich.print/print_json最终都走这里）
+        """
+        return sum(
+            cumtime
+            for (filename, _, func), (_, _, _, cumtime, _) in self.stats.stats.items()
+            if func == "print" and Path(filename).match("rich/console.py")
+        )
+
+    def dump(self, out: str):
+        self.stats.dump_stats(out)
+
+    def report(self, limit: int = 20) -> List[Table]:
+        summary = Table(title="性能概览")
+        summary.add_column("指标", style="cyan")
+        summary.add_column("值", justify="right", style="green")
+        summary.add_row("总耗时", f"{self.wall_time * 1000:.1f} ms")
+        summary.add_row("内存峰值", f"{self.peak_memory / 1024 / 1024:.2f} MB")
+        summary.add_row("rich渲染耗时", f"{self.rich_render_time() * 1000:.1f} ms")
+
+        tasks = Table(title="异步任务耗时")
+        tasks.add_column("任务/集群", style="cyan")
+        tasks.add_column("次数", justify="right", style="green")
+        tasks.add_column("总耗时", justify="right", style="green")
+        tasks.add_column("最大耗时", justify="right", style="green")
+        for name, times in sorted(self.task_times.items(), key=lambda kv: sum(kv[1]), reverse=True):
+            tasks.add_row(name, str(len(times)), f"{sum(times) * 1000:.1f} ms", f"{max(times) * 1000:.1f} ms")
+
+        functions = Table(title=f"累计耗时Top{limit}函数")
+        functions.add_column("函数", style="magenta")
+        functions.add_column("调用次数", justify="right", style="green")
+        functions.add_column("自身耗时", justify="right", style="green")
+        functions.add_column("累计耗时", justify="right", style="green")
+        for func, ncalls, tottime, cumtime in self.top_functions(limit):
+            functions.add_row(func, str(ncalls), f"{tottime * 1000:.1f} ms", f"{cumtime * 1000:.1f} ms")
+        return [summary, tasks, functions]
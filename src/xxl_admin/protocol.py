@@ -0,0 +1,99 @@
+from typing import Dict, Optional
+
+from .models import JobGroup, JobInfo
+
+__all__ = ["XxlProtocol", "XxlProtocolV22", "XxlProtocolV24", "XxlProtocolCompat", "detect_protocol", "get_protocol"]
+
+
+class XxlProtocol(object):
+    """
+    不同版本调度中心的任务表单字段差异
+    """
+
+    VERSION = ""
+    # 列表接口支持的过滤条件（对应XxlAdminClient.list_job/job_logs的参数）
+    JOB_FILTERS = frozenset({"executor", "job_desc", "job_group", "status", "author"})
+    LOG_FILTERS = frozenset({"job_id", "job_group", "log_status", "filter_time"})
+
+    def job_payload(self, job: JobInfo) -> Dict:
+        payload = {
+            "jobGroup": job.job_group,
+            "jobDesc": job.job_desc,
+            "author": job.author,
+            "alarmEmail": job.alarm_email or "",
+            "executorRouteStrategy": job.executor_route_strategy,
+            "executorHandler": job.executor_handler,
+            "executorParam": job.executor_param or "",
+            "executorBlockStrategy": job.executor_block_strategy,
+            "executorTimeout": job.executor_timeout,
+            "executorFailRetryCount": job.executor_fail_retry_count,
+            "glueType": job.glue_type,
+            "glueRemark": job.glue_remark or "",
+            "childJobId": job.child_job_id or "",
+        }
+        if job.id > 0:
+            payload["id"] = job.id
+        payload.update(self.schedule_payload(job))
+        return payload
+
+    def schedule_payload(self, job: JobInfo) -> Dict:
+        raise NotImplementedError
+
+    def group_payload(self, group: JobGroup) -> Dict:
+        payload = {
+            "appname": group.appname,
+            "title": group.title,
+            "addressType": group.address_type,
+            # 自动注册时调度中心忽略addressList
+            "addressList": group.address_list or "",
+        }
+        if group.id > 0:
+            payload["id"] = group.id
+        return payload
+
+
+class XxlProtocolV22(XxlProtocol):
+    VERSION = "2.2"
+
+    def schedule_payload(self, job: JobInfo) -> Dict:
+        return {"jobCron": job.schedule_conf}
+
+
+class XxlProtocolV24(XxlProtocol):
+    VERSION = "2.4"
+
+    def schedule_payload(self, job: JobInfo) -> Dict:
+        return {
+            "scheduleType": job.schedule_type,
+            "scheduleConf": job.schedule_conf,
+            "misfireStrategy": job.misfire_strategy,
+        }
+
+
+class XxlProtocolCompat(XxlProtocol):
+    """
+    版本未知时两套字段都发送，调度中心会忽略不认识的字段
+    """
+
+    def schedule_payload(self, job: JobInfo) -> Dict:
+        payload = XxlProtocolV22().schedule_payload(job)
+        payload.update(XxlProtocolV24().schedule_payload(job))
+        return payload
+
+
+_PROTOCOLS = {p.VERSION: p() for p in (XxlProtocolV22, XxlProtocolV24, XxlProtocolCompat)}
+
+
+def get_protocol(version: Optional[str]) -> XxlProtocol:
+    return _PROTOCOLS.get(version or "", _PROTOCOLS[""])
+
+
+def detect_protocol(content: bytes) -> Optional[str]:
+    """
+    根据jobinfo/pageList的原始响应判断调度中心版本，没有任务时无法判断返回None
+    """
+    if b'"scheduleConf"' in content:
+        return XxlProtocolV24.VERSION
+    if b'"jobCron"' in content:
+        return XxlProtocolV22.VERSION
+    return None
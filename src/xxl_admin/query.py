@@ -0,0 +1,213 @@
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Sequence
+
+from .client import XxlAdminClient
+from .models import JobInfo, JobLog, LOG_STATUS_FAILED, LOG_STATUS_RUNNING, LOG_STATUS_SUCCESS
+from .protocol import get_protocol
+from .utils import window
+
+__all__ = [
+    "Predicate",
+    "QueryPlan",
+    "plan_query",
+    "plan_job_query",
+    "plan_log_query",
+    "job_predicates",
+    "log_predicates",
+    "job_pages",
+    "query_jobs",
+    "query_job_logs",
+]
+
+# 本地过滤时每页拉取的行数
+PAGE_SIZE = 200
+
+
+class Predicate(NamedTuple):
+    """
+    过滤条件：test用于本地过滤，param不为空时可以作为接口参数下推到调度中心
+    """
+
+    name: str
+    test: Callable[[Any], bool]
+    param: Optional[str] = None
+    value: Any = None
+
+
+def _contains(attr: str, value: str) -> Callable[[Any], bool]:
+    # 与调度中心的like查询一致，不区分大小写
+    value = value.lower()
+    return lambda r: value in (getattr(r, attr) or "").lower()
+
+
+def _contains_any(attr: str, values: Sequence[str]) -> Callable[[Any], bool]:
+    values = [v.lower() for v in values]
+    return lambda r: any(v in (getattr(r, attr) or "").lower() for v in values)
+
+
+def _equals(attr: str, value: Any) -> Callable[[Any], bool]:
+    return lambda r: getattr(r, attr) == value
+
+
+class QueryPlan(object):
+    def __init__(self, pushed: List[Predicate], local: List[Predicate], use_cache: bool = False) -> None:
+        self.pushed = pushed
+        self.local = local
+        self.use_cache = use_cache
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {p.param: p.value for p in self.pushed}
+
+    def matches(self, record) -> bool:
+        return all(p.test(record) for p in self.local)
+
+    def describe(self) -> str:
+        if self.use_cache:
+            return f"本地缓存过滤: {', '.join(p.name for p in self.local) or '无'}"
+        pushed = ", ".join(p.name for p in self.pushed) or "无"
+        local = ", ".join(p.name for p in self.local) or "无"
+        return f"调度中心过滤: {pushed}; 本地过滤: {local}"
+
+
+def plan_query(predicates: List[Predicate], supported: FrozenSet[str], cache_fresh: bool = False) -> QueryPlan:
+    """
+    接口支持的条件下推到调度中心，其余条件在本地过滤；
+    所有条件都不能下推且本地有完整目录缓存时，直接在缓存上计算，不再请求调度中心。
+    能下推的条件（如启停状态）变化频繁，始终以调度中心为准
+    """
+    pushed, local = [], []
+    for p in predicates:
+        if p.param in supported and p.param not in {x.param for x in pushed}:
+            pushed.append(p)
+        else:
+            local.append(p)
+    if local and not pushed and cache_fresh:
+        return QueryPlan([], local, use_cache=True)
+    return QueryPlan(pushed, local)
+
+
+def job_predicates(
+    executor: str = "",
+    job_group: int = -1,
+    status: Optional[int] = None,
+    authors: Sequence[str] = (),
+    job_desc: str = "",
+    cron: str = "",
+    glue_type: str = "",
+) -> List[Predicate]:
+    predicates = []
+    if executor:
+        predicates.append(Predicate(f"handler~{executor}", _contains("executor_handler", executor), "executor", executor))
+    if job_group > 0:
+        predicates.append(Predicate(f"group={job_group}", _equals("job_group", job_group), "job_group", job_group))
+    if status is not None:
+        predicates.append(Predicate(f"status={status}", _equals("trigger_status", status), "status", status))
+    if len(authors) == 1:
+        predicates.append(Predicate(f"author~{authors[0]}", _contains("author", authors[0]), "author", authors[0]))
+    elif authors:
+        # 多个负责人是"或"的关系，接口只支持一个值，只能本地过滤
+        predicates.append(Predicate(f"author~{'|'.join(authors)}", _contains_any("author", authors)))
+    if job_desc:
+        predicates.append(Predicate(f"desc~{job_desc}", _contains("job_desc", job_desc), "job_desc", job_desc))
+    if cron:
+        predicates.append(Predicate(f"cron~{cron}", _contains("schedule_conf", cron)))
+    if glue_type:
+        predicates.append(Predicate(f"glue={glue_type.upper()}", _equals("glue_type", glue_type.upper())))
+    return predicates
+
+
+def _log_status_test(log_status: int) -> Callable[[JobLog], bool]:
+    if log_status == LOG_STATUS_SUCCESS:
+        return lambda r: r.handle_code == 200
+    if log_status == LOG_STATUS_RUNNING:
+        return lambda r: r.trigger_code == 200 and r.handle_code == 0
+    if log_status == LOG_STATUS_FAILED:
+        return lambda r: r.trigger_code not in (0, 200) or r.handle_code not in (0, 200)
+    return lambda r: True
+
+
+def _time_between(filter_time: str) -> Callable[[JobLog], bool]:
+    start, _, end = filter_time.partition(" - ")
+    return lambda r: r.trigger_time is not None and start <= r.trigger_time <= end
+
+
+def log_predicates(
+    job_id: int = 0,
+    job_group: int = 0,
+    log_status: int = -1,
+    filter_time: str = "",
+    param: str = "",
+) -> List[Predicate]:
+    predicates = []
+    # 未匹配到任务时job_id为-1，同样下推，调度中心返回空结果
+    if job_id != 0:
+        predicates.append(Predicate(f"job={job_id}", _equals("job_id", job_id), "job_id", job_id))
+    if job_group > 0:
+        predicates.append(Predicate(f"group={job_group}", _equals("job_group", job_group), "job_group", job_group))
+    if log_status >= 0:
+        predicates.append(Predicate(f"status={log_status}", _log_status_test(log_status), "log_status", log_status))
+    if filter_time:
+        predicates.append(Predicate(f"time={filter_time}", _time_between(filter_time), "filter_time", filter_time))
+    if param:
+        predicates.append(Predicate(f"param~{param}", _contains("executor_param", param)))
+    return predicates
+
+
+def plan_job_query(client: XxlAdminClient, predicates: List[Predicate]) -> QueryPlan:
+    supported = get_protocol(client.version).JOB_FILTERS
+    return plan_query(predicates, supported, cache_fresh=client.has_fresh_catalog("job"))
+
+
+def plan_log_query(client: XxlAdminClient, predicates: List[Predicate]) -> QueryPlan:
+    # 调度日志没有本地缓存
+    return plan_query(predicates, get_protocol(client.version).LOG_FILTERS)
+
+
+async def _matching_pages(fetch, plan: QueryPlan, params: Dict[str, Any]) -> AsyncIterator[list]:
+    async for page in XxlAdminClient._paginate(fetch, page_size=PAGE_SIZE, **params):
+        matched = [r for r in page if plan.matches(r)]
+        if matched:
+            yield matched
+
+
+async def job_pages(client: XxlAdminClient, plan: QueryPlan) -> AsyncIterator[List[JobInfo]]:
+    """
+    按计划逐页返回满足条件的任务，顺序与接口一致（ID倒序）
+    """
+    if plan.use_cache:
+        jobs = [j for j in await client.cached_jobs() if plan.matches(j)]
+        jobs.sort(key=lambda j: -j.id)
+        for i in range(0, len(jobs), PAGE_SIZE):
+            yield jobs[i : i + PAGE_SIZE]
+        return
+    async for page in _matching_pages(client.list_job, plan, plan.params):
+        yield page
+
+
+async def _records(pages: AsyncIterator[list]) -> AsyncIterator:
+    try:
+        async for page in pages:
+            for record in page:
+                yield record
+    finally:
+        await pages.aclose()
+
+
+async def _window(pages: AsyncIterator[list], limit: int, offset: int) -> list:
+    return [record async for record in window(_records(pages), limit, offset)]
+
+
+async def query_jobs(client: XxlAdminClient, plan: QueryPlan, limit: int, offset: int = 0) -> List[JobInfo]:
+    if not plan.local:
+        # 全部条件都已下推，分页也交给调度中心
+        return await client.list_job(start=offset, length=limit, **plan.params)
+    return await _window(job_pages(client, plan), limit, offset)
+
+
+async def query_job_logs(client: XxlAdminClient, plan: QueryPlan, limit: int, offset: int = 0) -> List[JobLog]:
+    params = plan.params
+    # job_logs的job_id是必填参数，0表示所有任务
+    params.setdefault("job_id", 0)
+    if not plan.local:
+        return await client.job_logs(start=offset, length=limit, **params)
+    return await _window(_matching_pages(client.job_logs, plan, params), limit, offset)
@@ -0,0 +1,243 @@
+import shutil
+import subprocess
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from rich.cells import cell_len
+from rich.console import Console
+from rich.pager import Pager
+from rich.table import Table
+from rich.text import Text
+
+from .utils import window
+
+__all__ = ["ColumnSpec", "TableSchema", "XxlRenderer"]
+
+
+class ColumnSpec(NamedTuple):
+    header: str
+    style: str = "cyan"
+    justify: str = "left"
+    no_wrap: bool = False
+
+
+class TableSchema(object):
+    """
+    表格的列定义
+    """
+
+    def __init__(self, columns: Sequence[ColumnSpec]) -> None:
+        self.columns = list(columns)
+
+
+class LessPager(Pager):
+    """
+    rich默认的SystemPager调用less时不带-R，颜色会显示成控制字符
+    """
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+
+    def show(self, content: str) -> None:
+        try:
+            # -F 一屏能显示完时直接退出，-X 退出后保留输出
+            subprocess.run([self.command, "-R", "-F", "-X"], input=content, text=True, encoding="utf-8")
+        except KeyboardInterrupt:
+            pass
+
+    @contextmanager
+    def pipe(self) -> Iterator[Callable[[str], bool]]:
+        """
+        边渲染边写入less，不必等全部输出；用户退出less后写入返回False
+        """
+        process = subprocess.Popen([self.command, "-R", "-F", "-X"], stdin=subprocess.PIPE, text=True, encoding="utf-8")
+
+        def write(content: str) -> bool:
+            try:
+                process.stdin.write(content)
+                process.stdin.flush()
+                return True
+            except OSError:
+                return False
+
+        try:
+            yield write
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            try:
+                process.wait()
+            except KeyboardInterrupt:
+                process.terminate()
+                process.wait()
+
+
+def _cell_width(cell: str) -> int:
+    if "[" in cell:
+        # highlight等生成的markup不占显示宽度
+        cell = Text.from_markup(cell).plain
+    return max((cell_len(line) for line in cell.splitlines()), default=0)
+
+
+class XxlRenderer(object):
+    """
+    所有命令共用的输出层：复用同一个Console，流式结果分批渲染并对齐列宽，
+    超过一屏时交给分页器
+    """
+
+    # 标题、表头和边框占用的行数
+    TABLE_OVERHEAD = 5
+
+    def __init__(self, console: Console = None) -> None:
+        self.console = console or Console()
+        less = shutil.which("less")
+        self._pager = LessPager(less) if less else None
+
+    @property
+    def batch_size(self) -> int:
+        return max(self.console.height - self.TABLE_OVERHEAD, 10)
+
+    def _measure(self, schema: TableSchema, rows: Iterable[Tuple], widths: List[int] = None) -> List[int]:
+        """
+        测量一批行的列宽；传入同一次流式输出之前的列宽时只增不减，后续批次与之前对齐
+        """
+        widths = widths or [cell_len(c.header) for c in schema.columns]
+        # 单列过宽时交给rich折行，不让它挤占其他列
+        max_width = max(self.console.width // 2, 10)
+        for row in rows:
+            for i, cell in enumerate(row):
+                w = min(_cell_width(cell or ""), max_width)
+                if w > widths[i]:
+                    widths[i] = w
+        return widths
+
+    def _fit(self, schema: TableSchema, widths: List[int]) -> Optional[List[int]]:
+        """
+        超出终端宽度时压缩到终端宽度：表头不截断，各列按超出表头的部分等比例压缩；
+        终端连表头都放不下时返回None，交给rich自己布局
+        """
+        # 每列左右padding各1加一条分隔线
+        available = self.console.width - 3 * len(widths) - 1
+        if sum(widths) <= available:
+            return widths
+        floors = [min(cell_len(c.header), w) for c, w in zip(schema.columns, widths)]
+        spare = available - sum(floors)
+        if spare <= 0:
+            return None
+        extra = [w - f for w, f in zip(widths, floors)]
+        total = sum(extra)
+        return [f + e * spare // total for f, e in zip(floors, extra)]
+
+    def table(
+        self,
+        schema: TableSchema,
+        rows: List[Tuple],
+        title: str = None,
+        show_header: bool = True,
+        widths: List[int] = None,
+    ) -> Table:
+        """
+        列宽直接指定为测量后的宽度，流式输出的各批次对齐；超长内容由rich折行，no_wrap的列截断显示省略号
+        """
+        widths = self._fit(schema, self._measure(schema, rows, widths)) or [None] * len(schema.columns)
+        table = Table(title=title, show_header=show_header)
+        for column, width in zip(schema.columns, widths):
+            table.add_column(
+                column.header, style=column.style, justify=column.justify, no_wrap=column.no_wrap, width=width
+            )
+        for row in rows:
+            table.add_row(*row)
+        return table
+
+    def print_table(self, schema: TableSchema, rows: List[Tuple], title: str = None):
+        self.console.print(self.table(schema, rows, title=title))
+
+    def print(self, *objects, **kwargs):
+        self.console.print(*objects, **kwargs)
+
+    @contextmanager
+    def paging(self, lines: int) -> Iterator[None]:
+        """
+        预计输出超过终端高度时，期间的输出结束后一次性交给分页器
+        """
+        if self._pager and self.console.is_terminal and lines > self.console.height:
+            with self.console.pager(pager=self._pager, styles=True):
+                yield
+        else:
+            yield
+
+    def page_lines(self, row_counts: Iterable[int]) -> int:
+        """
+        估算多张表格的输出行数
+        """
+        return sum(n + self.TABLE_OVERHEAD for n in row_counts)
+
+    @contextmanager
+    def _stream_pager(self) -> Iterator[Callable[[Table], bool]]:
+        """
+        流式输出第一屏之后的部分：终端里逐批写入分页器，否则直接输出；返回False表示分页器已退出
+        """
+        if not (self._pager and self.console.is_terminal):
+
+            def emit(table: Table) -> bool:
+                self.console.print(table)
+                return True
+
+            yield emit
+            return
+        with self._pager.pipe() as write:
+
+            def emit(table: Table) -> bool:
+                with self.console.capture() as capture:
+                    self.console.print(table)
+                return write(capture.get())
+
+            yield emit
+
+    async def print_stream(
+        self,
+        schema: TableSchema,
+        rows: AsyncIterator[Tuple],
+        title: str = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> int:
+        """
+        分批渲染流式结果，每批一张表，只有第一批带标题和表头，返回输出的行数；
+        第一屏直接输出，之后的批次到达一批写入分页器一批，不等待整个流结束
+        """
+        batch_size = self.batch_size
+        it = window(rows, limit, offset).__aiter__()
+        # 列宽只在本次输出内累积
+        widths = [cell_len(c.header) for c in schema.columns]
+        batch: List[Tuple] = []
+        # 先取一屏多一行，判断是否需要分页
+        async for row in it:
+            batch.append(row)
+            if len(batch) > batch_size:
+                break
+        if len(batch) <= batch_size:
+            self.print_table(schema, batch, title=title)
+            return len(batch)
+
+        batch, pending = batch[:batch_size], batch[batch_size:]
+        self.console.print(self.table(schema, batch, title=title, widths=widths))
+        printed = len(batch)
+        with self._stream_pager() as emit:
+            batch = pending
+            while True:
+                async for row in it:
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        break
+                if not batch:
+                    break
+                if not emit(self.table(schema, batch, show_header=False, widths=widths)):
+                    # 用户已退出分页器，不再继续拉取
+                    await it.aclose()
+                    break
+                printed += len(batch)
+                batch = []
+        return printed
@@ -1,4 +1,4 @@
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
 from pydantic import BaseModel
 
 
@@ -6,6 +6,16 @@ class XxlEnvSettings(BaseModel):
     username: str = "admin"
     password: str = ""
     clusters: Dict[str, str] = {"cn": "http://localhost:8080"}
+    # 执行器accessToken，job debug --direct直连执行器时使用
+    executor_token: str = ""
+    # 调度中心连接配置
+    http2: bool = False
+    compression: List[str] = ["gzip", "deflate"]
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    timeout: float = 10.0
+    proxy: Optional[str] = None
 
 
 class XxlSettings(BaseModel):
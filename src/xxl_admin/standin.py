@@ -0,0 +1,282 @@
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+from urllib.parse import parse_qs
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["XxlStandin"]
+
+STANDIN_APPNAME = "xxl-job-executor-standin"
+STANDIN_USERNAME = "admin"
+STANDIN_PASSWORD = "123456"
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class XxlStandin(object):
+    """
+    本地模拟的调度中心+执行器，只实现本工具用到的接口，用于压测结果可复现：
+    触发请求先进入有界的触发队列（满了直接拒绝），由workers个触发线程取出，
+    模拟调用执行器耗时rpc_ms后写入调度结果，执行器再经过handle_ms写入执行结果
+    """
+
+    def __init__(
+        self,
+        handlers: List[str] = None,
+        workers: int = 8,
+        queue_size: int = 1000,
+        rpc_ms: float = 5,
+        handle_ms: float = 50,
+        fail_rate: float = 0.0,
+    ) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rpc_ms = rpc_ms
+        self.handle_ms = handle_ms
+        self.fail_rate = fail_rate
+        self.group = {
+            "id": 1,
+            "appname": STANDIN_APPNAME,
+            "title": "本地模拟执行器",
+            "addressType": 0,
+            "addressList": None,
+            "registryList": ["http://127.0.0.1:9999/"],
+        }
+        self.jobs = [
+            {
+                "id": i,
+                "jobGroup": 1,
+                "jobDesc": handler,
+                "author": STANDIN_USERNAME,
+                "scheduleType": "NONE",
+                "scheduleConf": "",
+                "misfireStrategy": "DO_NOTHING",
+                "executorRouteStrategy": "FIRST",
+                "executorHandler": handler,
+                "executorParam": "",
+                "executorBlockStrategy": "SERIAL_EXECUTION",
+                "glueType": "BEAN",
+                "triggerStatus": 0,
+            }
+            for i, handler in enumerate(handlers or ["demoJobHandler"], start=1)
+        ]
+        self.logs: List[Dict] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._serving: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 调度中心接口 ----
+
+    def _page(self, rows: List[Dict], form: Dict[str, str]) -> Dict:
+        start = int(form.get("start", 0))
+        length = int(form.get("length", 10))
+        return {"recordsTotal": len(rows), "recordsFiltered": len(rows), "data": rows[start : start + length]}
+
+    def _group_page(self, form: Dict[str, str]) -> Dict:
+        appname = form.get("appname", "")
+        return self._page([self.group] if appname in self.group["appname"] else [], form)
+
+    def _job_page(self, form: Dict[str, str]) -> Dict:
+        handler = form.get("executorHandler", "").lower()
+        group = int(form.get("jobGroup", -1) or -1)
+        status = int(form.get("triggerStatus", -1) or -1)
+        rows = [
+            j
+            for j in self.jobs
+            if handler in j["executorHandler"].lower()
+            and group in (-1, 0, j["jobGroup"])
+            and status in (-1, j["triggerStatus"])
+        ]
+        return self._page(rows, form)
+
+    def _log_page(self, form: Dict[str, str]) -> Dict:
+        job_id = int(form.get("jobId", 0) or 0)
+        log_status = int(form.get("logStatus", -1) or -1)
+        start, _, end = form.get("filterTime", "").partition(" - ")
+        rows = []
+        for log in reversed(self.logs):
+            if job_id > 0 and log["jobId"] != job_id:
+                continue
+            if start and not start <= log["triggerTime"] <= end:
+                continue
+            if log_status == 1 and log["handleCode"] != 200:
+                continue
+            if log_status == 2 and log["triggerCode"] in (0, 200) and log["handleCode"] in (0, 200):
+                continue
+            if log_status == 3 and not (log["triggerCode"] == 200 and log["handleCode"] == 0):
+                continue
+            rows.append(log)
+        return self._page(rows, form)
+
+    def _trigger(self, form: Dict[str, str]) -> Dict:
+        job_id = int(form.get("id", 0) or 0)
+        job = next((j for j in self.jobs if j["id"] == job_id), None)
+        if job is None:
+            return {"code": 500, "msg": "任务不存在"}
+        try:
+            self._queue.put_nowait((job, form.get("executorParam") or job["executorParam"]))
+        except asyncio.QueueFull:
+            # 对应调度中心触发线程池队列已满
+            return {"code": 500, "msg": "触发队列已满"}
+        return {"code": 200}
+
+    def handle(self, path: str, form: Dict[str, str]) -> Dict:
+        path = path.replace("/xxl-job-admin", "", 1)
+        if path == "/jobgroup/pageList":
+            return self._group_page(form)
+        if path == "/jobinfo/pageList":
+            return self._job_page(form)
+        if path == "/joblog/pageList":
+            return self._log_page(form)
+        if path == "/jobinfo/trigger":
+            return self._trigger(form)
+        return {"code": 200}
+
+    # ---- 触发线程和执行器 ----
+
+    async def _trigger_worker(self):
+        while True:
+            job, param = await self._queue.get()
+            log = {
+                "id": len(self.logs) + 1,
+                "jobGroup": job["jobGroup"],
+                "jobId": job["id"],
+                "executorAddress": self.group["registryList"][0],
+                "executorHandler": job["executorHandler"],
+                "executorParam": param,
+                "executorFailRetryCount": 0,
+                "triggerTime": _now(),
+                "triggerCode": 0,
+                "triggerMsg": None,
+                "handleTime": None,
+                "handleCode": 0,
+                "handleMsg": None,
+            }
+            self.logs.append(log)
+            await asyncio.sleep(self.rpc_ms / 1000)
+            log["triggerCode"] = 200
+            task = asyncio.ensure_future(self._execute(log))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, log: Dict):
+        # 执行耗时在handle_ms上下浮动20%
+        await asyncio.sleep(self.handle_ms * random.uniform(0.8, 1.2) / 1000)
+        failed = random.random() < self.fail_rate
+        log["handleTime"] = _now()
+        log["handleCode"] = 500 if failed else 200
+        log["handleMsg"] = "模拟执行失败" if failed else None
+
+    # ---- HTTP ----
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                form = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+                extra = ""
+                if path.endswith("/login"):
+                    extra = "Set-Cookie: XXL_JOB_LOGIN_IDENTITY=standin; Path=/\r\n"
+                content = json.dumps(self.handle(path.split("?")[0], form), ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    (
+                        "HTTP/1.1 200 OK\r\n"
+                        "Content-Type: application/json;charset=UTF-8\r\n"
+                        f"Content-Length: {len(content)}\r\n{extra}\r\n"
+                    ).encode("latin-1")
+                    + content
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 0, started: threading.Event = None):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        workers = [asyncio.ensure_future(self._trigger_worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._serve_client, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        self._serving = asyncio.ensure_future(server.serve_forever())
+        if started:
+            started.set()
+        try:
+            async with server:
+                await self._serving
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in workers + list(self._tasks):
+                task.cancel()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        在独立线程的事件循环中运行，避免与压测的事件循环互相影响，返回base_url
+        """
+        started = threading.Event()
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.serve(host, port, started)), name="xxl-standin", daemon=True
+        )
+        self._thread.start()
+        if not started.wait(10):
+            raise RuntimeError("本地模拟调度中心启动失败")
+        return f"http://{host}:{self.port}"
+
+    def stop(self):
+        if self._loop is None or self._serving is None:
+            return
+        self._loop.call_soon_threadsafe(self._serving.cancel)
+        if self._thread:
+            self._thread.join(5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟的XXL调度中心+执行器，用于job bench压测")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18099)
+    parser.add_argument("--handler", action="append", help="任务的JobHandler（支持多个）")
+    parser.add_argument("--workers", type=int, default=8, help="触发线程数")
+    parser.add_argument("--queue", type=int, default=1000, help="触发队列长度，满了拒绝触发")
+    parser.add_argument("--rpc-ms", type=float, default=5, help="调用执行器的耗时（毫秒）")
+    parser.add_argument("--handle-ms", type=float, default=50, help="任务执行耗时（毫秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="任务执行失败的比例")
+    args = parser.parse_args()
+    standin = XxlStandin(
+        handlers=args.handler,
+        workers=args.workers,
+        queue_size=args.queue,
+        rpc_ms=args.rpc_ms,
+        handle_ms=args.handle_ms,
+        fail_rate=args.fail_rate,
+    )
+    print(f"http://{args.host}:{args.port} 用户名/密码：{STANDIN_USERNAME}/{STANDIN_PASSWORD}")
+    try:
+        asyncio.run(standin.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
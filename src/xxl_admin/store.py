@@ -0,0 +1,185 @@
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class XxlStateStore(object):
+    """
+    多个shell进程共享的本地状态：登录会话、目录缓存、配置
+    基于sqlite WAL模式，写操作都在单个事务内按行更新
+    """
+
+    FILENAME = "xxl.db"
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS settings (
+        section TEXT PRIMARY KEY,
+        payload TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        base_url TEXT NOT NULL,
+        username TEXT NOT NULL,
+        cookies TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (base_url, username)
+    );
+    CREATE TABLE IF NOT EXISTS catalog (
+        base_url TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        record_id INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (base_url, kind, record_id)
+    );
+    CREATE TABLE IF NOT EXISTS catalog_snapshot (
+        base_url TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        refreshed_at REAL NOT NULL,
+        PRIMARY KEY (base_url, kind)
+    );
+    """
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # isolation_level=None: 自己控制事务边界
+        self._conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            # IMMEDIATE: 开始即拿写锁，避免并发shell之间读后写的升级冲突
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    # ---------- meta ----------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ---------- settings ----------
+
+    def load_settings(self) -> Dict[str, object]:
+        rows = self._query("SELECT section, payload FROM settings")
+        return {section: json.loads(payload) for section, payload in rows}
+
+    def save_settings(self, changed: Dict[str, object], removed: Iterable[str] = ()) -> Dict[str, object]:
+        """
+        只写入变化的配置项，返回合并后的全部配置项
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            for section, value in changed.items():
+                conn.execute(
+                    "INSERT OR REPLACE INTO settings (section, payload, updated_at) VALUES (?, ?, ?)",
+                    (section, json.dumps(value, ensure_ascii=False, sort_keys=True), now),
+                )
+            for section in removed:
+                conn.execute("DELETE FROM settings WHERE section = ?", (section,))
+            rows = conn.execute("SELECT section, payload FROM settings").fetchall()
+        return {section: json.loads(payload) for section, payload in rows}
+
+    # ---------- sessions ----------
+
+    def load_session(self, base_url: str, username: str) -> List[Dict]:
+        rows = self._query(
+            "SELECT cookies FROM sessions WHERE base_url = ? AND username = ?",
+            (base_url, username),
+        )
+        if not rows:
+            return []
+        now = time.time()
+        return [c for c in json.loads(rows[0][0]) if not c.get("expires") or c["expires"] > now]
+
+    def save_session(self, base_url: str, username: str, cookies: List[Dict]):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (base_url, username, cookies, updated_at) VALUES (?, ?, ?, ?)",
+                (base_url, username, json.dumps(cookies), time.time()),
+            )
+
+    # ---------- catalog ----------
+
+    def get_catalog(self, base_url: str, kind: str, max_age: float = None) -> Optional[List[Dict]]:
+        """
+        读取完整目录快照，不存在或已过期返回None
+        """
+        refreshed_at = self.catalog_refreshed_at(base_url, kind)
+        if refreshed_at is None:
+            return None
+        if max_age is not None and time.time() - refreshed_at > max_age:
+            return None
+        rows = self._query(
+            "SELECT payload FROM catalog WHERE base_url = ? AND kind = ? ORDER BY record_id",
+            (base_url, kind),
+        )
+        return [json.loads(payload) for payload, in rows]
+
+    def catalog_refreshed_at(self, base_url: str, kind: str) -> Optional[float]:
+        rows = self._query(
+            "SELECT refreshed_at FROM catalog_snapshot WHERE base_url = ? AND kind = ?",
+            (base_url, kind),
+        )
+        return rows[0][0] if rows else None
+
+    def put_catalog(self, base_url: str, kind: str, records: List[Dict], snapshot: bool = False):
+        """
+        按行更新目录缓存，snapshot=True表示records是完整目录，会删除多余的行并刷新快照时间
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO catalog (base_url, kind, record_id, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(base_url, kind, r["id"], json.dumps(r, ensure_ascii=False), now) for r in records],
+            )
+            if snapshot:
+                conn.execute(
+                    "DELETE FROM catalog WHERE base_url = ? AND kind = ? AND updated_at < ?",
+                    (base_url, kind, now),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalog_snapshot (base_url, kind, refreshed_at) VALUES (?, ?, ?)",
+                    (base_url, kind, now),
+                )
+
+    def invalidate_catalog(self, base_url: str, kind: str):
+        """
+        目录有变更后使快照失效，下次读取时重新拉取
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM catalog_snapshot WHERE base_url = ? AND kind = ?", (base_url, kind))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,6 +1,19 @@
 import re
+import time
+import asyncio
 import hashlib
 import inspect
+from typing import AsyncIterator, Optional, TypeVar, get_origin
+
+try:
+    # 可选依赖，大目录解析更快
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+__all__ = ["md5", "highlight", "generate_default_value", "json_loads", "window", "TokenBucket"]
+
+T = TypeVar("T")
 
 
 def md5(string):
@@ -21,7 +34,9 @@ def highlight(str1, substr1, color):
 def generate_default_value(return_type):
     if return_type is inspect.Signature.empty:
         return None
-    elif return_type is bool:
+    # List[X]、Dict[K, V]等泛型按原始类型处理
+    return_type = get_origin(return_type) or return_type
+    if return_type is bool:
         return False
     elif return_type is int:
         return 0
@@ -37,3 +52,52 @@ def generate_default_value(return_type):
         return ()
     else:
         return None
+
+
+async def window(rows: AsyncIterator[T], limit: Optional[int], offset: int = 0) -> AsyncIterator[T]:
+    """
+    跳过前offset条，最多返回limit条（None表示不限），够数后关闭上游，不再翻页
+    """
+    count = 0
+    try:
+        if limit is not None and limit <= 0:
+            return
+        async for row in rows:
+            if offset > 0:
+                offset -= 1
+                continue
+            yield row
+            count += 1
+            if limit is not None and count >= limit:
+                return
+    finally:
+        if hasattr(rows, "aclose"):
+            await rows.aclose()
+
+
+class TokenBucket(object):
+    """
+    令牌桶限速，rate为每秒令牌数，capacity为允许的突发量
+    """
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
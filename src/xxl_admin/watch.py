@@ -0,0 +1,165 @@
+import json
+import time
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+from .client import XxlAdminClient
+from .models import JobGroup, JobInfo, XxlRecord
+from .utils import md5
+
+__all__ = [
+    "CHANGE_CREATED",
+    "CHANGE_DELETED",
+    "CHANGE_CRON",
+    "CHANGE_TOGGLED",
+    "CHANGE_AUTHOR",
+    "CHANGE_UPDATED",
+    "ChangeEvent",
+    "CatalogSnapshot",
+    "XxlChangeWatcher",
+    "JsonLinesWriter",
+]
+
+CHANGE_CREATED = "created"
+CHANGE_DELETED = "deleted"
+CHANGE_CRON = "cron_changed"
+CHANGE_TOGGLED = "toggled"
+CHANGE_AUTHOR = "author_changed"
+CHANGE_UPDATED = "updated"
+
+# 参与比较的字段：调度时间、更新时间和自动注册的节点会随运行变化，不算目录变更
+JOB_FIELDS = tuple(
+    attr for attr, _, _ in JobInfo._fields if attr not in ("trigger_last_time", "trigger_next_time", "update_time")
+)
+GROUP_FIELDS = tuple(attr for attr, _, _ in JobGroup._fields if attr not in ("registry_list", "update_time"))
+
+# 字段 -> 专门的变更类型，其余字段的变化归为updated
+JOB_FIELD_CHANGES = {
+    "schedule_type": CHANGE_CRON,
+    "schedule_conf": CHANGE_CRON,
+    "trigger_status": CHANGE_TOGGLED,
+    "author": CHANGE_AUTHOR,
+}
+
+
+def fingerprint(record: XxlRecord, fields: Sequence[str]) -> str:
+    return md5("\x1f".join(repr(getattr(record, attr)) for attr in fields))
+
+
+def record_name(record: XxlRecord) -> str:
+    if isinstance(record, JobGroup):
+        return record.appname
+    # GLUE任务没有JobHandler
+    return record.executor_handler or record.job_desc
+
+
+class ChangeEvent(NamedTuple):
+    at: str
+    cluster: str
+    kind: str
+    action: str
+    record_id: int
+    name: str
+    field: Optional[str] = None
+    before: Any = None
+    after: Any = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "time": self.at,
+            "cluster": self.cluster,
+            "kind": self.kind,
+            "action": self.action,
+            "id": self.record_id,
+            "name": self.name,
+            "field": self.field,
+            "before": self.before,
+            "after": self.after,
+        }
+
+
+class CatalogSnapshot(object):
+    """
+    一次目录快照：记录ID -> 指纹，未变化的记录只比较指纹
+    """
+
+    def __init__(self, records: List[XxlRecord], fields: Sequence[str]) -> None:
+        self.fields = fields
+        self.records = {r.id: r for r in records}
+        self.fingerprints = {r.id: fingerprint(r, fields) for r in records}
+
+    def diff(self, new: "CatalogSnapshot", cluster: str, kind: str, at: str) -> List[ChangeEvent]:
+        events = []
+        for rid, fp in new.fingerprints.items():
+            old_fp = self.fingerprints.get(rid)
+            if old_fp == fp:
+                continue
+            record = new.records[rid]
+            if old_fp is None:
+                events.append(ChangeEvent(at, cluster, kind, CHANGE_CREATED, rid, record_name(record)))
+                continue
+            events.extend(self._field_changes(self.records[rid], record, cluster, kind, at))
+        for rid in self.fingerprints.keys() - new.fingerprints.keys():
+            events.append(ChangeEvent(at, cluster, kind, CHANGE_DELETED, rid, record_name(self.records[rid])))
+        return events
+
+    def _field_changes(self, old: XxlRecord, new: XxlRecord, cluster: str, kind: str, at: str) -> List[ChangeEvent]:
+        events = []
+        name = record_name(new)
+        field_changes = JOB_FIELD_CHANGES if kind == "job" else {}
+        for attr in self.fields:
+            before, after = getattr(old, attr), getattr(new, attr)
+            if before == after:
+                continue
+            action = field_changes.get(attr, CHANGE_UPDATED)
+            events.append(ChangeEvent(at, cluster, kind, action, new.id, name, attr, before, after))
+        return events
+
+
+class XxlChangeWatcher(object):
+    """
+    定期拉取各集群的执行器和任务目录，与上一次快照对比生成变更事件，
+    第一次拉取只记录基线
+    """
+
+    KINDS = (("group", GROUP_FIELDS), ("job", JOB_FIELDS))
+
+    def __init__(self) -> None:
+        self.snapshots: Dict[Tuple[str, str], CatalogSnapshot] = {}
+
+    async def fetch(self, client: XxlAdminClient) -> Tuple[List[JobGroup], List[JobInfo]]:
+        """
+        max_age=0强制刷新，顺便更新共享目录缓存；
+        登录失败、5xx等拉取失败时抛出XxlAdminError，fan_out把该集群标记为FAILED，本轮不参与对比
+        """
+        groups, jobs = await asyncio.gather(client.cached_groups(max_age=0), client.cached_jobs(max_age=0))
+        return groups, jobs
+
+    def update(self, cluster: str, catalogs: Tuple[List[JobGroup], List[JobInfo]]) -> List[ChangeEvent]:
+        at = time.strftime("%Y-%m-%d %H:%M:%S")
+        events = []
+        for (kind, fields), records in zip(self.KINDS, catalogs):
+            snapshot = CatalogSnapshot(records, fields)
+            previous = self.snapshots.get((cluster, kind))
+            if previous is not None:
+                events.extend(previous.diff(snapshot, cluster, kind, at))
+            self.snapshots[(cluster, kind)] = snapshot
+        return events
+
+    def has_baseline(self, cluster: str) -> bool:
+        return (cluster, "job") in self.snapshots
+
+
+class JsonLinesWriter(object):
+    """
+    追加写JSON Lines，每个事件一行，写完立即flush方便tail -f
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+
+    def write(self, events: List[ChangeEvent]):
+        for event in events:
+            self.file.write(json.dumps(event.to_dict(), ensure_ascii=False, default=str))
+            self.file.write("\n")
+        self.file.flush()
@@ -0,0 +1,51 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from xxl_admin import commands
+from xxl_admin.bench import BenchReport, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 99) == 10
+    assert percentile(values, 100) == 10
+    assert percentile(values, 0) == 1
+    assert percentile([3.5], 99) == 3.5
+    assert percentile([], 50) is None
+
+
+def test_report_rates():
+    report = BenchReport(rate=10, duration=1)
+    assert report.send_rate == 0.0
+    report.sent, report.accepted, report.send_elapsed = 10, 8, 2.0
+    report.errors = {"ConnectError": 1, "ReadTimeout": 2}
+    assert report.send_rate == 5.0
+    assert report.accepted_rate == 4.0
+    assert report.error_count == 3
+
+
+@pytest.mark.parametrize("error", [None, RuntimeError("bench failed")])
+def test_standin_bench_cleans_up(monkeypatch, error):
+    seen = {}
+
+    async def run_bench(cmd_ctx, clients, *args, **kwargs):
+        seen["client"] = clients["standin"]
+        seen["cookie_dir"] = clients["standin"].cookie_dir
+        assert os.path.isdir(seen["cookie_dir"])
+        if error:
+            raise error
+
+    monkeypatch.setattr(commands, "run_bench", run_bench)
+    ctx = SimpleNamespace(obj=None)
+    if error:
+        with pytest.raises(RuntimeError):
+            commands.bench_job(ctx, "benchJobHandler", standin=True)
+    else:
+        commands.bench_job(ctx, "benchJobHandler", standin=True)
+    # 客户端连接已关闭，临时会话目录已删除
+    assert seen["client"]._client.is_closed
+    assert not os.path.exists(seen["cookie_dir"])
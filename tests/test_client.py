@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+import pytest
+
+from xxl_admin.client import XxlAdminClient, XxlAdminError
+from xxl_admin.store import XxlStateStore
+
+GROUPS = [
+    {"id": 1, "appname": "demo-executor", "title": "示例", "addressType": 0, "registryList": ["http://10.0.0.1:9999/"]},
+    {"id": 2, "appname": "other-executor", "title": "其他", "addressType": 0, "registryList": None},
+]
+
+
+class FlakyAdmin(object):
+    """
+    先正常返回执行器列表，切换failure后返回指定的错误响应
+    """
+
+    def __init__(self) -> None:
+        self.failure = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.failure is not None:
+            return self.failure
+        return httpx.Response(200, json={"recordsTotal": len(GROUPS), "data": GROUPS})
+
+
+def _client(store: XxlStateStore, admin: FlakyAdmin) -> XxlAdminClient:
+    client = XxlAdminClient("http://admin.test", username="admin", password="123456", store=store)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(admin))
+    client.is_logged_in = True
+    return client
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = XxlStateStore(tmp_path / XxlStateStore.FILENAME)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [
+        httpx.Response(502, text="Bad Gateway"),
+        httpx.Response(302, headers={"Location": "/xxl-job-admin/toLogin"}),
+        httpx.Response(200, text="<html>login</html>"),
+        httpx.Response(200, json={"code": 500, "msg": "error"}),
+    ],
+)
+def test_failed_fetch_keeps_previous_snapshot(store, failure):
+    admin = FlakyAdmin()
+
+    async def run():
+        client = _client(store, admin)
+        try:
+            groups = await client.cached_groups(max_age=0)
+            refreshed_at = store.catalog_refreshed_at(client.base_url, "group")
+            admin.failure = failure
+            with pytest.raises(XxlAdminError):
+                await client.cached_groups(max_age=0)
+            assert store.catalog_refreshed_at(client.base_url, "group") == refreshed_at
+            # 其他shell仍然读到失败前的完整目录
+            assert [g.appname for g in await client.cached_groups()] == [g.appname for g in groups]
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert len(store.get_catalog("http://admin.test", "group")) == 2
+
+
+def test_failed_login_is_not_cached(store):
+    async def run():
+        client = _client(store, FlakyAdmin())
+        client.is_logged_in = False
+        client.password = ""
+        try:
+            with pytest.raises(XxlAdminError):
+                await client.cached_groups(max_age=0)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert store.catalog_refreshed_at("http://admin.test", "group") is None
+
+
+def test_snapshot_written_once(store, monkeypatch):
+    writes = []
+    put_catalog = store.put_catalog
+    monkeypatch.setattr(store, "put_catalog", lambda *args, **kwargs: (writes.append(kwargs), put_catalog(*args, **kwargs)))
+
+    async def run():
+        client = _client(store, FlakyAdmin())
+        try:
+            await client.cached_groups(max_age=0)
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert writes == [{"snapshot": True}]
@@ -0,0 +1,101 @@
+import os
+import json
+import threading
+
+from xxl_admin.context import XxlContext
+from xxl_admin.settings import XxlEnvSettings
+from xxl_admin.store import XxlStateStore
+
+
+def _context(tmp_path) -> XxlContext:
+    ctx = XxlContext(str(tmp_path))
+    ctx.load()
+    return ctx
+
+
+def test_concurrent_save_settings_merges_sections(tmp_path):
+    path = tmp_path / XxlStateStore.FILENAME
+    barrier = threading.Barrier(8)
+
+    def save(i):
+        # 每个shell各自的连接，同时只写自己修改的配置项
+        store = XxlStateStore(path)
+        try:
+            barrier.wait()
+            for n in range(20):
+                store.save_settings({f"credentials.env{i}": {"username": f"user{i}", "round": n}})
+        finally:
+            store.close()
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store = XxlStateStore(path)
+    try:
+        sections = store.load_settings()
+    finally:
+        store.close()
+    assert sections == {f"credentials.env{i}": {"username": f"user{i}", "round": 19} for i in range(8)}
+
+
+def test_save_keeps_other_shells_changes(tmp_path):
+    first, second = _context(tmp_path), _context(tmp_path)
+    try:
+        first.settings.default_cluster = "us"
+        first.save()
+        second.settings.credentials["prod"] = XxlEnvSettings(clusters={"cn": "http://prod:8080"})
+        second.settings.env_list.add("prod")
+        second.save()
+        # 后保存的shell没有覆盖先保存的修改，并且合并到了自己的配置中
+        assert second.settings.default_cluster == "us"
+        assert set(second.settings.credentials) == {"test", "prod"}
+    finally:
+        first.close()
+        second.close()
+
+    third = _context(tmp_path)
+    try:
+        assert third.settings.default_cluster == "us"
+        assert third.settings.credentials["prod"].clusters == {"cn": "http://prod:8080"}
+        assert json.loads(third.location.read_text())["default_cluster"] == "us"
+    finally:
+        third.close()
+
+
+def test_hand_edited_file_overrides_store(tmp_path):
+    ctx = _context(tmp_path)
+    try:
+        ctx.settings.credentials["prod"] = XxlEnvSettings()
+        ctx.settings.env_list.add("prod")
+        ctx.save()
+    finally:
+        ctx.close()
+
+    # 手工删掉prod环境并修改默认集群
+    data = json.loads(ctx.location.read_text())
+    del data["credentials"]["prod"]
+    data["env_list"] = ["test"]
+    data["default_cluster"] = "jp"
+    ctx.location.write_text(json.dumps(data))
+    stat = ctx.location.stat()
+    os.utime(ctx.location, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    edited = _context(tmp_path)
+    try:
+        assert edited.settings.default_cluster == "jp"
+        assert set(edited.settings.credentials) == {"test"}
+        sections = edited.store.load_settings()
+        assert "credentials.prod" not in sections
+        assert sections["default_cluster"] == "jp"
+    finally:
+        edited.close()
+
+    # 文件未再修改时从共享存储加载
+    reloaded = _context(tmp_path)
+    try:
+        assert reloaded.settings.default_cluster == "jp"
+        assert set(reloaded.settings.credentials) == {"test"}
+    finally:
+        reloaded.close()
@@ -0,0 +1,100 @@
+import csv
+import gzip
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from xxl_admin.client import XxlAdminClient, XxlAdminError
+from xxl_admin.export import COLUMNS, CsvLogWriter, XxlLogExporter
+
+LOGS_PER_JOB = 450
+
+
+class LogAdmin(object):
+    """
+    两个任务各450条调度日志，fail_at指定的(任务, 起始行)返回502
+    """
+
+    def __init__(self) -> None:
+        self.fail_at = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        start, length = int(form["start"]), int(form["length"])
+        if request.url.path.endswith("/jobinfo/pageList"):
+            data = [{"id": 1, "jobGroup": 1}, {"id": 2, "jobGroup": 1}][start : start + length]
+            return httpx.Response(200, json={"recordsTotal": 2, "data": data})
+        job_id = int(form["jobId"])
+        if (job_id, start) in self.fail_at:
+            self.fail_at.discard((job_id, start))
+            return httpx.Response(502, text="Bad Gateway")
+        ids = range(job_id * 1000 + start, job_id * 1000 + min(start + length, LOGS_PER_JOB))
+        data = [{"id": i, "jobGroup": 1, "jobId": job_id, "handleCode": 200} for i in ids]
+        return httpx.Response(200, json={"recordsTotal": LOGS_PER_JOB, "data": data})
+
+
+def _export(target, admin: LogAdmin):
+    async def run():
+        client = XxlAdminClient("http://admin.test")
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(admin))
+        client.is_logged_in = True
+        try:
+            exporter = XxlLogExporter({"cn": client}, str(target), "2024-01-01 - 2024-01-02", concurrency=1, batch_size=1)
+            return exporter.resumed, await exporter.run()
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def _read(target):
+    with open(target, newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def test_export_resumes_from_checkpoint(tmp_path):
+    target = tmp_path / "logs.csv"
+    admin = LogAdmin()
+    admin.fail_at = {(2, 200)}
+    with pytest.raises(XxlAdminError):
+        _export(target, admin)
+    assert XxlLogExporter.checkpoint_path(target).exists()
+    written = len(_read(target)) - 1
+
+    resumed, rows_written = _export(target, admin)
+    assert resumed
+    # 续传只拉取断点之后的数据
+    assert rows_written == {"cn": 2 * LOGS_PER_JOB - written}
+    rows = _read(target)
+    assert rows[0] == COLUMNS
+    ids = [int(row[1]) for row in rows[1:]]
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 2 * LOGS_PER_JOB
+    assert not XxlLogExporter.checkpoint_path(target).exists()
+
+
+def test_export_restarts_when_output_is_missing(tmp_path):
+    target = tmp_path / "logs.csv"
+    admin = LogAdmin()
+    admin.fail_at = {(2, 0)}
+    with pytest.raises(XxlAdminError):
+        _export(target, admin)
+    target.unlink()
+
+    resumed, rows_written = _export(target, admin)
+    # 输出文件已不在，断点作废，从头导出
+    assert not resumed
+    assert rows_written == {"cn": 2 * LOGS_PER_JOB}
+    rows = _read(target)
+    assert rows[0] == COLUMNS
+    assert len(rows) == 2 * LOGS_PER_JOB + 1
+    assert b"\0" not in target.read_bytes()
+
+
+def test_csv_writer_missing_file_restarts_with_header(tmp_path):
+    target = tmp_path / "logs.csv.gz"
+    writer = CsvLogWriter(target, offset=4096)
+    assert writer.offset > 0
+    assert writer.state() != {"offset": 4096}
+    assert gzip.decompress(target.read_bytes()).decode().startswith("cluster,")
@@ -0,0 +1,65 @@
+import io
+import os
+import signal
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from xxl_admin.commands import fan_out
+from xxl_admin.fanout import (
+    STATUS_CANCELLED,
+    STATUS_FAILED,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    FanoutInterrupted,
+    XxlFanout,
+)
+
+
+async def _reply(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail(delay=0.0):
+    await asyncio.sleep(delay)
+    raise RuntimeError("HTTP 502")
+
+
+def _fanout(deadline=None) -> XxlFanout:
+    return XxlFanout(Console(file=io.StringIO()), deadline=deadline)
+
+
+def test_deadline_marks_slow_clusters_timeout():
+    fanout = _fanout(deadline=0.2)
+    calls = {"cn": _reply("cn"), "us": _reply("us", delay=5), "jp": _fail()}
+    results = asyncio.run(fanout.run(calls))
+    assert {c: r.status for c, r in results.items()} == {"cn": STATUS_OK, "us": STATUS_TIMEOUT, "jp": STATUS_FAILED}
+    assert results["cn"].value == "cn"
+    assert str(results["jp"].error) == "HTTP 502"
+    # 超时的集群不会等到请求自己结束
+    assert results["us"].elapsed < 1
+
+
+def test_sigint_returns_partial_results():
+    async def run(partial):
+        asyncio.get_running_loop().call_later(0.2, os.kill, os.getpid(), signal.SIGINT)
+        return await _fanout().run({"cn": _reply("cn"), "us": _reply("us", delay=5)}, partial=partial)
+
+    results = asyncio.run(run(partial=True))
+    assert {c: r.status for c, r in results.items()} == {"cn": STATUS_OK, "us": STATUS_CANCELLED}
+    with pytest.raises(FanoutInterrupted):
+        asyncio.run(run(partial=False))
+    # Ctrl-C的处理已还原
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_fan_out_returns_ok_clusters_only(capsys):
+    cmd_ctx = SimpleNamespace(renderer=SimpleNamespace(console=Console(file=io.StringIO())))
+    calls = {"cn": _reply(1), "us": _fail(), "jp": _reply(3, delay=5)}
+    assert asyncio.run(fan_out(cmd_ctx, calls, deadline=0.2)) == {"cn": 1}
+    out = capsys.readouterr().out
+    assert "US集群 FAILED HTTP 502" in out
+    assert "JP集群 TIMEOUT" in out
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from xxl_admin.groups import ACTION_CREATE, ACTION_REMOVE, ACTION_UPDATE, diff_groups, load_group_specs
+from xxl_admin.models import JobGroup
+
+CURRENT = [
+    JobGroup(id=1, appname="auto-executor", title="自动", address_type=0, registry_list=["http://10.0.0.9:9999/"]),
+    JobGroup(id=2, appname="manual-executor", title="手动", address_type=1, address_list="http://a:9999/,http://b:9999/"),
+    JobGroup(id=3, appname="legacy-executor", title="遗留"),
+]
+
+
+def _write(tmp_path, name: str, data) -> str:
+    path = tmp_path / name
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_load_group_specs_json(tmp_path):
+    path = _write(
+        tmp_path,
+        "groups.json",
+        {
+            "groups": [
+                {"appname": "auto-executor"},
+                {"appname": "manual-executor", "title": "手动", "address_type": "manual", "address_list": ["http://a:9999/", " "]},
+            ]
+        },
+    )
+    auto, manual = load_group_specs(path)
+    assert (auto.title, auto.address_type, auto.address_list) == ("auto-executor", 0, None)
+    assert (manual.address_type, manual.address_list) == (1, "http://a:9999/")
+
+
+@pytest.mark.parametrize(
+    "groups, message",
+    [
+        ([{"title": "无名"}], "缺少appname"),
+        ([{"appname": "a"}, {"appname": "a"}], "执行器重复"),
+        ([{"appname": "a", "address_type": "dns"}], "address_type"),
+        ([{"appname": "a", "address_type": "manual"}], "address_list不能为空"),
+    ],
+)
+def test_load_group_specs_rejects_invalid(tmp_path, groups, message):
+    with pytest.raises(ValueError, match=message):
+        load_group_specs(_write(tmp_path, "groups.json", groups))
+
+
+def test_load_group_specs_yaml(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "groups.yaml"
+    path.write_text("groups:\n  - appname: demo\n    title: 示例\n", encoding="utf-8")
+    (group,) = load_group_specs(str(path))
+    assert (group.appname, group.title) == ("demo", "示例")
+
+
+def test_diff_groups_only_necessary_changes():
+    desired = [
+        # 自动注册的节点由调度中心维护，不算差异
+        JobGroup(appname="auto-executor", title="自动", address_type=0),
+        # 地址顺序不同不算差异
+        JobGroup(appname="manual-executor", title="手动", address_type=1, address_list="http://b:9999/,http://a:9999/"),
+        JobGroup(appname="new-executor", title="新执行器"),
+    ]
+    changes = diff_groups("cn", desired, CURRENT)
+    assert [(c.action, c.group.appname) for c in changes] == [(ACTION_CREATE, "new-executor")]
+
+
+def test_diff_groups_update_keeps_id_and_describes():
+    desired = [JobGroup(appname="manual-executor", title="手动v2", address_type=0)]
+    (change,) = diff_groups("cn", desired, CURRENT)
+    assert change.action == ACTION_UPDATE
+    assert change.group.id == 2
+    assert change.current is CURRENT[1]
+    assert change.describe() == "名称: 手动 -> 手动v2; 注册方式: 手动 -> 自动"
+
+
+def test_diff_groups_prune():
+    changes = diff_groups("cn", CURRENT[:2], CURRENT, prune=True)
+    assert [(c.action, c.group.appname) for c in changes] == [(ACTION_REMOVE, "legacy-executor")]
+    assert diff_groups("cn", CURRENT[:2], CURRENT) == []
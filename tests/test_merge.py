@@ -0,0 +1,108 @@
+import io
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+from rich.console import Console
+
+from xxl_admin.client import XxlAdminClient
+from xxl_admin.commands import print_merged_groups
+from xxl_admin.merge import dedupe_merged, merge_streams, resume_stream
+from xxl_admin.render import XxlRenderer
+
+
+async def _stream(items: List[int]):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+async def _collect(it) -> list:
+    return [item async for item in it]
+
+
+def test_merge_streams_orders_by_key():
+    streams = {"cn": _stream([1, 4, 6]), "us": _stream([2, 3, 7]), "eu": _stream([])}
+    merged = asyncio.run(_collect(merge_streams(streams, key=lambda x: x)))
+    assert merged == [("cn", 1), ("us", 2), ("us", 3), ("cn", 4), ("cn", 6), ("us", 7)]
+
+
+def test_merge_streams_keeps_cluster_order_on_ties():
+    streams = {"us": _stream([1, 2]), "cn": _stream([1, 2])}
+    merged = asyncio.run(_collect(merge_streams(streams, key=lambda x: x)))
+    assert merged == [("us", 1), ("cn", 1), ("us", 2), ("cn", 2)]
+
+
+def test_dedupe_merged_groups_identical_rows():
+    rows = {
+        "cn": [(1, "a"), (2, "b")],
+        "us": [(1, "a"), (2, "c")],
+        "jp": [(1, "a")],
+    }
+    streams = {cluster: _stream(items) for cluster, items in rows.items()}
+    merged = merge_streams(streams, key=lambda r: r[0])
+    deduped = asyncio.run(_collect(dedupe_merged(merged, key=lambda r: r[0], row=lambda cluster, r: r)))
+    assert deduped == [(["cn", "us", "jp"], (1, "a")), (["cn"], (2, "b")), (["us"], (2, "c"))]
+
+
+async def _broken(items: List[int], error: Exception):
+    for item in items:
+        yield item
+    raise error
+
+
+def test_resume_stream_ends_only_the_failed_cluster():
+    errors = []
+    streams = {
+        "cn": _stream([1, 3, 5]),
+        "us": resume_stream([], _broken([2], RuntimeError("HTTP 502")).__aiter__(), errors.append),
+    }
+    merged = asyncio.run(_collect(merge_streams(streams, key=lambda x: x)))
+    assert merged == [("cn", 1), ("us", 2), ("cn", 3), ("cn", 5)]
+    assert [str(e) for e in errors] == ["HTTP 502"]
+
+
+def test_resume_stream_timeout():
+    async def slow():
+        yield 1
+        await asyncio.sleep(5)
+        yield 2
+
+    errors = []
+    records = asyncio.run(_collect(resume_stream([0], slow().__aiter__(), errors.append, timeout=0.1)))
+    assert records == [0, 1]
+    assert isinstance(errors[0], asyncio.TimeoutError)
+
+
+def _admin(cluster: str, status: int) -> XxlAdminClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if status != 200:
+            return httpx.Response(status, text="Bad Gateway")
+        data = [{"id": 1, "appname": "demo", "title": "示例"}, {"id": 2, "appname": f"{cluster}-only", "title": "独有"}]
+        return httpx.Response(200, json={"recordsTotal": len(data), "data": data})
+
+    client = XxlAdminClient(f"http://{cluster}.admin.test")
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    client.is_logged_in = True
+    return client
+
+
+def test_merge_drops_failed_cluster(capsys):
+    output = io.StringIO()
+    cmd_ctx = SimpleNamespace(renderer=XxlRenderer(Console(file=output, width=200)))
+    clients = {"cn": _admin("cn", 200), "us": _admin("us", 502), "jp": _admin("jp", 200)}
+
+    async def run():
+        try:
+            await print_merged_groups(cmd_ctx, clients, name="", sort="name", limit=None, offset=0, deadline=None)
+        finally:
+            for client in clients.values():
+                await client.close()
+
+    asyncio.run(run())
+    table = output.getvalue()
+    # 一个集群失败不影响其他集群的合并结果
+    assert "CN,JP" in table and "cn-only" in table and "jp-only" in table
+    assert "US" not in table
+    assert "US集群 FAILED" in capsys.readouterr().out
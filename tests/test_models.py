@@ -0,0 +1,39 @@
+from xxl_admin.models import JobGroup, JobInfo, JobLog, decode_records
+
+
+def test_from_dict_normalises_v22_job_cron():
+    job = JobInfo.from_dict({"id": 1, "jobGroup": 2, "jobCron": "0 0 2 * * ?", "executorHandler": "demo"})
+    assert job.schedule_type == "CRON"
+    assert job.schedule_conf == "0 0 2 * * ?"
+    assert job.executor_handler == "demo"
+
+
+def test_from_dict_keeps_v24_schedule():
+    job = JobInfo.from_dict({"id": 1, "scheduleType": "FIX_RATE", "scheduleConf": "60", "jobCron": "ignored"})
+    assert job.schedule_type == "FIX_RATE"
+    assert job.schedule_conf == "60"
+
+
+def test_from_dict_defaults_and_round_trip():
+    job = JobInfo.from_dict({"id": 3})
+    assert job.executor_route_strategy == "FIRST"
+    assert job.glue_type == "BEAN"
+    assert not job.enabled
+    assert JobInfo.from_dict(job.to_dict()) == job
+
+
+def test_replace_returns_copy():
+    job = JobInfo(id=1, author="tom", trigger_status=1)
+    changed = job.replace(author="jerry")
+    assert changed.author == "jerry"
+    assert job.author == "tom"
+    assert changed != job
+    assert changed.replace(author="tom") == job
+    assert job.enabled
+
+
+def test_decode_records():
+    content = b'{"recordsTotal": 2, "data": [{"id": 1, "appname": "a"}, {"id": 2, "appname": "b"}]}'
+    groups = decode_records(JobGroup, content)
+    assert [g.appname for g in groups] == ["a", "b"]
+    assert decode_records(JobLog, b'{"data": null}') == []
@@ -0,0 +1,49 @@
+import sys
+
+import pytest
+
+from xxl_admin.models import JobGroup, JobInfo
+from xxl_admin.nodes import NodeAddress, NodeIndex, interface_addresses, local_addresses, parse_address
+
+GROUPS = [
+    JobGroup(id=1, appname="order", registry_list=["http://10.0.0.1:9999/", "http://172.17.0.1:9998/"]),
+    JobGroup(id=2, appname="payment", registry_list=["http://172.17.0.1:9999/"]),
+    JobGroup(id=3, appname="manual", address_type=1, address_list="10.0.0.2:9999,http://[::1]:9999/"),
+]
+
+
+def test_parse_address():
+    assert parse_address("http://10.0.0.1:9999/") == NodeAddress("10.0.0.1", 9999)
+    assert parse_address("Host-A:9999") == NodeAddress("host-a", 9999)
+    assert parse_address("https://10.0.0.1/") == NodeAddress("10.0.0.1", 443)
+    assert parse_address("http://[::1]:9999/") == NodeAddress("::1", 9999)
+    assert parse_address(" ") is None
+
+
+def test_index_lookup_and_counts():
+    index = NodeIndex(GROUPS, [JobInfo(job_group=1), JobInfo(job_group=1), JobInfo(job_group=2)])
+    assert index.lookup("172.17.0.1") == [NodeAddress("172.17.0.1", 9998), NodeAddress("172.17.0.1", 9999)]
+    assert index.lookup("172.17.0.1:9999") == [NodeAddress("172.17.0.1", 9999)]
+    # 精确匹配，不再是子串匹配
+    assert index.lookup("10.0.0.") == []
+    assert [g.appname for g in index.nodes[NodeAddress("10.0.0.1", 9999)]] == ["order"]
+    assert index.job_count(GROUPS[0]) == 2
+    assert index.raw_addresses[NodeAddress("10.0.0.2", 9999)] == "10.0.0.2:9999"
+
+
+def test_local_nodes_pick_job_group():
+    index = NodeIndex(GROUPS)
+    # 本机的docker网桥地址上同时跑着两个执行器
+    addresses = {"127.0.0.1", "172.17.0.1"}
+    assert index.local_nodes(addresses) == [NodeAddress("172.17.0.1", 9998), NodeAddress("172.17.0.1", 9999)]
+    assert index.local_nodes(addresses, group_id=2) == [NodeAddress("172.17.0.1", 9999)]
+    assert index.local_nodes(addresses, group_id=1) == [NodeAddress("172.17.0.1", 9998)]
+    assert index.local_nodes(addresses, group_id=3) == []
+    assert index.local_nodes({"::1"}, group_id=3) == [NodeAddress("::1", 9999)]
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="按网卡枚举地址依赖Linux的ioctl和/proc")
+def test_interface_addresses_enumerates_nics():
+    addresses = interface_addresses()
+    assert "127.0.0.1" in addresses
+    assert addresses <= local_addresses()
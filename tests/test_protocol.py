@@ -0,0 +1,143 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from xxl_admin.client import XxlAdminClient
+from xxl_admin.models import JobGroup, JobInfo
+from xxl_admin.protocol import (
+    XxlProtocolCompat,
+    XxlProtocolV22,
+    XxlProtocolV24,
+    detect_protocol,
+    get_protocol,
+)
+
+JOB = JobInfo(
+    id=7,
+    job_group=2,
+    job_desc="对账",
+    author="tom",
+    schedule_conf="0 0 2 * * ?",
+    executor_route_strategy="ROUND",
+    executor_handler="reconcileJobHandler",
+    executor_timeout=30,
+    executor_fail_retry_count=3,
+)
+
+
+def test_job_payload_uses_executor_timeout():
+    payload = XxlProtocolV24().job_payload(JOB)
+    assert payload["executorTimeout"] == 30
+    assert "executorTimout" not in payload
+    assert payload["executorFailRetryCount"] == 3
+    assert payload["executorRouteStrategy"] == "ROUND"
+    assert payload["id"] == 7
+
+
+def test_job_payload_without_id_for_new_job():
+    assert "id" not in XxlProtocolV24().job_payload(JOB.replace(id=0))
+
+
+def test_job_payload_none_fields_become_empty():
+    payload = XxlProtocolV24().job_payload(JOB.replace(alarm_email=None, executor_param=None, child_job_id=None))
+    assert payload["alarmEmail"] == ""
+    assert payload["executorParam"] == ""
+    assert payload["childJobId"] == ""
+
+
+def test_schedule_payload_by_version():
+    assert XxlProtocolV22().schedule_payload(JOB) == {"jobCron": "0 0 2 * * ?"}
+    assert XxlProtocolV24().schedule_payload(JOB) == {
+        "scheduleType": "CRON",
+        "scheduleConf": "0 0 2 * * ?",
+        "misfireStrategy": "DO_NOTHING",
+    }
+    compat = XxlProtocolCompat().schedule_payload(JOB)
+    assert compat["jobCron"] == compat["scheduleConf"] == "0 0 2 * * ?"
+
+
+def test_group_payload():
+    group = JobGroup(appname="demo", title="示例", address_type=1, address_list="http://10.0.0.1:9999/")
+    assert XxlProtocolV24().group_payload(group) == {
+        "appname": "demo",
+        "title": "示例",
+        "addressType": 1,
+        "addressList": "http://10.0.0.1:9999/",
+    }
+    assert XxlProtocolV22().group_payload(group.replace(id=3, address_type=0, address_list=None))["addressList"] == ""
+
+
+def test_get_and_detect_protocol():
+    assert isinstance(get_protocol("2.2"), XxlProtocolV22)
+    assert isinstance(get_protocol("2.4"), XxlProtocolV24)
+    assert isinstance(get_protocol(None), XxlProtocolCompat)
+    assert detect_protocol(b'{"data":[{"scheduleConf":"0 0 2 * * ?"}]}') == "2.4"
+    assert detect_protocol(b'{"data":[{"jobCron":"0 0 2 * * ?"}]}') == "2.2"
+    assert detect_protocol(b'{"data":[]}') is None
+
+
+def _admin_row(version: str) -> dict:
+    row = {
+        "id": 7,
+        "jobGroup": 2,
+        "jobDesc": "对账",
+        "author": "tom",
+        "executorRouteStrategy": "SHARDING_BROADCAST",
+        "executorHandler": "reconcileJobHandler",
+        "executorBlockStrategy": "DISCARD_LATER",
+        "executorTimeout": 30,
+        "executorFailRetryCount": 3,
+        "glueType": "BEAN",
+        "triggerStatus": 1,
+    }
+    if version == "2.2":
+        row["jobCron"] = "0 0 2 * * ?"
+    else:
+        row.update(scheduleType="CRON", scheduleConf="0 0 2 * * ?", misfireStrategy="FIRE_ONCE_NOW")
+    return row
+
+
+def _mock_client(version: str, submitted: list) -> XxlAdminClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/jobinfo/pageList"):
+            return httpx.Response(200, json={"recordsTotal": 1, "data": [_admin_row(version)]})
+        form = {k: v[0] for k, v in parse_qs(request.content.decode("utf-8"), keep_blank_values=True).items()}
+        submitted.append((request.url.path, form))
+        return httpx.Response(200, json={"code": 200})
+
+    client = XxlAdminClient("http://admin.test", username="admin", password="123456")
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    client.is_logged_in = True
+    return client
+
+
+@pytest.mark.parametrize("version", ["2.2", "2.4"])
+def test_update_job_keeps_routing_retry_and_timeout(version):
+    submitted = []
+
+    async def update():
+        client = _mock_client(version, submitted)
+        try:
+            (job,) = await client.list_job(executor="reconcileJobHandler")
+            # 与job update命令相同：只修改指定字段
+            return await client.update_job(job.replace(schedule_conf="0 0 3 * * ?", job_desc="对账v2"))
+        finally:
+            await client.close()
+
+    assert asyncio.run(update())
+    ((path, form),) = submitted
+    assert path == "/xxl-job-admin/jobinfo/update"
+    assert form["executorRouteStrategy"] == "SHARDING_BROADCAST"
+    assert form["executorBlockStrategy"] == "DISCARD_LATER"
+    assert form["executorFailRetryCount"] == "3"
+    assert form["executorTimeout"] == "30"
+    assert form["jobDesc"] == "对账v2"
+    if version == "2.2":
+        assert form["jobCron"] == "0 0 3 * * ?"
+        assert "scheduleConf" not in form
+    else:
+        assert form["scheduleConf"] == "0 0 3 * * ?"
+        assert form["misfireStrategy"] == "FIRE_ONCE_NOW"
+        assert "jobCron" not in form
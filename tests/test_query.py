@@ -0,0 +1,79 @@
+from xxl_admin.models import JobInfo, JobLog
+from xxl_admin.protocol import XxlProtocol
+from xxl_admin.query import job_predicates, log_predicates, plan_query
+
+JOB_FILTERS = XxlProtocol.JOB_FILTERS
+LOG_FILTERS = XxlProtocol.LOG_FILTERS
+
+
+def test_supported_predicates_are_pushed():
+    plan = plan_query(job_predicates(executor="demo", status=1, authors=["tom"]), JOB_FILTERS)
+    assert plan.params == {"executor": "demo", "status": 1, "author": "tom"}
+    assert plan.local == []
+    assert not plan.use_cache
+
+
+def test_unsupported_predicates_stay_local():
+    plan = plan_query(job_predicates(status=1, authors=["tom", "jerry"], glue_type="glue_shell"), JOB_FILTERS)
+    assert plan.params == {"status": 1}
+    assert [p.name for p in plan.local] == ["author~tom|jerry", "glue=GLUE_SHELL"]
+    assert plan.describe() == "调度中心过滤: status=1; 本地过滤: author~tom|jerry, glue=GLUE_SHELL"
+
+
+def test_pushable_predicates_ignore_fresh_cache():
+    plan = plan_query(job_predicates(status=1, cron="0 0 2"), JOB_FILTERS, cache_fresh=True)
+    assert not plan.use_cache
+    assert plan.params == {"status": 1}
+
+
+def test_cache_used_only_for_local_only_queries():
+    plan = plan_query(job_predicates(cron="0 0 2"), JOB_FILTERS, cache_fresh=True)
+    assert plan.use_cache
+    assert plan.pushed == []
+    assert plan.describe() == "本地缓存过滤: cron~0 0 2"
+    assert not plan_query(job_predicates(cron="0 0 2"), JOB_FILTERS).use_cache
+    assert not plan_query([], JOB_FILTERS, cache_fresh=True).use_cache
+
+
+def test_unsupported_by_protocol_falls_back_to_local():
+    plan = plan_query(job_predicates(executor="demo", authors=["tom"]), frozenset({"executor"}))
+    assert plan.params == {"executor": "demo"}
+    assert [p.name for p in plan.local] == ["author~tom"]
+
+
+def test_local_matching():
+    plan = plan_query(job_predicates(authors=["Tom", "jerry"], cron="0 0 2"), frozenset())
+    assert plan.matches(JobInfo(author="tommy", schedule_conf="0 0 2 * * ?"))
+    assert not plan.matches(JobInfo(author="tommy", schedule_conf="0 0 3 * * ?"))
+    assert not plan.matches(JobInfo(author="spike", schedule_conf="0 0 2 * * ?"))
+
+
+def test_log_predicates():
+    time_range = "2024-01-01 00:00:00 - 2024-01-02 00:00:00"
+    plan = plan_query(log_predicates(job_id=-1, log_status=2, filter_time=time_range, param="2024-"), LOG_FILTERS)
+    # 未匹配到任务的-1同样下推
+    assert plan.params == {"job_id": -1, "log_status": 2, "filter_time": time_range}
+    assert [p.name for p in plan.local] == ["param~2024-"]
+    assert plan.matches(JobLog(executor_param="2024-01-01"))
+    assert "job_id" not in plan_query(log_predicates(job_id=0), LOG_FILTERS).params
+
+
+def test_log_status_and_time_tests():
+    time_range = "2024-01-01 00:00:00 - 2024-01-02 00:00:00"
+    failed, running, success, window = (
+        plan_query(predicates, frozenset())
+        for predicates in (
+            log_predicates(log_status=2),
+            log_predicates(log_status=3),
+            log_predicates(log_status=1),
+            log_predicates(filter_time=time_range),
+        )
+    )
+    assert failed.matches(JobLog(trigger_code=500))
+    assert failed.matches(JobLog(trigger_code=200, handle_code=500))
+    assert not failed.matches(JobLog(trigger_code=200, handle_code=0))
+    assert running.matches(JobLog(trigger_code=200, handle_code=0))
+    assert success.matches(JobLog(trigger_code=200, handle_code=200))
+    assert window.matches(JobLog(trigger_time="2024-01-01 12:00:00"))
+    assert not window.matches(JobLog(trigger_time="2024-01-03 00:00:00"))
+    assert not window.matches(JobLog())
@@ -0,0 +1,76 @@
+import io
+import asyncio
+
+import pytest
+from rich.cells import cell_len
+from rich.console import Console
+
+from xxl_admin.commands import GROUP_SCHEMA, JOB_LOG_SCHEMA, JOB_SCHEMA
+from xxl_admin.render import XxlRenderer
+from xxl_admin.utils import window
+
+JOB_ROW = (
+    "12",
+    "order-service-executor",
+    "每天凌晨同步订单数据到数据仓库，失败时重试三次并通知负责人",
+    "BEAN: orderSyncJobHandlerWithAVeryLongName",
+    "CRON: 0 0 2 * * ?",
+    "zhangsan",
+    "启动",
+)
+LOG_ROW = ("1", "2024-01-01 00:00:00", "成功", "2024-01-01 00:00:01 (12.3s)", "param=" + "x" * 60, "ok " * 30)
+GROUP_ROW = ("1", "order-service-executor", "订单服务", "自动", ",".join(f"http://10.0.0.{i}:9999/" for i in range(8)))
+
+
+def _render(schema, rows, width: int) -> str:
+    output = io.StringIO()
+    XxlRenderer(Console(file=output, width=width)).print_table(schema, rows, title="列表")
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("schema,row", [(JOB_SCHEMA, JOB_ROW), (JOB_LOG_SCHEMA, LOG_ROW), (GROUP_SCHEMA, GROUP_ROW)])
+def test_every_header_fits_80_columns(schema, row):
+    text = _render(schema, [row] * 3, width=80)
+    for column in schema.columns:
+        assert column.header in text
+    assert all(cell_len(line) <= 80 for line in text.splitlines())
+
+
+def test_narrow_terminal_falls_back_to_rich_layout():
+    text = _render(JOB_SCHEMA, [JOB_ROW], width=30)
+    assert all(cell_len(line) <= 30 for line in text.splitlines())
+
+
+def test_stream_batches_share_column_widths():
+    output = io.StringIO()
+    renderer = XxlRenderer(Console(file=output, width=120, height=20))
+
+    async def rows():
+        for i in range(renderer.batch_size * 3):
+            # 后面批次的描述更短，列宽沿用第一批，不会变窄
+            yield (str(i), "demo", "长一些的任务描述" if i < renderer.batch_size else "短描述", "BEAN: h", "CRON", "a", "启动")
+
+    printed = asyncio.run(renderer.print_stream(JOB_SCHEMA, rows()))
+    assert printed == renderer.batch_size * 3
+    widths = {cell_len(line) for line in output.getvalue().splitlines() if line.startswith("│")}
+    assert len(widths) == 1
+
+
+def test_window_closes_upstream():
+    closed = []
+
+    async def rows():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.append(True)
+
+    async def collect(limit, offset):
+        return [row async for row in window(rows(), limit, offset)]
+
+    assert asyncio.run(collect(3, 5)) == [5, 6, 7]
+    # 够数后上游被关闭
+    assert closed == [True]
+    assert asyncio.run(collect(0, 0)) == []
+    assert asyncio.run(collect(None, 98)) == [98, 99]
@@ -0,0 +1,30 @@
+import time
+import asyncio
+
+import pytest
+
+from xxl_admin.utils import TokenBucket
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_token_bucket_burst_then_rate():
+    async def acquire(bucket: TokenBucket, n: int) -> float:
+        begin = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - begin
+
+    # 初始桶满，突发量内不等待
+    assert asyncio.run(acquire(TokenBucket(rate=50, capacity=5), 5)) < 0.05
+    # 超出突发量后按速率发放：capacity=1时10个令牌至少需要9/50秒
+    elapsed = asyncio.run(acquire(TokenBucket(rate=50, capacity=1), 10))
+    assert 0.17 <= elapsed < 0.5
+
+
+def test_token_bucket_default_capacity():
+    assert TokenBucket(rate=0.5).capacity == 1.0
+    assert TokenBucket(rate=20).capacity == 20
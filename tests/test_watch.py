@@ -0,0 +1,126 @@
+import io
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from rich.console import Console
+
+from xxl_admin.client import XxlAdminClient
+from xxl_admin.commands import fan_out
+from xxl_admin.models import JobGroup, JobInfo
+from xxl_admin.watch import (
+    CHANGE_AUTHOR,
+    CHANGE_CREATED,
+    CHANGE_CRON,
+    CHANGE_DELETED,
+    CHANGE_TOGGLED,
+    CHANGE_UPDATED,
+    GROUP_FIELDS,
+    JOB_FIELDS,
+    CatalogSnapshot,
+    XxlChangeWatcher,
+)
+
+AT = "2024-01-01 00:00:00"
+JOBS = [
+    JobInfo(id=1, executor_handler="h1", schedule_conf="0 0 1 * * ?", trigger_status=1, author="admin"),
+    JobInfo(id=2, executor_handler="h2", schedule_conf="0 0 2 * * ?", trigger_status=1, author="admin"),
+    JobInfo(id=3, job_desc="glue job", glue_type="GLUE_SHELL"),
+]
+
+
+def _diff(old, new):
+    return CatalogSnapshot(old, JOB_FIELDS).diff(CatalogSnapshot(new, JOB_FIELDS), "cn", "job", AT)
+
+
+def test_unchanged_catalog_has_no_events():
+    assert _diff(JOBS, [j.replace() for j in JOBS]) == []
+
+
+def test_runtime_fields_are_ignored():
+    new = [j.replace(trigger_last_time=1, trigger_next_time=2, update_time="2024-01-01") for j in JOBS]
+    assert _diff(JOBS, new) == []
+
+
+def test_created_and_deleted():
+    new = JOBS[1:] + [JobInfo(id=4, executor_handler="h4")]
+    events = _diff(JOBS, new)
+    assert [(e.action, e.record_id, e.name) for e in events] == [(CHANGE_CREATED, 4, "h4"), (CHANGE_DELETED, 1, "h1")]
+
+
+def test_field_changes_are_classified():
+    new = [
+        JOBS[0].replace(schedule_conf="0 5 1 * * ?", trigger_status=0),
+        JOBS[1].replace(author="tom", executor_param="x"),
+        JOBS[2],
+    ]
+    events = {(e.record_id, e.field): e for e in _diff(JOBS, new)}
+    assert set(events) == {(1, "schedule_conf"), (1, "trigger_status"), (2, "author"), (2, "executor_param")}
+    assert events[(1, "schedule_conf")].action == CHANGE_CRON
+    assert (events[(1, "schedule_conf")].before, events[(1, "schedule_conf")].after) == ("0 0 1 * * ?", "0 5 1 * * ?")
+    assert events[(1, "trigger_status")].action == CHANGE_TOGGLED
+    assert events[(2, "author")].action == CHANGE_AUTHOR
+    assert events[(2, "executor_param")].action == CHANGE_UPDATED
+
+
+def test_glue_job_named_by_description():
+    (event,) = _diff(JOBS, JOBS[:2])
+    assert event.name == "glue job"
+
+
+def test_group_changes_ignore_registry():
+    old = [JobGroup(id=1, appname="demo", title="示例", registry_list=["http://a:9999/"])]
+    new = [old[0].replace(registry_list=["http://b:9999/"], title="示例v2")]
+    (event,) = CatalogSnapshot(old, GROUP_FIELDS).diff(CatalogSnapshot(new, GROUP_FIELDS), "cn", "group", AT)
+    assert (event.action, event.field, event.after) == (CHANGE_UPDATED, "title", "示例v2")
+
+
+def test_watcher_first_update_is_baseline():
+    watcher = XxlChangeWatcher()
+    assert watcher.update("cn", ([], JOBS)) == []
+    assert watcher.has_baseline("cn")
+    events = watcher.update("cn", ([], JOBS[:2]))
+    assert [(e.cluster, e.kind, e.action) for e in events] == [("cn", "job", CHANGE_DELETED)]
+
+
+def test_failed_fetch_produces_no_events():
+    failing = {"cn": False, "us": False}
+
+    def admin(cluster):
+        def handler(request: httpx.Request) -> httpx.Response:
+            if failing[cluster]:
+                return httpx.Response(502, text="Bad Gateway")
+            if request.url.path.endswith("/jobgroup/pageList"):
+                return httpx.Response(200, json={"recordsTotal": 1, "data": [{"id": 1, "appname": "demo"}]})
+            data = [{"id": j.id, "jobGroup": 1, "executorHandler": j.executor_handler} for j in JOBS[:2]]
+            return httpx.Response(200, json={"recordsTotal": len(data), "data": data})
+
+        client = XxlAdminClient(f"http://{cluster}.admin.test")
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        client.is_logged_in = True
+        return client
+
+    clients = {"cn": admin("cn"), "us": admin("us")}
+    cmd_ctx = SimpleNamespace(renderer=SimpleNamespace(console=Console(file=io.StringIO())))
+    watcher = XxlChangeWatcher()
+
+    async def poll():
+        results = await fan_out(cmd_ctx, {c: watcher.fetch(client) for c, client in clients.items()}, partial=False)
+        return results, [e for c, catalogs in results.items() for e in watcher.update(c, catalogs)]
+
+    async def run():
+        try:
+            await poll()
+            failing["us"] = True
+            results, events = await poll()
+            # 调度中心502时不能把整个目录当成被删除
+            assert list(results) == ["cn"]
+            assert events == []
+            failing["us"] = False
+            _, events = await poll()
+            assert events == []
+        finally:
+            for client in clients.values():
+                await client.close()
+
+    asyncio.run(run())